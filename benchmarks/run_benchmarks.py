@@ -0,0 +1,248 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+
+Benchmarks on synthetic logs, results are written as json to compare runs.
+
+Usage, from the project root folder:
+
+    python -m benchmarks.run_benchmarks --sizes 10000 1000000 -o bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from logtools.log_blocks import LogBlocks
+from logtools.log_data import LogData
+from logtools.log_patterns import LogPatterns, parse_yaml
+from logtools.log_reader import iter_chunks, iter_lines
+from logtools.pattern_cache import PatternCache
+
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+
+BLOCK_START = "main.cpp:94 [InitializeApplication] Initialized Application {version} version"
+BLOCK_END = "main.cpp:94 [FinalizeApplication] Application stop"
+MESSAGES = [
+    ("INFO", "proc.cpp:22 [MyProc] Process starts"),
+    ("DEBUG", "proc.cpp:89 [MyProc] Process details {num}"),
+    ("DEBUG", "proc.cpp:89 [MyProc] Step {num} of the calculation"),
+    ("INFO", "main.cpp:35 [Descriptions] Nothing special happens here {num}"),
+    ("WARN", "net.cpp:120 [Network] Retry {num} of the connection"),
+    ("ERROR", "proc.cpp:89 [MyProc] Found wrong process detail of {num}"),
+    ("INFO", "proc.cpp:22 [MyProc] Process ends"),
+]
+WEIGHTS = [10, 40, 30, 10, 5, 1, 10]
+
+PATTERN_TEMPLATE = """{name}:
+  pattern: {pattern}
+  block_start: {block_start}
+  needed: {needed}
+  property: {prop}
+  style:
+  - bold
+  - 0000FF
+  visible: yes
+"""
+
+
+def generate_patterns(count: int) -> str:
+    """
+    Generate a patterns yaml with the block start and end plus extra patterns
+    """
+    parts = [
+        PATTERN_TEMPLATE.format(
+            name="App start",
+            pattern=r"\[InitializeApplication\] Initialized Application ([0-9.]+)",
+            block_start="yes",
+            needed="no",
+            prop="1",
+        ),
+        PATTERN_TEMPLATE.format(
+            name="App end",
+            pattern=r"\[FinalizeApplication\] Application stop",
+            block_start="no",
+            needed="yes",
+            prop="",
+        ),
+    ]
+    extras = [r"ERROR", r"\[Network\] Retry", r"Process (starts|ends)", r"details 1\d\b"]
+    for i in range(max(0, count - 2)):
+        pattern = extras[i] if i < len(extras) else rf"Step {i}\d* of"
+        parts.append(
+            PATTERN_TEMPLATE.format(
+                name=f"Pattern {i}", pattern=pattern, block_start="no", needed="no", prop=""
+            )
+        )
+    return "".join(parts)
+
+
+def generate_log(path: pathlib.Path, lines: int, blocks: int, seed: int = 42) -> None:
+    """
+    Generate a log shaped like the sample log, every 10th block crashes
+    """
+    rnd = random.Random(seed)
+    time_stamp = datetime(2021, 2, 11, 17, 29, 35)  # noqa: DTZ001 - logs have local time
+    block_size = max(2, lines // blocks)
+    with path.open("w", encoding="latin2", newline="\n") as f:
+        for num in range(lines):
+            time_stamp += timedelta(microseconds=rnd.randrange(1000, 200_000))
+            pos = num % block_size
+            block = num // block_size
+            if pos == 0:
+                level, message = "INFO", BLOCK_START.format(version=f"1.{block}")
+            elif pos == block_size - 1 and block % 10 != 9:
+                level, message = "INFO", BLOCK_END
+            else:
+                level, message = rnd.choices(MESSAGES, WEIGHTS)[0]
+                message = message.format(num=rnd.randrange(1000))
+            f.write(f"{level} {time_stamp.isoformat(timespec='milliseconds')} {message}\n")
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """
+    Run the function several times, return the best time in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def split_chunk_blocks(patterns: LogPatterns, log_file: pathlib.Path) -> LogBlocks:
+    """
+    Split the log to blocks reading whole chunks, like the application does
+    """
+    log_blocks = LogBlocks(patterns)
+    for _ in log_blocks.iter_closed_chunk_blocks(iter_chunks(log_file)):
+        pass
+    return log_blocks
+
+
+def run_size(folder: pathlib.Path, lines: int, args: Any) -> dict[str, Any]:
+    """
+    Run all benchmarks on one log size
+    """
+    log_file = folder / f"bench_{lines}.log"
+    patterns_file = folder / "bench_patterns.yml"
+    generate_log(log_file, lines, args.blocks)
+    patterns_text = generate_patterns(args.patterns)
+    patterns_file.write_text(patterns_text)
+    patterns = LogPatterns(patterns_file)
+    timings: dict[str, float] = {}
+
+    timings["parse_yaml"] = measure(lambda: parse_yaml(patterns_text), args.repeat)
+    pattern_cache = PatternCache(folder / "cache")
+    LogPatterns(patterns_file, pattern_cache)
+    timings["load_cached_patterns"] = measure(
+        lambda: LogPatterns(patterns_file, pattern_cache), args.repeat
+    )
+    timings["read_lines"] = measure(lambda: sum(1 for _ in iter_lines(log_file)), args.repeat)
+
+    def split_blocks() -> LogBlocks:
+        log_blocks = LogBlocks(patterns)
+        for line in iter_lines(log_file):
+            log_blocks.add_line(line)
+        log_blocks.close_block()
+        return log_blocks
+
+    timings["split_blocks"] = measure(split_blocks, args.repeat)
+    timings["split_chunk_blocks"] = measure(
+        lambda: split_chunk_blocks(patterns, log_file), args.repeat
+    )
+    log_blocks = split_blocks()
+    timings["finalize"] = measure(lambda: log_blocks.finalize(1), 1)
+    parallel_blocks = split_blocks()
+    timings["finalize_parallel"] = measure(lambda: parallel_blocks.finalize(args.jobs), 1)
+
+    def search_all() -> None:
+        for block in log_blocks:
+            block.search_patterns()
+
+    timings["search_patterns"] = measure(search_all, args.repeat)
+
+    def get_texts() -> None:
+        for block in log_blocks:
+            block.get_text()
+
+    timings["get_text"] = measure(get_texts, args.repeat)
+
+    def alter_lines() -> None:
+        for block in log_blocks:
+            for line, micros in zip(block.lines, block.get_times(), strict=True):
+                block.alter_line(line, micros)
+
+    timings["alter_line"] = measure(alter_lines, args.repeat)
+    timings["log_data"] = measure(lambda: LogData(patterns, [log_file], args.jobs), 1)
+    file_size = log_file.stat().st_size
+    log_file.unlink()
+    return {
+        "lines": lines,
+        "blocks": len(log_blocks),
+        "patterns": len(patterns.data),
+        "file_size": file_size,
+        "timings": timings,
+    }
+
+
+def parse_arguments() -> Any:
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(description="LogTools benchmarks.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="log sizes in lines"
+    )
+    parser.add_argument("--blocks", type=int, default=20, help="number of blocks in the logs")
+    parser.add_argument("--patterns", type=int, default=10, help="number of patterns")
+    parser.add_argument("--repeat", type=int, default=3, help="repeat count, best is taken")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="processes")
+    parser.add_argument("-o", "--output", type=pathlib.Path, help="json output, default: stdout")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    Run the benchmarks and write the results
+    """
+    args = parse_arguments()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for lines in args.sizes:
+            print(f"Running {lines} lines...", file=sys.stderr)  # noqa: T201 - progress
+            results.append(run_size(pathlib.Path(tmp_dir), lines, args))
+    report = {
+        "python": sys.version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "date": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "arguments": {
+            k: str(v) if isinstance(v, pathlib.Path) else v for k, v in vars(args).items()
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)  # noqa: T201 - print ok here
+
+
+if __name__ == "__main__":
+    main()
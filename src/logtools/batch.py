@@ -0,0 +1,179 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import json
+import os
+import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, TextIO
+
+from logtools import user_files
+from logtools.log_data import LogData
+from logtools.utils import LogToolsError, check_logfiles, error_message
+
+
+# Note: this module is the headless entry point, it must never import wx
+
+CSV_COLUMNS = ["file", "num", "name", "start", "end", "duration", "lines", "result"]
+
+
+def parse_arguments() -> Any:
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Log file block summaries without GUI.",
+    )
+    parser.add_argument("log_files", type=pathlib.Path, nargs="+", help="log files to process")
+    parser.add_argument("-p", "--patterns", help="patterns file base name")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="number of log files processed at the same time"
+    )
+    parser.add_argument(
+        "-f", "--format", choices=["json", "csv"], default="json", help="output format"
+    )
+    parser.add_argument("-o", "--output", type=pathlib.Path, help="output file, default: stdout")
+    parser.add_argument(
+        "-s", "--stats", action="store_true", help="add statistics of all the blocks, json only"
+    )
+    parser.add_argument(
+        "-c", "--costs", action="store_true", help="add search costs of the patterns, json only"
+    )
+    args = parser.parse_args()
+    if args.stats and args.format != "json":
+        parser.error("statistics are only available in json format")
+    if args.costs and args.format != "json":
+        parser.error("search costs are only available in json format")
+    return args
+
+
+def summarize_file(
+    log_file: pathlib.Path,
+    patterns: str | None,
+    user_folder: pathlib.Path | None = None,
+    workers: int = 1,
+    *,
+    stats: bool = False,
+    costs: bool = False,
+) -> dict[str, Any]:
+    """
+    Process one log file and return the summary of its blocks
+
+    Optionally the statistics and the search costs of the patterns per block are added.
+
+    Problems are reported in the result, so one bad file does not stop the others.
+    """
+    try:
+        log_patterns = user_files.get_patterns(patterns, [log_file], user_folder)
+        log_data = LogData(log_patterns, [log_file], workers)
+    except (LogToolsError, OSError) as exc:
+        # broken compressed files are reported as LogToolsError by the reader
+        return {"file": str(log_file), "error": str(exc), "blocks": []}
+    blocks = [block.get_summary() for block in log_data.log_blocks]
+    if costs:
+        for block, summary in zip(log_data.log_blocks, blocks, strict=True):
+            summary["costs"] = block.get_costs()
+    if stats:
+        return {
+            "file": str(log_file),
+            "blocks": blocks,
+            "stats": log_data.get_stats().get_summary(),
+        }
+    return {"file": str(log_file), "blocks": blocks}
+
+
+def summarize_files(
+    log_files: list[pathlib.Path],
+    patterns: str | None,
+    user_folder: pathlib.Path | None = None,
+    jobs: int | None = None,
+    *,
+    stats: bool = False,
+    costs: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Process the log files concurrently, every file separately
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs < 2 or len(log_files) < 2:
+        # a single file can still use the processes for its blocks
+        return [
+            summarize_file(f, patterns, user_folder, jobs, stats=stats, costs=costs)
+            for f in log_files
+        ]
+    summarize = functools.partial(
+        summarize_file, patterns=patterns, user_folder=user_folder, stats=stats, costs=costs
+    )
+    with ProcessPoolExecutor(max_workers=min(jobs, len(log_files))) as executor:
+        return list(executor.map(summarize, log_files))
+
+
+def write_json(results: list[dict[str, Any]], output: TextIO) -> None:
+    """
+    Write the summaries as a json list, one item per log file
+    """
+    json.dump(results, output, indent=2)
+    output.write("\n")
+
+
+def write_csv(results: list[dict[str, Any]], output: TextIO) -> None:
+    """
+    Write the summaries as csv, one row per block, a column for every pattern
+    """
+    pattern_names: dict[str, None] = {}
+    for result in results:
+        for block in result["blocks"]:
+            pattern_names.update(dict.fromkeys(block["hits"]))
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(CSV_COLUMNS + list(pattern_names))
+    for result in results:
+        for block in result["blocks"]:
+            row = [result["file"]] + [block[column] for column in CSV_COLUMNS[1:]]
+            row += [block["hits"].get(name, "") for name in pattern_names]
+            writer.writerow(row)
+
+
+def batch_main() -> int:
+    """
+    Main function of the batch processing, return the exit code
+    """
+    args = parse_arguments()
+    check_logfiles(args.log_files)
+    results = summarize_files(
+        args.log_files, args.patterns, jobs=args.jobs, stats=args.stats, costs=args.costs
+    )
+    write = write_csv if args.format == "csv" else write_json
+    if args.output:
+        with args.output.open("w", encoding="utf-8", newline="") as output:
+            write(results, output)
+    else:
+        write(results, sys.stdout)
+    errors = [result for result in results if "error" in result]
+    for result in errors:
+        print(f"ERROR: {result['file']}: {result['error']}", file=sys.stderr)  # noqa: T201 - print ok here
+    return 1 if errors else 0
+
+
+def main() -> None:
+    """
+    The usual main function
+    """
+    try:
+        exit_code = batch_main()
+    except LogToolsError as exc:
+        error_message(str(exc))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
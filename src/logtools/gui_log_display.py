@@ -7,6 +7,10 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
+import bisect
+from array import array
+from collections.abc import Iterable
+from datetime import datetime
 from typing import Any
 
 from wx import stc
@@ -14,6 +18,15 @@ from wx import stc
 from logtools.log_block import LogBlock
 
 
+# lines are styled in chunks of this size when they get visible
+STYLE_CHUNK = 256
+# chunks around the visible lines styled in advance, in lines
+STYLE_MARGIN = 100
+# colors of the source markers when logs are merged, repeated for more sources
+SOURCE_COLORS = ("1F77B4", "FF7F0E", "2CA02C", "D62728", "9467BD", "8C564B", "E377C2", "7F7F7F")
+SOURCE_MARGIN = 1
+
+
 def translate_style(style_in: str) -> str:
     """
     Change the given style to the STC format
@@ -27,6 +40,10 @@ def translate_style(style_in: str) -> str:
 class LogDisplay(stc.StyledTextCtrl):
     """
     The log display that is in the tabbed pages of the GUI
+
+    Lines are styled on demand: the style of every line is kept in an array
+    and only the chunks getting visible are styled, so the cost depends on
+    the screen size and not on the size of the block.
     """
 
     def __init__(self, parent: Any, log_block: LogBlock) -> None:
@@ -35,11 +52,19 @@ class LogDisplay(stc.StyledTextCtrl):
         self.SetMarginType(0, stc.STC_MARGIN_NUMBER)
         self.SetMarginWidth(0, 50)
         self.SetWrapMode(1)
+        self.create_source_markers()
         self.base_style = "size:10,face:Courier New"
         self.StyleSetSpec(stc.STC_STYLE_DEFAULT, self.base_style)
         self.create_pattern_styles()
-        self.SetText(self.log_block.get_text())
-        self.apply_pattern_styles()
+        self.line_styles = array("B")
+        self.styled_chunks: set[int] = set()
+        # visible lines of the block when the text was set
+        self.shown_lines = self.log_block.visible_lines
+        # styling is done by us, see style_visible
+        self.SetLexer(stc.STC_LEX_CONTAINER)
+        self.Bind(stc.EVT_STC_STYLENEEDED, self.on_style_needed)
+        self.Bind(stc.EVT_STC_UPDATEUI, self.on_update_ui)
+        self.load_text()
         self.GotoLine(0)
         self.SetCaretLineVisible(True)
         self.SetCaretLineVisibleAlways(True)
@@ -61,45 +86,228 @@ class LogDisplay(stc.StyledTextCtrl):
             p_style = ",".join(p_style_list)
             self.StyleSetSpec(i, p_style)
 
-    def apply_pattern_styles(self) -> None:
+    def create_source_markers(self) -> None:
+        """
+        Colored stripe in a margin shows the log file of the lines when logs are merged
+        """
+        self.SetMarginType(SOURCE_MARGIN, stc.STC_MARGIN_SYMBOL)
+        self.SetMarginWidth(SOURCE_MARGIN, 6 if self.log_block.sources else 0)
+        self.SetMarginMask(SOURCE_MARGIN, (1 << len(SOURCE_COLORS)) - 1)
+        for num, color in enumerate(SOURCE_COLORS):
+            self.MarkerDefine(num, stc.STC_MARK_FULLRECT, f"#{color}", f"#{color}")
+
+    def load_text(self) -> None:
+        """
+        Set the displayed lines of the block, keeping the caret on the same original line
+        """
+        line = self.get_caret_line()
+        self.line_styles = self.log_block.get_line_styles()
+        self.styled_chunks.clear()
+        self.shown_lines = self.log_block.visible_lines
+        self.SetText(self.log_block.get_text())
+        self.GotoLine(self.log_block.to_display_line(line))
+
+    def get_caret_line(self) -> int:
+        """
+        Original line of the caret, by the lines shown, the block can have new visible lines
+        """
+        if not self.line_styles:
+            return 0
+        line: int = self.GetCurrentLine()
+        if self.shown_lines is None:
+            # all the lines were shown
+            return line
+        if not self.shown_lines:
+            return 0
+        return self.shown_lines[min(line, len(self.shown_lines) - 1)]
+
+    def on_style_needed(self, event: Any) -> None:
+        """
+        Scintilla asks for styling of the text getting visible
+        """
+        self.style_visible()
+        event.Skip()
+
+    def on_update_ui(self, event: Any) -> None:
+        """
+        Scrolling up does not ask for styling, so check the visible lines here too
+        """
+        self.style_visible()
+        event.Skip()
+
+    def style_visible(self) -> None:
+        """
+        Style the chunks of the visible lines and a margin around them, if not yet done
+        """
+        first_visible = self.GetFirstVisibleLine()
+        first = self.DocLineFromVisible(first_visible) - STYLE_MARGIN
+        last = self.DocLineFromVisible(first_visible + self.LinesOnScreen()) + STYLE_MARGIN
+        last = min(last, len(self.line_styles) - 1)
+        for chunk in range(max(first, 0) // STYLE_CHUNK, last // STYLE_CHUNK + 1):
+            if chunk not in self.styled_chunks:
+                self.style_chunk(chunk)
+
+    def get_line_position(self, line: int) -> int:
+        """
+        Position of the start of the line, the text length after the last line
+        """
+        if line >= self.GetLineCount():
+            return int(self.GetLength())
+        return int(self.PositionFromLine(line))
+
+    def style_chunk(self, chunk: int) -> None:
+        """
+        Style the lines of a chunk, lines of the same style are styled at once
+        """
+        first = chunk * STYLE_CHUNK
+        stop = min(first + STYLE_CHUNK, len(self.line_styles))
+        if first >= stop:
+            return
+        styles = self.line_styles
+        self.StartStyling(self.get_line_position(first))
+        run_start = first
+        for line in range(first + 1, stop + 1):
+            if line == stop or styles[line] != styles[run_start]:
+                length = self.get_line_position(line) - self.get_line_position(run_start)
+                self.SetStyling(length, styles[run_start])
+                run_start = line
+        self.mark_sources(first, stop)
+        self.styled_chunks.add(chunk)
+
+    def mark_sources(self, first: int, stop: int) -> None:
+        """
+        Add the source markers to the displayed lines that do not have one yet
+        """
+        sources = self.log_block.sources
+        if not sources:
+            return
+        for line in range(first, stop):
+            if not self.MarkerGet(line):
+                source = sources[self.log_block.from_display_line(line)]
+                self.MarkerAdd(line, source % len(SOURCE_COLORS))
+
+    def get_line_style(self, line: int) -> int:
         """
-        Apply the pattern style information to the log lines
+        Get the style number of a displayed line, later patterns override the earlier ones
         """
-        self.ClearDocumentStyle()
+        line = self.log_block.from_display_line(line)
+        style = 0
         for pattern in self.log_block.patterns.get_all_patterns():
-            for line in self.log_block.pattern_lines[pattern.p_id]:
-                self.StartStyling(self.PositionFromLine(line))
-                self.SetStyling(len(self.log_block.lines[line]), pattern.style_num)
+            hits = self.log_block.pattern_lines[pattern.p_id]
+            pos = bisect.bisect_left(hits, line)
+            if pos < len(hits) and hits[pos] == line:
+                style = pattern.style_num
+        return style
+
+    def restyle_lines(self, lines: Iterable[int]) -> None:
+        """
+        Calculate the style of the given displayed lines again
+
+        Their chunks are styled when visible.
+        """
+        for line in lines:
+            self.line_styles[line] = self.get_line_style(line)
+            self.styled_chunks.discard(line // STYLE_CHUNK)
+        self.style_visible()
 
     def update(self) -> None:
         """
-        When a pattern changes find the new lines and apply styles
+        When patterns change find their new lines and apply styles
 
-        Note: currently everything is processed, later it will check modified states
+        Only the modified patterns are searched again and only the lines
+        where they matched before or match now are styled again.
+        When the displayed lines changed the text is set again.
         """
-        self.log_block.search_patterns()
+        modified = list(self.log_block.patterns.get_modified())
+        changed: set[int] = set()
+        for pattern in modified:
+            changed.update(self.log_block.pattern_lines.get(pattern.p_id, []))
+        self.log_block.search_patterns(modified)
+        for pattern in modified:
+            changed.update(self.log_block.pattern_lines[pattern.p_id])
         self.create_pattern_styles()
-        self.apply_pattern_styles()
+        self.restyle_changed(changed)
+
+    def restyle_changed(self, changed: set[int]) -> None:
+        """
+        Style again the changed block lines, or set the text when the displayed lines changed
+        """
+        if self.shown_lines != self.log_block.visible_lines:
+            self.load_text()
+            return
+        block = self.log_block
+        self.restyle_lines(
+            sorted(block.to_display_line(line) for line in changed if block.is_line_visible(line))
+        )
+
+    def update_hits(self, p_id: str, old_lines: Iterable[int]) -> None:
+        """
+        Apply the styles after the hits of a pattern were found in the background
+        """
+        changed = set(old_lines)
+        changed.update(self.log_block.pattern_lines[p_id])
+        self.restyle_changed(changed)
+
+    def append_lines(self, first: int) -> None:
+        """
+        Append the lines added to the block since the given line and style them
+
+        When the caret is on the last line the display scrolls with the new lines.
+        """
+        lines = self.log_block.lines
+        if first >= len(lines):
+            return
+        # new lines do not change the visibility of the old ones
+        visible_lines = self.log_block.get_visible_lines()
+        shown = len(self.line_styles)
+        self.shown_lines = self.log_block.visible_lines
+        if shown >= len(visible_lines):
+            return
+        at_end = self.GetCurrentLine() >= self.GetLineCount() - 1
+        text = "\n".join([lines[num] for num in visible_lines[shown:]])
+        self.AppendText(f"\n{text}" if shown else text)
+        self.line_styles.extend(bytes(len(visible_lines) - shown))
+        self.restyle_lines(range(shown, len(visible_lines)))
+        if at_end:
+            self.GotoLine(self.GetLineCount() - 1)
+
+    def find_line(self, direction: str, p_id: str) -> int | None:
+        """
+        Find the previous, next, first or last line of the pattern
+
+        Return the index of the hit found, None when there is none.
+        """
+        act_line = self.log_block.from_display_line(self.GetCurrentLine())
+        index = self.log_block.find_hit(p_id, act_line, direction)
+        if index is not None:
+            self.GotoLine(
+                self.log_block.to_display_line(self.log_block.pattern_lines[p_id][index])
+            )
+        return index
+
+    def goto_hit(self, p_id: str, index: int) -> int | None:
+        """
+        Go to the line of the given hit of the pattern, the index is limited to the hits
+        """
+        hits = self.log_block.pattern_lines.get(p_id)
+        if not hits:
+            return None
+        index = min(max(index, 0), len(hits) - 1)
+        self.GotoLine(self.log_block.to_display_line(hits[index]))
+        return index
+
+    def goto_line(self, line: int) -> None:
+        """
+        Go to a line of the block
+        """
+        self.GotoLine(self.log_block.to_display_line(line))
 
-    def find_line(self, direction: str, p_id: str) -> None:
+    def goto_time(self, d_t: datetime) -> None:
         """
-        Find the previous or next line
+        Go to the first line at the given time or later, or to the end when none
         """
-        pattern = self.log_block.patterns.get_pattern(p_id)
-        assert pattern is not None
-        act_line = self.GetCurrentLine()
-        next_line = act_line
-        if direction == ">":
-            for line in self.log_block.pattern_lines[pattern.p_id]:
-                if line > act_line:
-                    next_line = line
-                    break
+        line = self.log_block.find_time(d_t)
+        if line is None:
+            self.GotoLine(self.GetLineCount() - 1)
         else:
-            prev = -1
-            for line in self.log_block.pattern_lines[pattern.p_id]:
-                if line >= act_line:
-                    break
-                prev = line
-            if prev > -1:
-                next_line = prev
-        self.GotoLine(next_line)
+            self.GotoLine(self.log_block.to_display_line(line))
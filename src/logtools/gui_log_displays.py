@@ -7,33 +7,215 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
+from collections.abc import Iterable
+from datetime import datetime
 from typing import Any
 
 import wx
 from wx.lib.agw import aui
 
 from logtools.gui_log_display import LogDisplay
+from logtools.log_block import LogBlock
 from logtools.log_data import LogData
+from logtools.log_stats import CostRow, LogStats
+
+
+# number of log displays kept alive, the least recently viewed ones are released
+MAX_DISPLAYS = 10
+# titles and widths of the search cost columns
+COST_COLUMNS = [
+    ("Log", 200),
+    ("Pattern", 200),
+    ("Time ms", 90),
+    ("Lines", 90),
+    ("Hits", 90),
+    ("Stopped", 70),
+]
 
 
 # mypy: allow-subclassing-any
+class LogPage(wx.Panel):
+    """
+    Lightweight tab page, the log display is only created when needed
+    """
+
+    def __init__(self, parent: Any, log_block: LogBlock) -> None:
+        super().__init__(parent, -1)
+        self.log_block = log_block
+        self.display: LogDisplay | None = None
+        self.sizer = wx.BoxSizer()
+        self.SetSizer(self.sizer)
+
+    def materialize(self) -> LogDisplay:
+        """
+        Create the log display when not yet done
+        """
+        if self.display is None:
+            self.display = LogDisplay(self, self.log_block)
+            self.sizer.Add(self.display, 1, wx.EXPAND)
+            self.Layout()
+        return self.display
+
+    def release(self) -> None:
+        """
+        Destroy the log display to free its resources
+        """
+        if self.display is not None:
+            self.display.Destroy()
+            self.display = None
+
+    def find_line(self, direction: str, p_id: str) -> int | None:
+        """
+        Find line command is forwarded to the log display
+        """
+        return self.materialize().find_line(direction, p_id)
+
+    def goto_hit(self, p_id: str, index: int) -> int | None:
+        """
+        Go to hit command is forwarded to the log display
+        """
+        return self.materialize().goto_hit(p_id, index)
+
+    def goto_line(self, line: int) -> None:
+        """
+        Go to line command is forwarded to the log display
+        """
+        self.materialize().goto_line(line)
+
+    def goto_time(self, d_t: datetime) -> None:
+        """
+        Go to time command is forwarded to the log display
+        """
+        self.materialize().goto_time(d_t)
+
+    def update_hits(self, p_id: str, old_lines: Iterable[int]) -> None:
+        """
+        Show the hits of a pattern found in the background, when displayed
+        """
+        if self.display is not None:
+            self.display.update_hits(p_id, old_lines)
+
+    def update(self) -> None:
+        """
+        Update the display, or only the block data when there is no display
+        """
+        if self.display is None:
+            self.log_block.search_patterns(self.log_block.patterns.get_modified())
+        else:
+            self.display.update()
+
+
+class CostsList(wx.ListCtrl):
+    """
+    Virtual table of the pattern search costs, sorted by clicking a column title
+    """
+
+    def __init__(self, parent: Any) -> None:
+        super().__init__(parent, -1, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL)
+        self.rows: list[CostRow] = []
+        # the slowest first by default
+        self.sort_column = 2
+        self.sort_reverse = True
+        for num, (title, width) in enumerate(COST_COLUMNS):
+            self.InsertColumn(num, title, width=width)
+        self.Bind(wx.EVT_LIST_COL_CLICK, self.on_col_click)
+
+    def set_rows(self, rows: list[CostRow]) -> None:
+        """
+        Show new rows in the actual order
+        """
+        self.rows = list(rows)
+        self.sort_rows()
+
+    def sort_rows(self) -> None:
+        """
+        Sort the rows by the selected column and show them
+        """
+        self.rows.sort(key=lambda row: row[self.sort_column], reverse=self.sort_reverse)
+        self.SetItemCount(len(self.rows))
+        self.Refresh()
+
+    def on_col_click(self, event: Any) -> None:
+        """
+        Sort by the clicked column, clicking it again reverses the order
+        """
+        column = event.GetColumn()
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        elif column >= 0:
+            self.sort_column = column
+            # texts ascending, numbers descending, as the big ones are interesting
+            self.sort_reverse = column >= 2
+        self.sort_rows()
+
+    def OnGetItemText(self, item: int, column: int) -> str:  # noqa: N802 - wx virtual method
+        """
+        Text of a cell, called by the list for the visible rows only
+        """
+        if item >= len(self.rows):
+            return ""
+        value = self.rows[item][column]
+        if column == 2:
+            return f"{value * 1000:.1f}"
+        if column == 5:
+            return "yes" if value else ""
+        return str(value)
+
+
+class SummaryPage(wx.Panel):
+    """
+    Tab page with the statistics of all the blocks and the search costs
+    """
+
+    def __init__(self, parent: Any, app_data: LogData) -> None:
+        super().__init__(parent, -1)
+        self.app_data = app_data
+        self.stats: LogStats | None = None
+        splitter = wx.SplitterWindow(self, -1, style=wx.SP_LIVE_UPDATE)
+        self.text = wx.TextCtrl(
+            splitter, -1, "", style=wx.TE_MULTILINE | wx.TE_READONLY | wx.HSCROLL | wx.TE_DONTWRAP
+        )
+        self.text.SetFont(wx.Font(wx.FontInfo(10).Family(wx.FONTFAMILY_TELETYPE)))
+        self.costs_list = CostsList(splitter)
+        splitter.SplitHorizontally(self.text, self.costs_list, -200)
+        splitter.SetSashGravity(1.0)
+        sizer = wx.BoxSizer()
+        sizer.Add(splitter, 1, wx.EXPAND)
+        self.SetSizer(sizer)
+
+    def refresh(self) -> None:
+        """
+        Show the statistics, the text is only built again when they changed
+        """
+        stats = self.app_data.get_stats()
+        if stats is not self.stats:
+            self.stats = stats
+            self.text.SetValue(stats.get_text())
+            self.costs_list.set_rows(stats.costs)
+
+
 class LogDisplays(wx.Panel):
     """
     Tabbed panel to display the log displays
     """
 
-    def __init__(self, parent: Any, app_data: LogData) -> None:
+    def __init__(self, parent: Any, app_data: LogData, max_displays: int = MAX_DISPLAYS) -> None:
         super().__init__(parent, -1)
 
         self.app_data = app_data
-        self.log_displays = []
+        self.max_displays = max(1, max_displays)
+        self.log_pages: list[LogPage] = []
+        # materialized pages, the most recently viewed is the last
+        self.recent_pages: list[LogPage] = []
+        # the statistics are the last tab, added when all the blocks are loaded
+        self.summary_page: SummaryPage | None = None
 
         self.anb = aui.AuiNotebook(self)
 
         for log_block in self.app_data.log_blocks:
-            display = LogDisplay(self.anb, log_block)
-            self.log_displays.append(display)
-            self.anb.AddPage(display, log_block.name)
+            self.add_block(log_block)
+        if self.app_data.log_blocks:
+            self.add_summary()
 
         self.Bind(aui.EVT_AUINOTEBOOK_PAGE_CHANGING, self.on_anb_change, self.anb)
 
@@ -42,28 +224,114 @@ class LogDisplays(wx.Panel):
         self.SetSizer(sizer)
         wx.CallAfter(self.anb.SendSizeEvent)
 
+    def add_block(self, log_block: LogBlock) -> None:
+        """
+        Open a tab for a block, the first one is displayed
+        """
+        page = LogPage(self.anb, log_block)
+        # block tabs stay before the summary
+        self.anb.InsertPage(len(self.log_pages), page, log_block.name)
+        self.log_pages.append(page)
+        if len(self.log_pages) == 1:
+            self.show_page(page)
+
+    def add_summary(self) -> None:
+        """
+        Open the tab of the statistics
+        """
+        if self.summary_page is None:
+            self.summary_page = SummaryPage(self.anb, self.app_data)
+            self.anb.AddPage(self.summary_page, "Summary")
+
+    def show_page(self, page: LogPage) -> None:
+        """
+        Make sure the page has its display and release the old ones over the budget
+        """
+        page.materialize()
+        if page in self.recent_pages:
+            self.recent_pages.remove(page)
+        self.recent_pages.append(page)
+        while len(self.recent_pages) > self.max_displays:
+            self.recent_pages.pop(0).release()
+
     def on_anb_change(self, event: Any) -> None:
         """
         Handle tab selection change
         """
-        text = self.anb.GetPageText(event.GetSelection())
-        num = int(text[0:2]) - 1
-        self.app_data.set_block(num)
+        page = self.anb.GetPage(event.GetSelection())
+        if page is self.summary_page:
+            self.summary_page.refresh()
+            event.Skip()
+            return
+        self.show_page(page)
+        self.app_data.set_block(page.log_block.num - 1)
         self.GetParent().search_panel.update()
         log_prop = self.GetParent().search_panel.log_prop
         log_prop.SetValue(self.app_data.log_block.get_props())
         event.Skip()
 
-    def find_line(self, direction: str, p_id: int) -> None:
+    def get_log_page(self) -> LogPage | None:
+        """
+        Get the actual log page, None when the summary is displayed
+        """
+        page = self.anb.GetCurrentPage()
+        return page if isinstance(page, LogPage) else None
+
+    def find_line(self, direction: str, p_id: str) -> int | None:
         """
         Find line command is forwarded to the actual log displayed
         """
-        self.anb.GetCurrentPage().find_line(direction, p_id)
+        page = self.get_log_page()
+        return None if page is None else page.find_line(direction, p_id)
+
+    def goto_hit(self, p_id: str, index: int) -> int | None:
+        """
+        Go to hit command is forwarded to the actual log displayed
+        """
+        page = self.get_log_page()
+        return None if page is None else page.goto_hit(p_id, index)
+
+    def goto_time(self, d_t: datetime) -> None:
+        """
+        Go to time command is forwarded to the actual log displayed
+        """
+        page = self.get_log_page()
+        if page is not None:
+            page.goto_time(d_t)
+
+    def goto_line(self, log_block: LogBlock, line: int) -> None:
+        """
+        Select the tab of the block and go to the line there
+        """
+        page = self.log_pages[log_block.num - 1]
+        # selection change event updates the actual block and the search panel
+        self.anb.SetSelection(self.anb.GetPageIndex(page))
+        page.goto_line(line)
+
+    def add_lines(self, log_block: LogBlock, first: int, new_blocks: list[LogBlock]) -> None:
+        """
+        Show the lines appended to a block and open tabs for the new blocks
+        """
+        page = self.log_pages[log_block.num - 1]
+        if page.display is not None:
+            page.display.append_lines(first)
+        self.anb.SetPageText(self.anb.GetPageIndex(page), log_block.name)
+        for new_block in new_blocks:
+            self.add_block(new_block)
+
+    def update_hits(self, log_block: LogBlock, p_id: str, old_lines: Iterable[int]) -> None:
+        """
+        Show the hits of a pattern found in the background in the page of the block
+        """
+        if log_block.num <= len(self.log_pages):
+            self.log_pages[log_block.num - 1].update_hits(p_id, old_lines)
 
     def update(self) -> None:
         """
-        Propagate update event to all displays
+        Propagate update event to all pages
         """
-        for page in self.log_displays:
+        for page in self.log_pages:
             page.update()
         self.app_data.patterns.clear_modified()
+        if self.summary_page is not None and self.anb.GetCurrentPage() is self.summary_page:
+            self.summary_page.refresh()
@@ -7,14 +7,22 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
+import threading
 from typing import Any
 
 import wx
 from wx.lib.agw import aui
 
-from logtools.gui_log_displays import LogDisplays
+from logtools.gui_log_displays import MAX_DISPLAYS, LogDisplays
 from logtools.gui_search_panel import SearchPanel
-from logtools.log_data import LogData
+from logtools.gui_search_results import ResultsPanel
+from logtools.log_block import LogBlock
+from logtools.log_data import LogData, LogLoader
+from logtools.utils import LogToolsError
+
+
+# milliseconds between checking the log files in follow mode
+FOLLOW_INTERVAL = 1000
 
 
 # mypy: allow-subclassing-any
@@ -23,7 +31,9 @@ class MainFrame(wx.Frame):
     Frame with AUI manager to manage tabs easily
     """
 
-    def __init__(self, app_data: LogData) -> None:
+    def __init__(
+        self, app_data: LogData, max_displays: int = MAX_DISPLAYS, follow: bool = False
+    ) -> None:
         wx.Frame.__init__(
             self,
             parent=None,
@@ -35,6 +45,11 @@ class MainFrame(wx.Frame):
         )
 
         self.app_data = app_data
+        self.follow = follow
+        self.loaded_blocks = 0
+        # set when the frame is closed, the loading thread stops then
+        self.stop_loading = False
+        self.loader: LogLoader | None = None
 
         self._mgr = aui.AuiManager()
 
@@ -44,7 +59,9 @@ class MainFrame(wx.Frame):
         # create several panes
         self.search_panel = SearchPanel(self, self.app_data)
 
-        self.log_panel = LogDisplays(self, self.app_data)
+        self.log_panel = LogDisplays(self, self.app_data, max_displays)
+
+        self.results_panel = ResultsPanel(self, self.app_data)
 
         # add the panes to the manager
         self._mgr.AddPane(
@@ -52,18 +69,128 @@ class MainFrame(wx.Frame):
             aui.AuiPaneInfo().Left().Caption("Details and Searches").CloseButton(False),
         )
         self._mgr.AddPane(self.log_panel, aui.AuiPaneInfo().CenterPane())
+        self._mgr.AddPane(
+            self.results_panel,
+            aui.AuiPaneInfo().Bottom().Caption("Search results").BestSize((-1, 200)),
+        )
 
         # tell the manager to "commit" all the changes just made
         self._mgr.Update()
 
         self.Bind(wx.EVT_CLOSE, self.on_close)
 
+        self.follow_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_follow_timer, self.follow_timer)
+
+        self.CreateStatusBar()
         self.Maximize(True)
 
+    def start_loading(self, loader: LogLoader | None = None) -> None:
+        """
+        Load the logs in a background thread, the blocks are shown as they are ready
+
+        The loader can be already running, then its results so far are shown first.
+        """
+        if loader is None:
+            loader = LogLoader(self.app_data)
+            loader.start()
+        self.loader = loader
+        self.SetStatusText("Loading...")
+        threading.Thread(target=self.load_logs, args=(loader,), daemon=True).start()
+
+    def load_logs(self, loader: LogLoader) -> None:
+        """
+        Thread passing the loading events to the GUI with wx.CallAfter
+        """
+        for kind, value in loader.iter_events():
+            if self.stop_loading:
+                return
+            if kind == "progress":
+                wx.CallAfter(self.show_progress, *value)
+            elif kind == "block":
+                wx.CallAfter(self.on_block_loaded, value)
+            elif kind == "error":
+                wx.CallAfter(self.on_load_error, value)
+            else:
+                wx.CallAfter(self.on_load_done)
+
+    def show_progress(self, bytes_read: int, total: int) -> None:
+        """
+        Show the loading progress in the status bar
+        """
+        if self.stop_loading:
+            return
+        percent = 100 * bytes_read // total if total else 100
+        size = total / (1024 * 1024)
+        self.SetStatusText(
+            f"Loading: {percent}% of {size:.1f} MB read, {self.loaded_blocks} blocks ready"
+        )
+
+    def on_block_loaded(self, log_block: LogBlock) -> None:
+        """
+        Open the tab of a loaded block, the first one can be used right away
+        """
+        if self.stop_loading:
+            return
+        self.loaded_blocks += 1
+        self.log_panel.add_block(log_block)
+        self.search_panel.search_new_lines(log_block)
+        if self.loaded_blocks == 1:
+            self.app_data.set_block(0)
+            self.search_panel.update()
+            self.search_panel.log_prop.SetValue(self.app_data.log_block.get_props())
+
+    def on_load_done(self) -> None:
+        """
+        All the blocks are loaded, follow mode can start
+        """
+        if self.stop_loading:
+            return
+        try:
+            self.app_data.check_loaded()
+        except LogToolsError as exc:
+            self.on_load_error(str(exc))
+            return
+        self.SetStatusText(f"Loaded {self.loaded_blocks} blocks")
+        self.log_panel.add_summary()
+        self.results_panel.refresh()
+        if self.follow:
+            self.follow_timer.Start(FOLLOW_INTERVAL)
+
+    def on_load_error(self, msg: str) -> None:
+        """
+        Loading failed, show the problem and close
+        """
+        if self.stop_loading:
+            return
+        wx.MessageBox(msg, "LogTools Error", wx.OK | wx.ICON_ERROR, self)
+        self.Close()
+
+    def on_follow_timer(self, event: Any) -> None:
+        """
+        Check the log files for new lines and display them
+        """
+        last_block = self.app_data.log_blocks[-1]
+        first = len(last_block.lines)
+        new_blocks = self.app_data.follow()
+        if len(last_block.lines) > first or new_blocks:
+            self.log_panel.add_lines(last_block, first, new_blocks)
+            self.search_panel.search_new_lines(last_block, first)
+            for new_block in new_blocks:
+                self.search_panel.search_new_lines(new_block)
+            self.search_panel.update()
+            self.search_panel.log_prop.SetValue(self.app_data.log_block.get_props())
+        event.Skip()
+
     def on_close(self, event: Any) -> None:
         """
         Close the frame manager
         """
+        self.stop_loading = True
+        if self.loader is not None:
+            self.loader.stop()
+        self.follow_timer.Stop()
+        self.search_panel.free_search.close()
         if self.app_data.yaml_modified:
             self.app_data.patterns.write_yaml()
         self._mgr.UnInit()
@@ -7,14 +7,23 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
-import re
+from array import array
 from typing import Any
 
 import wx
 
+from logtools.gui_log_display import SOURCE_COLORS
 from logtools.gui_pattern_edit import PatternEditDialog
+from logtools.log_block import LogBlock
 from logtools.log_data import LogData
 from logtools.log_pattern import create_empty_pattern
+from logtools.log_search import BackgroundSearch, compile_search
+from logtools.log_times import parse_time_input
+from logtools.utils import LogToolsError
+
+
+# free search starts when the typing pauses this long, in milliseconds
+FREE_SEARCH_DELAY = 300
 
 
 # mypy: allow-subclassing-any
@@ -27,6 +36,13 @@ class SearchPanel(wx.ScrolledWindow):
         super().__init__(parent, -1, style=wx.VSCROLL | wx.ALWAYS_SHOW_SB)
         self.app_data = app_data
         self.texts: dict[str, wx.TextCtrl] = {}
+        # actual hit number of the patterns, can be edited to jump to a hit
+        self.hit_texts: dict[str, wx.TextCtrl] = {}
+        # free search runs in the background, hit counts arrive block by block
+        self.free_search = BackgroundSearch(self.post_free_hits, self.post_free_done)
+        self.free_timer: wx.CallLater | None = None
+        self.free_raw: str | None = ""
+        self.free_counts: dict[int, int] = {}
 
         self.sizer = wx.BoxSizer(wx.VERTICAL)
 
@@ -40,6 +56,15 @@ class SearchPanel(wx.ScrolledWindow):
         label = wx.StaticText(self, -1, f"    {patterns_name}")
         self.sizer.Add(label, 0, wx.EXPAND)
 
+        if self.app_data.merge:
+            label = wx.StaticText(self, -1, "Merged logs")
+            label.SetFont(font)
+            self.sizer.Add(label, 0, wx.EXPAND)
+            for num, log_file in enumerate(self.app_data.log_files):
+                label = wx.StaticText(self, -1, f"    {log_file.name}")
+                label.SetForegroundColour(f"#{SOURCE_COLORS[num % len(SOURCE_COLORS)]}")
+                self.sizer.Add(label, 0, wx.EXPAND)
+
         label = wx.StaticText(self, -1, "Properties")
         label.SetFont(font)
         self.sizer.Add(label, 0, wx.EXPAND)
@@ -55,12 +80,24 @@ class SearchPanel(wx.ScrolledWindow):
         self.log_prop.SetValue(self.app_data.log_block.get_props())
         self.sizer.Add(self.log_prop, 0, wx.EXPAND)
 
+        label = wx.StaticText(self, -1, "Go to time")
+        label.SetFont(font)
+        self.sizer.Add(label, 0, wx.EXPAND)
+
+        self.goto_time = wx.TextCtrl(self, -1, "", style=wx.TE_PROCESS_ENTER, size=(200, -1))
+        self.goto_time.SetMinSize((20, -1))
+        self.goto_time.SetHint("hh:mm:ss or full timestamp")
+        self.goto_time.Bind(wx.EVT_TEXT_ENTER, self.on_enter_goto_time)
+        self.sizer.Add(self.goto_time, 0, wx.EXPAND)
+
         label = wx.StaticText(self, -1, "Free search")
         label.SetFont(font)
         self.sizer.Add(label, 0, wx.EXPAND)
 
         pattern_row = self.create_pattern_row("free", "", free_search=True)
         self.sizer.Add(pattern_row, 0, wx.EXPAND)
+        self.free_status = wx.StaticText(self, -1, "")
+        self.sizer.Add(self.free_status, 0, wx.EXPAND)
 
         label = wx.StaticText(self, -1, "Searches")
         label.SetFont(font)
@@ -95,17 +132,28 @@ class SearchPanel(wx.ScrolledWindow):
         )
         text.SetMinSize((20, -1))
         if free_search:
+            text.Bind(wx.EVT_TEXT, self.on_free_search_text)
             text.Bind(wx.EVT_TEXT_ENTER, self.on_enter_free_search)
         else:
             text.Bind(wx.EVT_LEFT_DOWN, self.on_click_edit)
         self.texts[p_id] = text
-        btn_prev = wx.Button(self, -1, "<", size=(25, 25), name="<" + p_id)
-        btn_next = wx.Button(self, -1, ">", size=(25, 25), name=">" + p_id)
-        self.Bind(wx.EVT_BUTTON, self.on_click_search, btn_prev)
-        self.Bind(wx.EVT_BUTTON, self.on_click_search, btn_next)
+        hit_text = wx.TextCtrl(
+            self, -1, value="", style=wx.TE_PROCESS_ENTER, size=(40, -1), name=p_id
+        )
+        hit_text.SetToolTip("Actual hit, enter a number to jump there")
+        hit_text.Bind(wx.EVT_TEXT_ENTER, self.on_enter_hit)
+        self.hit_texts[p_id] = hit_text
         sub_sizer.Add(text, 1, wx.EXPAND)
-        sub_sizer.Add(btn_prev, 0, wx.CENTER)
-        sub_sizer.Add(btn_next, 0, wx.CENTER)
+        # button name is the direction and the pattern id
+        for label, direction in (("|<", "^"), ("<", "<")):
+            btn = wx.Button(self, -1, label, size=(25, 25), name=direction + p_id)
+            self.Bind(wx.EVT_BUTTON, self.on_click_search, btn)
+            sub_sizer.Add(btn, 0, wx.CENTER)
+        sub_sizer.Add(hit_text, 0, wx.CENTER)
+        for label, direction in ((">", ">"), (">|", "$")):
+            btn = wx.Button(self, -1, label, size=(25, 25), name=direction + p_id)
+            self.Bind(wx.EVT_BUTTON, self.on_click_search, btn)
+            sub_sizer.Add(btn, 0, wx.CENTER)
         return sub_sizer
 
     def update(self) -> None:
@@ -116,6 +164,28 @@ class SearchPanel(wx.ScrolledWindow):
             num = len(self.app_data.log_block.pattern_lines[pattern.p_id])
             name = f"{pattern.name}: {num}"
             self.texts[pattern.p_id].SetValue(name)
+        for hit_text in self.hit_texts.values():
+            hit_text.SetValue("")
+        self.show_free_status()
+
+    def show_free_status(self) -> None:
+        """
+        Show the free search hits in the selected log and in the searched blocks
+        """
+        if not self.free_counts:
+            return
+        here = self.free_counts.get(self.app_data.log_block.num, "?")
+        self.free_status.SetLabel(
+            f"{here} hits here, {sum(self.free_counts.values())} in "
+            f"{len(self.free_counts)}/{len(self.app_data.log_blocks)} logs"
+        )
+
+    def show_hit(self, p_id: str, index: int | None) -> None:
+        """
+        Show the actual hit number of the pattern, counted from 1
+        """
+        if index is not None:
+            self.hit_texts[p_id].SetValue(str(index + 1))
 
     def on_click_search(self, event: Any) -> None:
         """
@@ -124,9 +194,22 @@ class SearchPanel(wx.ScrolledWindow):
         obj_name = event.GetEventObject().GetName()
         direction = obj_name[0]
         p_id = obj_name[1:]
-        self.GetParent().log_panel.find_line(direction, p_id)
+        self.show_hit(p_id, self.GetParent().log_panel.find_line(direction, p_id))
         event.Skip()
 
+    def on_enter_hit(self, event: Any) -> None:
+        """
+        Handle hit number enter, jump to that hit of the pattern
+        """
+        hit_text = event.GetEventObject()
+        p_id = hit_text.GetName()
+        try:
+            index = int(hit_text.GetValue()) - 1
+        except ValueError:
+            hit_text.SetValue("")
+            return
+        self.show_hit(p_id, self.GetParent().log_panel.goto_hit(p_id, index))
+
     def on_click_edit(self, event: Any) -> None:
         """
         Handle pattern edit clicks
@@ -154,18 +237,139 @@ class SearchPanel(wx.ScrolledWindow):
             else:
                 self.app_data.patterns.update_pattern(pattern)
             self.GetParent().log_panel.update()
+            self.GetParent().results_panel.refresh(pattern.p_id)
             self.update()
             self.app_data.yaml_modified = True
         dlg.Destroy()
 
+    def on_free_search_text(self, event: Any) -> None:
+        """
+        Search as you type, the search starts when the typing pauses
+        """
+        if self.free_timer is not None:
+            self.free_timer.Stop()
+        self.free_timer = wx.CallLater(FREE_SEARCH_DELAY, self.start_free_search)
+        event.Skip()
+
     def on_enter_free_search(self, event: Any) -> None:
         """
-        Handle free search enter
+        Handle free search enter, search right away
+        """
+        if self.free_timer is not None:
+            self.free_timer.Stop()
+        self.start_free_search()
+        event.Skip()
+
+    def start_free_search(self) -> None:
+        """
+        Start the free search in the background, the selected log first
+
+        The older search is cancelled. Problems of the regex are shown instead of the hits.
         """
-        raw_search = event.GetEventObject().GetValue()
+        raw_search = self.texts["free"].GetValue()
+        if raw_search == self.free_raw:
+            return
+        try:
+            pattern = compile_search(raw_search)
+        except LogToolsError as exc:
+            self.free_search.cancel()
+            self.free_raw = None
+            self.free_status.SetLabel(str(exc))
+            return
+        self.free_raw = raw_search
         free_search = self.app_data.patterns.free_search
+        # blocks loaded or followed later search it by themselves
         free_search.raw_pattern = raw_search
-        free_search.pattern = re.compile(raw_search)
-        free_search.modified = True
-        self.GetParent().log_panel.update()
-        self.update()
+        free_search.pattern = pattern
+        self.free_counts = {}
+        self.free_status.SetLabel("Searching..." if raw_search else "")
+        self.free_search.cancel()
+        # hits of the older search are cleared and the logs are marked as not searched,
+        # so the logs not reached when this search is stopped do not show old hits
+        for log_block in self.app_data.log_blocks:
+            self.set_free_hits(log_block, array("I"), searched="")
+        if not raw_search:
+            self.GetParent().results_panel.refresh(free_search.p_id)
+            return
+        blocks = [self.app_data.log_block]
+        blocks += [block for block in self.app_data.log_blocks if block is not blocks[0]]
+        self.free_search.start(pattern, blocks)
+
+    def search_new_lines(self, log_block: LogBlock, first: int = 0) -> None:
+        """
+        Search the lines added to a block, or a new block, with the actual free search
+        """
+        self.free_search.add(log_block, first)
+
+    def set_free_hits(
+        self, log_block: LogBlock, hits: array[int], searched: str | None = None, first: int = 0
+    ) -> None:
+        """
+        Record the free search hits of a block and show them
+
+        Searched is the regex the hits are for, the actual free search by default.
+        When first is given only the hits from that line are new.
+        """
+        free_search = self.app_data.patterns.free_search
+        p_id = free_search.p_id
+        old_lines = log_block.pattern_lines.get(p_id, array("I"))
+        raw_pattern = free_search.raw_pattern if searched is None else searched
+        log_block.set_hits(p_id, raw_pattern, hits, first)
+        self.GetParent().log_panel.update_hits(log_block, p_id, old_lines)
+
+    def post_free_hits(
+        self, generation: int, log_block: LogBlock, first: int, hits: array[int]
+    ) -> None:
+        """
+        Pass the hits of a block from the search thread to the GUI thread
+        """
+        wx.CallAfter(self.on_free_hits, generation, log_block, first, hits)
+
+    def post_free_done(self, generation: int, problem: str | None) -> None:
+        """
+        Pass the end of the search from the search thread to the GUI thread
+        """
+        wx.CallAfter(self.on_free_done, generation, problem)
+
+    def on_free_hits(
+        self, generation: int, log_block: LogBlock, first: int, hits: array[int]
+    ) -> None:
+        """
+        Show the hits of a block, unless a newer search started meanwhile
+
+        Hits of the lines added later are appended to the ones found before.
+        """
+        if not self.free_search.is_current(generation):
+            return
+        if first:
+            old_hits = log_block.pattern_lines.get(self.app_data.patterns.free_search.p_id)
+            hits = array("I", old_hits or ()) + hits
+        self.set_free_hits(log_block, hits, first=first)
+        self.free_counts[log_block.num] = len(hits)
+        self.show_free_status()
+
+    def on_free_done(self, generation: int, problem: str | None) -> None:
+        """
+        Show the problem of the search, like being too slow, and list the results
+        """
+        if not self.free_search.is_current(generation):
+            return
+        if problem is not None:
+            self.free_raw = None
+            searched = len(self.free_counts)
+            self.free_status.SetLabel(
+                f"{problem}, {searched} of {len(self.app_data.log_blocks)} logs searched"
+            )
+        self.GetParent().results_panel.refresh(self.app_data.patterns.free_search.p_id)
+
+    def on_enter_goto_time(self, event: Any) -> None:
+        """
+        Handle go to time enter, jump to the first line at the given time or later
+        """
+        text = event.GetEventObject().GetValue()
+        try:
+            d_t = parse_time_input(text, self.app_data.log_block.start)
+        except LogToolsError as exc:
+            wx.MessageBox(str(exc), "LogTools", wx.OK | wx.ICON_WARNING, self)
+            return
+        self.GetParent().log_panel.goto_time(d_t)
@@ -0,0 +1,129 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import wx
+
+from logtools.log_data import LogData
+from logtools.log_search import SearchResults
+
+
+# titles and widths of the result columns
+COLUMNS = [("Log", 160), ("Line", 70), ("Time", 200), ("Text", 900)]
+
+
+# mypy: allow-subclassing-any
+class ResultsList(wx.ListCtrl):
+    """
+    Virtual list of the search results, the rows are only formatted when shown
+    """
+
+    def __init__(self, parent: Any) -> None:
+        super().__init__(parent, -1, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL)
+        self.results: SearchResults | None = None
+        # columns are asked one by one, the texts of the last row are kept
+        self.last_row = -1
+        self.last_texts: tuple[str, ...] = ()
+        for num, (title, width) in enumerate(COLUMNS):
+            self.InsertColumn(num, title, width=width)
+
+    def set_results(self, results: SearchResults) -> None:
+        """
+        Show new results
+        """
+        self.results = results
+        self.last_row = -1
+        self.SetItemCount(len(results))
+        self.Refresh()
+
+    def OnGetItemText(self, item: int, column: int) -> str:  # noqa: N802 - wx virtual method
+        """
+        Text of a cell, called by the list for the visible rows only
+        """
+        if self.results is None or item >= len(self.results):
+            return ""
+        if item != self.last_row:
+            self.last_texts = self.results.get_texts(item)
+            self.last_row = item
+        return self.last_texts[column]
+
+
+class ResultsPanel(wx.Panel):
+    """
+    Panel listing the hits of a pattern in all the logs, a click shows the line
+    """
+
+    def __init__(self, parent: Any, app_data: LogData) -> None:
+        super().__init__(parent, -1)
+        self.app_data = app_data
+        # pattern ids of the choice items
+        self.p_ids: list[str] = []
+
+        self.choice = wx.Choice(self, -1)
+        self.choice.Bind(wx.EVT_CHOICE, self.on_choice)
+        self.count = wx.StaticText(self, -1, "")
+        self.results_list = ResultsList(self)
+        self.results_list.Bind(wx.EVT_LIST_ITEM_SELECTED, self.on_select)
+
+        top_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        top_sizer.Add(self.choice, 0, wx.CENTER)
+        top_sizer.Add(self.count, 1, wx.CENTER | wx.LEFT, 10)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(top_sizer, 0, wx.EXPAND)
+        sizer.Add(self.results_list, 1, wx.EXPAND)
+        self.SetSizer(sizer)
+        self.update_choices()
+
+    def update_choices(self) -> None:
+        """
+        List the patterns in the choice, new ones may be added
+        """
+        selected = self.get_p_id()
+        patterns = [self.app_data.patterns.free_search]
+        patterns += self.app_data.patterns.get_yaml_patterns()
+        self.p_ids = [pattern.p_id for pattern in patterns]
+        self.choice.SetItems([pattern.name for pattern in patterns])
+        self.choice.SetSelection(self.p_ids.index(selected) if selected in self.p_ids else 0)
+
+    def get_p_id(self) -> str | None:
+        """
+        Pattern id of the selected choice
+        """
+        index = self.choice.GetSelection()
+        return self.p_ids[index] if 0 <= index < len(self.p_ids) else None
+
+    def refresh(self, p_id: str | None = None) -> None:
+        """
+        Collect the results again, only when the given pattern is shown, or always without it
+        """
+        self.update_choices()
+        shown = self.get_p_id()
+        if shown is None or (p_id is not None and p_id != shown):
+            return
+        results = SearchResults(self.app_data.log_blocks, shown)
+        self.count.SetLabel(f"{len(results)} hits in {results.hit_blocks} logs")
+        self.results_list.set_results(results)
+
+    def on_choice(self, event: Any) -> None:
+        """
+        Show the results of the selected pattern
+        """
+        self.refresh()
+        event.Skip()
+
+    def on_select(self, event: Any) -> None:
+        """
+        Jump to the log and the line of the clicked hit
+        """
+        results = self.results_list.results
+        if results is not None:
+            log_block, line = results.get_hit(event.GetIndex())
+            self.GetParent().log_panel.goto_line(log_block, line)
+        event.Skip()
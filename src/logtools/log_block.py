@@ -7,12 +7,36 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
+import bisect
+import itertools
+from array import array
+from collections.abc import Iterable, Sequence
 from datetime import datetime, timedelta
+from typing import Any
 
+from logtools.log_lines import LogLines, LogLinesView
+from logtools.log_matcher import PREFILTER_ID, PatternCost, PatternMatcher, format_cost
 from logtools.log_pattern import LogPattern
 from logtools.log_patterns import LogPatterns
+from logtools.log_times import NO_TIME, TimeParser, to_micros
 
 
+# what the heavy part of the finalization produces:
+# start, end, pattern lines, the timestamp column (can be empty, then parsed when needed),
+# the search costs of the patterns and the regexes they were searched with
+BlockResult = tuple[
+    datetime | None,
+    datetime | None,
+    dict[str, "array[int]"],
+    "array[int]",
+    dict[str, PatternCost],
+    dict[str, str],
+]
+
+# result of a block by whether the needed patterns were found,
+# None when a needed pattern was not found but its search was stopped as too slow
+RESULTS = {True: "OK", False: "Crash", None: "Unknown"}
+
 LOG_LEVELS = {
     "DEBUG": "D",
     "INFO": "I",
@@ -66,97 +90,463 @@ class LogBlock:
     These groups are separated by lines matched by starting patterns
     """
 
+    __slots__ = (
+        "base_name",
+        "costs",
+        "duration",
+        "end",
+        "has_needed",
+        "lines",
+        "name",
+        "num",
+        "pattern_lines",
+        "patterns",
+        "props",
+        "searched",
+        "sources",
+        "start",
+        "time_index",
+        "times",
+        "visible_lines",
+    )
+
     def __init__(self, patterns: LogPatterns, num: int = 0, name: str = "") -> None:
         self.patterns = patterns
         self.num = num
         self.name = name if name else "unknown"
-        self.has_needed = False
+        self.base_name = self.name
+        self.has_needed: bool | None = False
         self.start: datetime | None = None
         self.end: datetime | None = None
         self.duration = ""
         self.props = [f"Name: {self.name}"]
-        self.lines: list[str] = []
-        self.pattern_lines: dict[str, list[int]] = {
-            pattern.p_id: [] for pattern in self.patterns.get_all_patterns()
+        self.lines = LogLines()
+        # index of the log file of every line, only when the logs are merged
+        self.sources = array("H")
+        # timestamps of the lines in microseconds, see log_times
+        self.times = array("q")
+        # built when needed, see get_time_index
+        self.time_index: tuple[array[int], array[int]] | None = None
+        self.pattern_lines: dict[str, array[int]] = {
+            pattern.p_id: array("I") for pattern in self.patterns.get_all_patterns()
         }
+        # regex the pattern lines were searched with, to skip searching them again
+        self.searched: dict[str, str] = {}
+        # search costs of the patterns, see log_matcher
+        self.costs: dict[str, PatternCost] = {}
+        # original line numbers of the displayed lines, None when all are displayed
+        self.visible_lines: array[int] | None = None
 
-    def add(self, line: str) -> None:
+    def add(self, line: str, source: int | None = None) -> None:
         """
-        Add a line
+        Add a line, with the index of its log file when the logs are merged
         """
         self.lines.append(line)
+        if source is not None:
+            self.sources.append(source)
+
+    def get_times(self) -> array[int]:
+        """
+        Get the timestamp column, the lines not yet done are parsed now
+        """
+        if len(self.times) < len(self.lines):
+            parser = TimeParser()
+            self.times.extend(parser.parse_lines(self.lines.iter_range(len(self.times))))
+        return self.times
+
+    def get_time_index(self) -> tuple[array[int], array[int]]:
+        """
+        Get the sorted timestamps and for each the first line having that time or later
+
+        Logs are mostly in time order, so sorting is close to linear.
+        Lines without timestamp are left out.
+        """
+        if self.time_index is None:
+            times = self.get_times()
+            order = sorted(range(len(times)), key=times.__getitem__)
+            # NO_TIME is the smallest value, these lines are at the start
+            skip = bisect.bisect_right(order, NO_TIME, key=times.__getitem__)
+            order = order[skip:]
+            sorted_times = array("q", [times[num] for num in order])
+            first_lines = array("I", order)
+            for pos in range(len(first_lines) - 2, -1, -1):
+                first_lines[pos] = min(first_lines[pos], first_lines[pos + 1])
+            self.time_index = sorted_times, first_lines
+        return self.time_index
+
+    def find_time(self, d_t: datetime, after: bool = False) -> int | None:
+        """
+        Find the first line with timestamp at the given time or later
+
+        With after the lines exactly at the given time are skipped.
+        Return None when there is no such line.
+        """
+        sorted_times, first_lines = self.get_time_index()
+        if after:
+            pos = bisect.bisect_right(sorted_times, to_micros(d_t))
+        else:
+            pos = bisect.bisect_left(sorted_times, to_micros(d_t))
+        if pos < len(first_lines):
+            return first_lines[pos]
+        return None
+
+    def get_time_window(self, start: datetime | None, end: datetime | None) -> LogLinesView:
+        """
+        Get the lines between the start and end time, both included, without copying
+
+        The window is from the first line at the start to the first line after the end,
+        lines without timestamp inside are kept. Open ends are given as None.
+        """
+        first = 0
+        if start is not None:
+            found = self.find_time(start)
+            first = len(self.lines) if found is None else found
+        stop = len(self.lines)
+        if end is not None:
+            found = self.find_time(end, after=True)
+            stop = len(self.lines) if found is None else found
+        return self.lines.view(first, stop)
 
     def get_first_datetime(self) -> datetime | None:
         """
         Get the first valid datetime from the log lines
         """
-        for line in self.lines:
-            if d_t := extract_datetime(line):
-                return d_t
+        for num, micros in enumerate(self.get_times()):
+            if micros != NO_TIME:
+                return extract_datetime(self.lines[num])
         return None
 
     def get_last_datetime(self) -> datetime | None:
         """
         Get the last valid datetime from the log lines
         """
-        for line in reversed(self.lines):
-            if d_t := extract_datetime(line):
-                return d_t
+        times = self.get_times()
+        for num in range(len(times) - 1, -1, -1):
+            if times[num] != NO_TIME:
+                return extract_datetime(self.lines[num])
         return None
 
-    def finalize(self) -> None:
+    def analyze(self) -> BlockResult:
+        """
+        Do the heavy part of the finalization, find timestamps and pattern lines
+
+        It depends only on the lines and the patterns, so it can run in another process.
+        The free search is not searched here, it runs in the background, see log_search.
+        """
+        times = self.get_times()
+        patterns = list(self.patterns.get_yaml_patterns())
+        matcher = PatternMatcher(patterns)
+        pattern_lines = matcher.search(self.lines)
+        return (
+            self.get_first_datetime(),
+            self.get_last_datetime(),
+            pattern_lines,
+            times,
+            matcher.costs,
+            {pattern.p_id: pattern.raw_pattern for pattern in patterns},
+        )
+
+    def finalize(self, result: BlockResult | None = None) -> None:
         """
         Close this group, collect data
+
+        The result of the analysis can be provided when it was done elsewhere.
+        Patterns edited since the analysis are searched again.
         """
         if not self.lines:
             return
-        self.start = self.get_first_datetime()
+        if result is None:
+            result = self.analyze()
+        self.start, self.end, pattern_lines, times, self.costs, searched = result
+        self.pattern_lines.update(pattern_lines)
+        self.searched = dict(searched)
+        if len(times) == len(self.lines):
+            self.times = times
+        self.time_index = None
+        edited = [
+            pattern
+            for pattern in self.patterns.get_yaml_patterns()
+            if self.searched.get(pattern.p_id) != pattern.raw_pattern
+        ]
+        if edited:
+            self.search_patterns(edited)
+        else:
+            self.update_visible_lines()
+        self.update_props()
+
+    def process_new_lines(self, first: int) -> None:
+        """
+        Process the lines added after the finalization, starting from the given line
+
+        Only the new lines are searched, the hits are appended to the existing ones.
+        The free search is left to the background search, like in analyze.
+        """
+        new_lines = self.lines[first:]
+        if not new_lines:
+            return
+        matcher = PatternMatcher(self.patterns.get_yaml_patterns())
+        for p_id, hits in matcher.search(new_lines).items():
+            self.pattern_lines.setdefault(p_id, array("I")).extend(num + first for num in hits)
+        for p_id, cost in matcher.costs.items():
+            old = self.costs.get(p_id, (0.0, 0, 0, False))
+            self.costs[p_id] = (
+                old[0] + cost[0],
+                old[1] + cost[1],
+                old[2] + cost[2],
+                old[3] or cost[3],
+            )
+        self.get_times()
+        self.time_index = None
+        if self.start is None:
+            self.start = self.get_first_datetime()
+        # the new lines are at the end, so only those are checked typically
         self.end = self.get_last_datetime()
+        self.extend_visible_lines(first)
+        self.update_props()
+
+    def update_props(self) -> None:
+        """
+        Collect the block data into the properties and the name
+        """
         self.duration = calculate_delta(self.start, self.end)
-        self.search_patterns()
         self.has_needed = self.check_needed()
-        suffix = "OK" if self.has_needed else "Crash"
-        self.props.append(f"Start: {self.start}")
-        self.props.append(f"End: {self.end}")
-        self.props.append(f"Duration: {self.duration}")
-        self.props.append(f"Lines: {len(self.lines)}")
-        self.props.append(f"Result: {suffix}")
-        self.name = f"{self.num:0>2d} {self.name} {suffix}"
+        suffix = RESULTS[self.has_needed]
+        self.props = [
+            f"Name: {self.base_name}",
+            f"Start: {self.start}",
+            f"End: {self.end}",
+            f"Duration: {self.duration}",
+            f"Lines: {len(self.lines)}",
+            f"Result: {suffix}",
+        ]
+        if self.has_needed is None:
+            self.props.append(
+                "Needed patterns stopped as too slow: " + ", ".join(self.get_stopped())
+            )
+        self.name = f"{self.num:0>2d} {self.base_name} {suffix}"
 
-    def search_patterns(self) -> None:
+    def search_patterns(self, patterns: Iterable[LogPattern] | None = None) -> None:
         """
-        Search the lines for all the patterns and record line numbers
+        Search the lines for the given or all the patterns and record line numbers
+
+        Patterns without regex, like an emptied free search, have no lines.
+        Given patterns are only searched when their regex changed, e.g. when
+        only the style or visibility was edited.
         """
-        for pattern in self.patterns.get_all_patterns():
-            if pattern.raw_pattern:
-                # Do not search for empty things like free search
-                self.search_pattern(pattern)
+        if patterns is None:
+            patterns = list(self.patterns.get_all_patterns())
+        else:
+            patterns = [
+                pattern
+                for pattern in patterns
+                if self.searched.get(pattern.p_id) != pattern.raw_pattern
+                or pattern.p_id not in self.pattern_lines
+            ]
+        for pattern in patterns:
+            if not pattern.raw_pattern:
+                self.pattern_lines[pattern.p_id] = array("I")
+            self.searched[pattern.p_id] = pattern.raw_pattern
+        if patterns:
+            matcher = PatternMatcher(patterns)
+            self.pattern_lines.update(matcher.search(self.lines))
+            self.costs.update(matcher.costs)
+        self.update_visible_lines()
 
     def search_pattern(self, pattern: LogPattern) -> None:
         """
         Search the lines for a pattern and record line numbers
         """
-        lines = []
+        lines = array("I")
         for num, line in enumerate(self.lines):
             if pattern.search(line):
                 lines.append(num)
         self.pattern_lines[pattern.p_id] = lines
+        self.searched[pattern.p_id] = pattern.raw_pattern
+
+    def set_hits(self, p_id: str, raw_pattern: str, hits: array[int], first: int = 0) -> None:
+        """
+        Record the hits of a pattern searched elsewhere, like in a background thread
+
+        When only the lines from the first line were searched, the earlier hits are kept.
+        """
+        self.pattern_lines[p_id] = hits
+        self.searched[p_id] = raw_pattern
+        self.update_visible_lines(first)
 
-    def check_needed(self) -> bool:
+    def get_visible_tail(self, first: int) -> array[int] | None:
+        """
+        Get the lines to display from the first line, None when all are displayed
+
+        A line is hidden when a not visible pattern matches it and no visible
+        pattern does, so highlighted lines are always shown.
+        """
+        flags = bytearray(b"\x01") * (len(self.lines) - first)
+        hidden = False
+        for pattern in self.patterns.get_all_patterns():
+            if not pattern.visible:
+                hits = self.pattern_lines.get(pattern.p_id, array("I"))
+                for line in hits[bisect.bisect_left(hits, first) :]:
+                    flags[line - first] = 0
+                    hidden = True
+        if not hidden:
+            return None
+        for pattern in self.patterns.get_all_patterns():
+            if pattern.visible:
+                hits = self.pattern_lines.get(pattern.p_id, array("I"))
+                for line in hits[bisect.bisect_left(hits, first) :]:
+                    flags[line - first] = 1
+        if 0 not in flags:
+            return None
+        return array("I", itertools.compress(range(first, len(self.lines)), flags))
+
+    def update_visible_lines(self, first: int = 0) -> None:
+        """
+        Collect the lines to display
+
+        Only the lines from the first line are checked, the earlier ones keep their
+        visibility. A changed collection is a new array, so a display can notice it.
+        """
+        tail = self.get_visible_tail(first)
+        if not first or self.visible_lines is None:
+            if tail is None:
+                if not first:
+                    self.visible_lines = None
+                return
+            self.visible_lines = array("I", range(first)) + tail if first else tail
+            return
+        if tail is None:
+            tail = array("I", range(first, len(self.lines)))
+        pos = bisect.bisect_left(self.visible_lines, first)
+        if self.visible_lines[pos:] != tail:
+            self.visible_lines = self.visible_lines[:pos] + tail
+
+    def extend_visible_lines(self, first: int) -> None:
+        """
+        Add the lines appended from the first line to the lines to display
+
+        New lines do not change the visibility of the earlier ones, a display
+        only appends them, so the collection is extended in place.
+        """
+        tail = self.get_visible_tail(first)
+        if self.visible_lines is None:
+            if tail is not None:
+                self.visible_lines = array("I", range(first)) + tail
+            return
+        self.visible_lines.extend(range(first, len(self.lines)) if tail is None else tail)
+
+    def get_visible_lines(self) -> Sequence[int]:
+        """
+        Get the original line numbers of the displayed lines
+        """
+        if self.visible_lines is None:
+            return range(len(self.lines))
+        return self.visible_lines
+
+    def is_line_visible(self, line: int) -> bool:
+        """
+        Check whether the original line is displayed
+        """
+        visible_lines = self.get_visible_lines()
+        pos = bisect.bisect_left(visible_lines, line)
+        return pos < len(visible_lines) and visible_lines[pos] == line
+
+    def to_display_line(self, line: int) -> int:
+        """
+        Convert an original line number to the displayed one
+
+        Hidden lines are converted to the next displayed line.
+        """
+        visible_lines = self.get_visible_lines()
+        pos = bisect.bisect_left(visible_lines, line)
+        return max(min(pos, len(visible_lines) - 1), 0)
+
+    def from_display_line(self, line: int) -> int:
+        """
+        Convert a displayed line number to the original one
+        """
+        visible_lines = self.get_visible_lines()
+        if not visible_lines:
+            return 0
+        return visible_lines[max(min(line, len(visible_lines) - 1), 0)]
+
+    def get_line_styles(self) -> array[int]:
+        """
+        Get the style number of every displayed line, later patterns override the earlier ones
+
+        Patterns without a style number yet are skipped, 0 is the default style.
+        """
+        styles = array("B", bytes(len(self.lines)))
+        for pattern in self.patterns.get_all_patterns():
+            if pattern.style_num < 0:
+                continue
+            for line in self.pattern_lines.get(pattern.p_id, ()):
+                styles[line] = pattern.style_num
+        if self.visible_lines is not None:
+            return array("B", map(styles.__getitem__, self.visible_lines))
+        return styles
+
+    def find_hit(self, p_id: str, line: int, direction: str) -> int | None:
+        """
+        Find a hit of the pattern relative to the line, return its index in the hits
+
+        Directions: '<' previous, '>' next, '^' first, '$' last hit.
+        Return None when there is no such hit.
+        """
+        hits = self.pattern_lines.get(p_id)
+        if not hits:
+            return None
+        if direction == ">":
+            pos = bisect.bisect_right(hits, line)
+        elif direction == "<":
+            pos = bisect.bisect_left(hits, line) - 1
+        elif direction == "^":
+            pos = 0
+        else:
+            pos = len(hits) - 1
+        if 0 <= pos < len(hits):
+            return pos
+        return None
+
+    def check_needed(self) -> bool | None:
         """
         Check whether all the needed patterns were found or not
+
+        Return None when it is unknown, because a needed pattern was not found
+        but its search was stopped as too slow.
         """
+        stopped = False
         for pattern in self.patterns.get_all_patterns():
             if pattern.needed:
                 if not self.pattern_lines[pattern.p_id]:
-                    return False
-        return True
+                    if not self.costs.get(pattern.p_id, (0.0, 0, 0, False))[3]:
+                        return False
+                    stopped = True
+        return None if stopped else True
+
+    def has_stopped(self) -> bool:
+        """
+        Check whether the search of a pattern was stopped as too slow
+        """
+        return any(stopped for _, _, _, stopped in self.costs.values())
 
-    def alter_line(self, line: str) -> str:
+    def get_stopped(self) -> list[str]:
+        """
+        Get the names of the needed patterns not found because they were stopped
+        """
+        return [
+            pattern.name
+            for pattern in self.patterns.get_all_patterns()
+            if pattern.needed
+            and not self.pattern_lines[pattern.p_id]
+            and self.costs.get(pattern.p_id, (0.0, 0, 0, False))[3]
+        ]
+
+    def alter_line(self, line: str, micros: int | None = None) -> str:
         """
         Change how lines are displayed.
 
         At first change type to letter code and timestamp to delta
+        The timestamp of the line can be given from the timestamp column.
         """
         parts = line.split()
         if len(parts) < 2:
@@ -166,25 +556,87 @@ class LogBlock:
         except KeyError:
             return line
         if self.start is not None:
-            try:
-                delta = datetime.fromisoformat(parts[1]) - self.start
-            except ValueError:
+            if micros is None:
+                d_t = extract_datetime(line)
+                micros = NO_TIME if d_t is None else to_micros(d_t)
+            if micros == NO_TIME:
                 return " ".join(parts)
+            delta = timedelta(microseconds=micros - to_micros(self.start))
             # str(delta) result something like '0:07:05.258000'
             parts[1] = str(delta)[:-3]
         return " ".join(parts)
 
     def get_text(self) -> str:
         """
-        Return all lines to display
+        Return all the lines to display, hidden ones are left out
         """
         # this change will have a button on the UI later
         if False:
-            return "\n".join(self.alter_line(line) for line in self.lines)
-        return "\n".join(self.lines)
+            times = self.get_times()
+            return "\n".join(
+                self.alter_line(line, micros)
+                for line, micros in zip(self.lines, times, strict=True)
+            )
+        if self.visible_lines is not None:
+            lines = self.lines
+            return "\n".join([lines[num] for num in self.visible_lines])
+        return self.lines.get_text()
+
+    def get_summary(self) -> dict[str, Any]:
+        """
+        Return the collected data in a machine readable form
+        """
+        return {
+            "num": self.num,
+            "name": self.base_name,
+            "start": None if self.start is None else self.start.isoformat(),
+            "end": None if self.end is None else self.end.isoformat(),
+            "duration": self.duration,
+            "lines": len(self.lines),
+            "result": RESULTS[self.has_needed],
+            "hits": {
+                pattern.name: len(self.pattern_lines[pattern.p_id])
+                for pattern in self.patterns.get_yaml_patterns()
+            },
+        }
+
+    def get_cost_name(self, p_id: str) -> str:
+        """
+        Get the name of a pattern in the cost reports
+        """
+        if p_id == PREFILTER_ID:
+            return "Combined prefilter"
+        pattern = self.patterns.get_pattern(p_id)
+        return p_id if pattern is None else pattern.name
+
+    def get_costs(self) -> dict[str, dict[str, Any]]:
+        """
+        Return the search costs of the patterns in a machine readable form
+        """
+        return {
+            self.get_cost_name(p_id): {
+                "seconds": seconds,
+                "lines": lines,
+                "hits": hits,
+                "stopped": stopped,
+            }
+            for p_id, (seconds, lines, hits, stopped) in self.costs.items()
+        }
 
     def get_props(self) -> str:
         """
-        Return the collected data
+        Return the collected data, with the search costs, the slowest pattern first
         """
-        return "\n".join(self.props)
+        props = list(self.props)
+        if self.costs:
+            props.append("Search costs:")
+            costs = sorted(self.costs.items(), key=lambda item: item[1][0], reverse=True)
+            props.extend(format_cost(self.get_cost_name(p_id), cost) for p_id, cost in costs)
+        return "\n".join(props)
+
+
+def analyze_block(block: LogBlock) -> BlockResult:
+    """
+    Analyze a block, module level function to be usable in a process pool
+    """
+    return block.analyze()
@@ -7,44 +7,294 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
-from collections import UserList
+import itertools
+from collections import UserList, deque
+from collections.abc import Iterable, Iterator
 
-from logtools.log_block import LogBlock
+# ProcessPoolExecutor is imported only when it is first used, see concurrent.futures
+from concurrent import futures
+
+from logtools.log_block import BlockResult, LogBlock, analyze_block
+from logtools.log_cache import CachedBlock
+from logtools.log_matcher import BlockSplitter
 from logtools.log_patterns import LogPatterns
 
 
+# below this amount of lines starting worker processes costs more than it saves
+PARALLEL_MIN_LINES = 100_000
+# when blocks are finalized one by one only the big ones go to the workers
+PARALLEL_BLOCK_LINES = 20_000
+
+
+def finalize_blocks(blocks: list[LogBlock], workers: int = 1) -> None:
+    """
+    Finalize the blocks, using a process pool when there is enough work
+
+    Blocks are independent, the workers do the analysis and only the compact
+    results come back, the finalization itself stays in this process.
+    """
+    total_lines = sum(len(block.lines) for block in blocks)
+    if workers < 2 or len(blocks) < 2 or total_lines < PARALLEL_MIN_LINES:
+        for block in blocks:
+            block.finalize()
+        return
+    with futures.ProcessPoolExecutor(max_workers=min(workers, len(blocks))) as executor:
+        for block, result in zip(blocks, executor.map(analyze_block, blocks), strict=True):
+            block.finalize(result)
+
+
+def tag_lines(
+    lines: Iterable[str], sources: Iterable[int] | None
+) -> Iterator[tuple[str, int | None]]:
+    """
+    Pair the lines with their sources, or with None when there are no sources
+    """
+    if sources is None:
+        return ((line, None) for line in lines)
+    return zip(lines, sources, strict=False)
+
+
+def finalize_pending(
+    pending: deque[tuple[LogBlock, futures.Future[BlockResult] | None]],
+) -> LogBlock:
+    """
+    Finalize the first pending block, with the result of its worker if any
+    """
+    block, future = pending.popleft()
+    block.finalize(None if future is None else future.result())
+    return block
+
+
 class LogBlocks(UserList[LogBlock]):
     """
     Collection of log blocks
+
+    Only finalized blocks are in the collection, so other threads can use
+    them while the next ones are loaded. Closed blocks wait in pending.
     """
 
     def __init__(self, patterns: LogPatterns) -> None:
         super().__init__()
         self.patterns = patterns
+        self.splitter = BlockSplitter(patterns.get_block_starts())
         self.act = LogBlock(self.patterns, num=1)
+        # closed but not yet finalized blocks, in order
+        self.pending: deque[LogBlock] = deque()
+        # whether the cached blocks matched the lines read, see iter_restore
+        self.restored = True
 
     def new_block(self, name: str) -> None:
         """
         Start a new block
         """
-        self.finalize()
-        self.act = LogBlock(self.patterns, num=len(self.data) + 1, name=name)
+        self.close_block()
+        num = len(self.data) + len(self.pending) + 1
+        self.act = LogBlock(self.patterns, num=num, name=name)
 
-    def add_line(self, line: str) -> None:
+    def add_line(self, line: str, source: int | None = None) -> None:
         """
         Add a new line to the actual block or start a new one when needed
+
+        Source is the index of the log file, given when the logs are merged.
+        """
+        if (name := self.splitter.match(line)) is not None:
+            self.new_block(name)
+        self.act.add(line, source)
+
+    def close_block(self) -> None:
+        """
+        Close the collection of the actual block, it is finalized later
+        """
+        if (
+            self.act.lines
+            and not (self.pending and self.pending[-1] is self.act)
+            and not (self.data and self.data[-1] is self.act)
+        ):
+            # do not add empty or already added
+            self.pending.append(self.act)
+
+    def publish(self, block: LogBlock) -> None:
+        """
+        Move a finalized block from the pending ones to the collection
+        """
+        if self.pending and self.pending[0] is block:
+            self.pending.popleft()
+            self.data.append(block)
+
+    def finalize(self, workers: int = 1) -> None:
         """
-        for pattern in self.patterns.get_block_starts():
-            if match := pattern.search(line):
-                self.new_block(match[int(pattern.property)])
-            break
-        self.act.add(line)
+        Close the actual block and finalize all the collected blocks
+        """
+        self.close_block()
+        blocks = list(self.pending)
+        finalize_blocks(blocks, workers)
+        for block in blocks:
+            self.publish(block)
+
+    def iter_closed_blocks(
+        self, lines: Iterable[str], sources: Iterable[int] | None = None
+    ) -> Iterator[LogBlock]:
+        """
+        Add the lines and yield the blocks when they are closed
+        """
+        for line, source in tag_lines(lines, sources):
+            closed = len(self.pending)
+            self.add_line(line, source)
+            if len(self.pending) > closed:
+                yield self.pending[-1]
+        closed = len(self.pending)
+        self.close_block()
+        if len(self.pending) > closed:
+            yield self.pending[-1]
+
+    def iter_closed_chunk_blocks(self, chunks: Iterable[str]) -> Iterator[LogBlock]:
+        """
+        Add decoded chunks of lines and yield the blocks when they are closed
+
+        The block starts of a chunk are found first, then the lines between
+        them are added to the blocks at once.
+        """
+        for text in chunks:
+            lines = text.splitlines()
+            first = 0
+            for num, name in self.splitter.find_starts(text, lines):
+                self.act.lines.extend(lines[first:num])
+                closed = len(self.pending)
+                self.new_block(name)
+                if len(self.pending) > closed:
+                    yield self.pending[-1]
+                first = num
+            self.act.lines.extend(lines[first:] if first else lines)
+        closed = len(self.pending)
+        self.close_block()
+        if len(self.pending) > closed:
+            yield self.pending[-1]
+
+    def iter_finalized(
+        self, closed_blocks: Iterable[LogBlock], workers: int = 1
+    ) -> Iterator[LogBlock]:
+        """
+        Finalize the closed blocks and yield them in order as soon as they are ready
+
+        Big blocks are analyzed in worker processes while the next lines are read,
+        the small ones are finalized here. The blocks get into the collection
+        when they are finalized.
+        """
+        pending: deque[tuple[LogBlock, futures.Future[BlockResult] | None]] = deque()
+        executor: futures.ProcessPoolExecutor | None = None
+        try:
+            for block in closed_blocks:
+                future = None
+                if workers > 1 and len(block.lines) >= PARALLEL_BLOCK_LINES:
+                    if executor is None:
+                        executor = futures.ProcessPoolExecutor(max_workers=workers)
+                    future = executor.submit(analyze_block, block)
+                pending.append((block, future))
+                # the blocks are given in order, so wait for the first one
+                while pending and (pending[0][1] is None or pending[0][1].done()):
+                    yield self.publish_pending(pending)
+            while pending:
+                yield self.publish_pending(pending)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def publish_pending(
+        self, pending: deque[tuple[LogBlock, futures.Future[BlockResult] | None]]
+    ) -> LogBlock:
+        """
+        Finalize the first pending block and move it to the collection
+        """
+        block = finalize_pending(pending)
+        self.publish(block)
+        return block
 
-    def finalize(self) -> None:
+    def iter_add_lines(
+        self, lines: Iterable[str], workers: int = 1, sources: Iterable[int] | None = None
+    ) -> Iterator[LogBlock]:
         """
-        Finalize the collection of the actual block
+        Add the lines and yield the blocks in order as soon as they are finalized
+        """
+        return self.iter_finalized(self.iter_closed_blocks(lines, sources), workers)
+
+    def iter_add_chunks(self, chunks: Iterable[str], workers: int = 1) -> Iterator[LogBlock]:
+        """
+        Add decoded chunks and yield the blocks in order as soon as they are finalized
+        """
+        return self.iter_finalized(self.iter_closed_chunk_blocks(chunks), workers)
+
+    def follow(
+        self, lines: Iterable[str], sources: Iterable[int] | None = None
+    ) -> list[LogBlock]:
+        """
+        Add lines after the finalization, return the blocks started by them
+
+        The actual block and the new blocks process only the new lines.
+        The block starts are searched with the actual patterns, they may be edited.
+        """
+        self.splitter = BlockSplitter(self.patterns.get_block_starts())
+        first = len(self.act.lines)
+        new_blocks = []
+        for line, source in tag_lines(lines, sources):
+            act = self.act
+            self.add_line(line, source)
+            if self.act is not act:
+                act.process_new_lines(first)
+                first = 0
+                new_blocks.append(self.act)
+        self.close_block()
+        self.act.process_new_lines(first)
+        # new blocks are processed only now
+        while self.pending:
+            self.publish(self.pending[0])
+        return new_blocks
+
+    def iter_restore(
+        self,
+        lines: Iterable[str],
+        blocks: list[CachedBlock],
+        sources: Iterable[int] | None = None,
+    ) -> Iterator[LogBlock]:
+        """
+        Split the lines to blocks with already known sizes and analysis results
+
+        The blocks are yielded one by one as they are restored. When the lines
+        do not add up to the cached sizes the cache is not valid for them: a short
+        block is analyzed again, the lines left are processed like followed ones.
         """
-        self.act.finalize()
-        if self.act.lines:
-            # do not add empty
+        lines = iter(lines)
+        tagged = None if sources is None else zip(lines, sources, strict=False)
+        self.restored = True
+        # the cache was made with the patterns as they are now, they can be edited meanwhile
+        searched = {
+            pattern.p_id: pattern.raw_pattern for pattern in self.patterns.get_yaml_patterns()
+        }
+        for name, count, result in blocks:
+            self.act = LogBlock(self.patterns, num=len(self.data) + 1, name=name)
+            if tagged is None:
+                self.act.lines.extend(itertools.islice(lines, count))
+            else:
+                for line, source in itertools.islice(tagged, count):
+                    self.act.add(line, source)
+            if len(self.act.lines) != count:
+                self.restored = False
+                if self.act.lines:
+                    self.act.finalize()
+                    self.data.append(self.act)
+                    yield self.act
+                return
+            self.act.finalize((*result[:5], searched))
             self.data.append(self.act)
+            yield self.act
+        if tagged is None:
+            rest = list(lines)
+            if rest:
+                self.restored = False
+                yield from self.follow(rest)
+        else:
+            rest_tagged = list(tagged)
+            if rest_tagged:
+                self.restored = False
+                yield from self.follow(
+                    [line for line, _ in rest_tagged], [source for _, source in rest_tagged]
+                )
@@ -0,0 +1,198 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import struct
+from array import array
+from collections.abc import Iterable
+from datetime import datetime
+
+from logtools.log_block import BlockResult, LogBlock
+from logtools.log_patterns import LogPatterns
+
+
+# increase when the file format or the block processing changes
+CACHE_VERSION = 1
+MAGIC = b"LTIX"
+HEADER = struct.Struct("<4sII")  # magic, version, length of the json part
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# name of the block, number of lines and the analysis result
+CachedBlock = tuple[str, int, BlockResult]
+
+
+def get_cache_key(
+    log_files: Iterable[pathlib.Path],
+    patterns: LogPatterns,
+    merge: bool = False,
+    follow: bool = False,
+) -> str:
+    """
+    Create a key from the log files identity, the patterns content and the reading mode
+
+    When following, a partly written last line is not read, so the lines differ.
+    """
+    mode = f"{'merge' if merge else 'chain'}|{'follow' if follow else 'whole'}"
+    digest = hashlib.sha256(f"{CACHE_VERSION}|{mode}".encode())
+    for log_file in log_files:
+        stat = log_file.stat()
+        digest.update(f"{log_file.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|".encode())
+    digest.update(patterns.get_hash().encode())
+    return digest.hexdigest()
+
+
+def datetime_to_str(d_t: datetime | None) -> str | None:
+    """
+    Store datetime as iso string, keeping the timezone if any
+    """
+    return None if d_t is None else d_t.isoformat()
+
+
+def str_to_datetime(text: str | None) -> datetime | None:
+    """
+    Reverse of datetime_to_str
+    """
+    return None if text is None else datetime.fromisoformat(text)
+
+
+def encode_blocks(blocks: Iterable[LogBlock]) -> bytes:
+    """
+    Encode the block data in a compact binary format
+
+    A small json header holds the block details and the hit counts per pattern,
+    followed by all the hit line numbers as one array of 32 bit integers.
+    """
+    header = []
+    hits = array("I")
+    for block in blocks:
+        counts = {}
+        for p_id, lines in block.pattern_lines.items():
+            counts[p_id] = len(lines)
+            hits.extend(lines)
+        header.append(
+            {
+                "name": block.base_name,
+                "lines": len(block.lines),
+                "start": datetime_to_str(block.start),
+                "end": datetime_to_str(block.end),
+                "hits": counts,
+            }
+        )
+    json_part = json.dumps(header, separators=(",", ":")).encode()
+    return HEADER.pack(MAGIC, CACHE_VERSION, len(json_part)) + json_part + hits.tobytes()
+
+
+def decode_blocks(data: bytes) -> list[CachedBlock] | None:
+    """
+    Decode the blocks stored by encode_blocks, return None when not valid
+    """
+    try:
+        magic, version, json_len = HEADER.unpack_from(data)
+    except struct.error:
+        return None
+    if magic != MAGIC or version != CACHE_VERSION:
+        return None
+    json_start = HEADER.size
+    header = json.loads(data[json_start : json_start + json_len])
+    hits = array("I")
+    hits.frombytes(data[json_start + json_len :])
+    result: list[CachedBlock] = []
+    pos = 0
+    for item in header:
+        pattern_lines = {}
+        for p_id, count in item["hits"].items():
+            pattern_lines[p_id] = hits[pos : pos + count]
+            pos += count
+        start = str_to_datetime(item["start"])
+        end = str_to_datetime(item["end"])
+        # timestamp column is not stored, parsed again when needed, no search costs either,
+        # the regexes are the ones of the cache key
+        result.append(
+            (item["name"], item["lines"], (start, end, pattern_lines, array("q"), {}, {}))
+        )
+    return result
+
+
+class IndexCache:
+    """
+    Store processed block data on disk so the same logs open fast next time
+
+    Entries are files in the cache folder, their modification time is
+    refreshed when used, the least recently used ones are removed when
+    the folder grows over the size limit.
+    """
+
+    def __init__(self, folder: pathlib.Path, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.folder = folder
+        self.max_size = max_size
+
+    def get_path(self, key: str) -> pathlib.Path:
+        """
+        Get the file of a cache entry
+        """
+        return self.folder / f"{key}.idx"
+
+    def load(self, key: str) -> list[CachedBlock] | None:
+        """
+        Load the cached blocks, return None when not found or not valid
+        """
+        path = self.get_path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        try:
+            return decode_blocks(data)
+        except (ValueError, KeyError, TypeError):
+            # corrupt entry, will be overwritten
+            return None
+
+    def save(self, key: str, blocks: Iterable[LogBlock]) -> None:
+        """
+        Save the blocks and make room for them if needed
+
+        Cache is only an optimization, errors are ignored. Blocks where a pattern
+        was stopped as too slow have only part of the hits, they are not saved.
+        """
+        blocks = list(blocks)
+        if any(block.has_stopped() for block in blocks):
+            return
+        data = encode_blocks(blocks)
+        if len(data) > self.max_size:
+            return
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.get_path(key).with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(self.get_path(key))
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries above the size limit
+        """
+        entries = []
+        for path in self.folder.glob("*.idx"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
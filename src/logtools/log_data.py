@@ -7,30 +7,243 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
+import itertools
+import os
 import pathlib
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING, Any
 
+from logtools.log_block import LogBlock
 from logtools.log_blocks import LogBlocks
+from logtools.log_cache import IndexCache, get_cache_key
 from logtools.log_patterns import LogPatterns
+from logtools.log_reader import LogFollower, iter_files_chunks, iter_merged_lines
+from logtools.utils import LogToolsError
+
+
+if TYPE_CHECKING:
+    # imported only when needed, NumPy makes it slow
+    from logtools.log_stats import LogStats
+
+
+# progress is reported after this many lines
+PROGRESS_LINES = 100_000
+
+# called with the bytes read and the total size of the logs
+ProgressCallback = Callable[[int, int], None]
 
 
 class LogData:
     """
     Parent class for the data, components will reach the data through this
+
+    Logs are loaded at creation, unless load is False, then iter_load can
+    be used to get the blocks one by one, for example in a background thread.
+    With merge the lines of the logs are interleaved by their timestamps,
+    otherwise the logs are read after each other, the oldest first.
+    With follow the lines appended later are read by follow, a partly written
+    last line is left for it.
     """
 
-    def __init__(self, patterns: LogPatterns, log_files: list[pathlib.Path]) -> None:
+    def __init__(
+        self,
+        patterns: LogPatterns,
+        log_files: list[pathlib.Path],
+        workers: int | None = None,
+        cache: IndexCache | None = None,
+        *,
+        load: bool = True,
+        merge: bool = False,
+        follow: bool = False,
+    ) -> None:
         self.patterns = patterns
         self.log_blocks = LogBlocks(patterns)
-        for log_file in sorted(log_files, key=lambda path: path.stat().st_mtime):
-            txt = log_file.read_text(encoding="latin2")
-            for line in txt.splitlines():
-                self.log_blocks.add_line(line)
-        self.log_blocks.finalize()
-        self.log_block = self.log_blocks[0]
+        self.merge = merge
+        self.log_files = sorted(log_files, key=lambda path: path.stat().st_mtime)
+        self.total_size = sum(log_file.stat().st_size for log_file in self.log_files)
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        # the reading tells the follower where to continue, when following
+        # a partly written last line is left for it
+        self.follower = LogFollower(self.log_files, hold_partial=follow)
+        # empty placeholder until the first block is loaded
+        self.log_block = LogBlock(patterns)
         self.yaml_modified = False
+        # statistics are computed only when the blocks changed since the last time
+        self.stats: LogStats | None = None
+        self.stats_key: tuple[Any, ...] = ()
+        if load:
+            for _ in self.iter_load():
+                pass
+            self.check_loaded()
+            self.log_block = self.log_blocks[0]
+
+    def read_merged_lines(self) -> tuple[Iterator[str], Iterator[int]]:
+        """
+        Read the merged lines of all the log files and their source indexes
+        """
+        # the two are consumed together, so tee buffers only one item
+        merged_1, merged_2 = itertools.tee(iter_merged_lines(self.log_files, self.follower))
+        return (line for _, line in merged_1), (source for source, _ in merged_2)
+
+    def count_progress(
+        self, lines: Iterator[str], on_progress: ProgressCallback
+    ) -> Iterator[str]:
+        """
+        Pass the lines through and report the bytes read from time to time
+
+        The reader counts the raw bytes, so compressed files are measured
+        by their compressed size, like the total.
+        """
+        for num, line in enumerate(lines, 1):
+            if not num % PROGRESS_LINES:
+                on_progress(min(self.follower.bytes_read, self.total_size), self.total_size)
+            yield line
+
+    def count_chunk_progress(
+        self, chunks: Iterator[str], on_progress: ProgressCallback
+    ) -> Iterator[str]:
+        """
+        Pass the decoded chunks through and report the bytes read with every chunk
+        """
+        for text in chunks:
+            on_progress(min(self.follower.bytes_read, self.total_size), self.total_size)
+            yield text
+
+    def iter_load(self, on_progress: ProgressCallback | None = None) -> Iterator[LogBlock]:
+        """
+        Load the logs and yield the blocks as soon as they are finalized
+
+        Not merged logs are processed chunk by chunk, the block starts of a whole
+        chunk are found before the lines are added to the blocks.
+        The progress callback is called also at the end with the total size.
+        """
+        cache_key = (
+            get_cache_key(self.log_files, self.patterns, self.merge, self.follower.hold_partial)
+            if self.cache
+            else ""
+        )
+        cached = self.cache.load(cache_key) if self.cache else None
+        if self.merge:
+            lines, sources = self.read_merged_lines()
+            if on_progress is not None:
+                lines = self.count_progress(lines, on_progress)
+            if cached is not None:
+                # block boundaries and search results are known, only lines are needed
+                yield from self.log_blocks.iter_restore(lines, cached, sources)
+            else:
+                yield from self.log_blocks.iter_add_lines(lines, self.workers, sources)
+        else:
+            chunks = iter_files_chunks(self.log_files, self.follower)
+            if on_progress is not None:
+                chunks = self.count_chunk_progress(chunks, on_progress)
+            if cached is not None:
+                lines = itertools.chain.from_iterable(text.splitlines() for text in chunks)
+                yield from self.log_blocks.iter_restore(lines, cached)
+            else:
+                yield from self.log_blocks.iter_add_chunks(chunks, self.workers)
+        if self.cache and (cached is None or not self.log_blocks.restored):
+            self.cache.save(cache_key, self.log_blocks)
+        if on_progress is not None:
+            on_progress(self.total_size, self.total_size)
+
+    def check_loaded(self) -> None:
+        """
+        Check that the logs had some lines
+        """
+        if not self.log_blocks:
+            msg = f"No log lines found in {', '.join(str(f) for f in self.log_files)}"
+            raise LogToolsError(msg)
 
     def set_block(self, num: int) -> None:
         """
         Set a shortcut to the actual selected log
         """
         self.log_block = self.log_blocks[num]
+
+    def follow(self) -> list[LogBlock]:
+        """
+        Process the lines appended to the log files, return the new blocks
+        """
+        lines = self.follower.read_new_lines()
+        sources = self.follower.last_sources if self.merge else None
+        return self.log_blocks.follow(lines, sources)
+
+    def get_stats(self) -> LogStats:
+        """
+        Get the statistics of all the blocks, cached until the blocks change
+        """
+        key = (
+            tuple(pattern.name for pattern in self.patterns.get_yaml_patterns()),
+            *(
+                (block.name, len(block.lines), *block.searched.values())
+                for block in self.log_blocks
+            ),
+        )
+        if self.stats is None or key != self.stats_key:
+            from logtools.log_stats import LogStats  # noqa: PLC0415 - import only when needed
+
+            self.stats = LogStats(self.log_blocks, self.patterns)
+            self.stats_key = key
+        return self.stats
+
+
+class LogLoader:
+    """
+    Load the logs in a background thread, the results are queued until they are taken
+
+    Loading can start before its user exists, e.g. while the GUI is imported.
+    Events are tuples of a kind and a value: 'progress' with the bytes read and
+    the total size, 'block' with a loaded block, 'error' with the message and
+    'done' at the end.
+    """
+
+    def __init__(self, app_data: LogData) -> None:
+        self.app_data = app_data
+        self.events: queue.SimpleQueue[tuple[str, Any]] = queue.SimpleQueue()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        """
+        Start the loading thread
+        """
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the loading after the actual block
+        """
+        self.stopped = True
+
+    def run(self) -> None:
+        """
+        Loading thread
+        """
+        try:
+            for block in self.app_data.iter_load(self.report_progress):
+                if self.stopped:
+                    return
+                self.events.put(("block", block))
+        except Exception as exc:  # noqa: BLE001 - any error is passed to the user
+            self.events.put(("error", str(exc)))
+            return
+        self.events.put(("done", None))
+
+    def report_progress(self, bytes_read: int, total: int) -> None:
+        """
+        Queue the progress of the loading
+        """
+        self.events.put(("progress", (bytes_read, total)))
+
+    def iter_events(self) -> Iterator[tuple[str, Any]]:
+        """
+        Get the events as they come, until the loading is done or failed
+        """
+        while True:
+            event = self.events.get()
+            yield event
+            if event[0] in {"done", "error"}:
+                return
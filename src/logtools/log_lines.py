@@ -0,0 +1,273 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import overload
+
+
+# appended lines are joined to a chunk after this many lines
+CHUNK_LINES = 4096
+
+
+class LogLines:
+    """
+    Lines of a log block stored in text buffers with the line offsets
+
+    Every line is followed by a newline in the buffer, the offset array holds
+    the start of every line plus the end of the buffer. Compared to a list of
+    strings the overhead is 8 bytes per line instead of 50+.
+    Appended lines are collected in chunks and joined into a new buffer
+    when the lines are read first. A buffer is merged with the following one
+    only while it is not bigger, so the big buffer of a followed log is not
+    copied again for every few appended lines, and the buffers stay few.
+    """
+
+    __slots__ = ("_chunks", "_first_lines", "_offsets", "_parts", "_texts")
+
+    def __init__(self, lines: Iterable[str] = ()) -> None:
+        # buffers of whole lines and the number of their first lines
+        self._texts: list[str] = []
+        self._first_lines = array("Q")
+        self._offsets = array("Q", [0])
+        # appended but not yet joined lines and chunks of lines
+        self._parts: list[str] = []
+        self._chunks: list[str] = []
+        self.extend(lines)
+
+    def append(self, line: str) -> None:
+        """
+        Add a line
+        """
+        self._parts.append(line)
+        self._offsets.append(self._offsets[-1] + len(line) + 1)
+        if len(self._parts) >= CHUNK_LINES:
+            self._chunks.append("\n".join(self._parts) + "\n")
+            self._parts = []
+
+    def extend(self, lines: Iterable[str]) -> None:
+        """
+        Add several lines, calculating the offsets of a batch at once
+        """
+        iterator = iter(lines)
+        while batch := list(itertools.islice(iterator, CHUNK_LINES)):
+            offsets = itertools.accumulate(
+                map((1).__add__, map(len, batch)), initial=self._offsets[-1]
+            )
+            next(offsets)  # initial value is already stored
+            self._offsets.extend(offsets)
+            self._parts.extend(batch)
+            if len(self._parts) >= CHUNK_LINES:
+                self._chunks.append("\n".join(self._parts) + "\n")
+                self._parts = []
+
+    def _compact(self) -> None:
+        """
+        Join the appended lines into a new buffer, merging the not bigger buffers before
+        """
+        if self._parts:
+            self._chunks.append("\n".join(self._parts) + "\n")
+            self._parts = []
+        if not self._chunks:
+            return
+        # the first line not in the buffers yet
+        first = 0
+        if self._texts:
+            end = self._offsets[self._first_lines[-1]] + len(self._texts[-1])
+            first = bisect.bisect_left(self._offsets, end)
+        text = "".join(self._chunks)
+        self._chunks = []
+        while self._texts and len(self._texts[-1]) <= len(text):
+            text = self._texts.pop() + text
+            first = self._first_lines.pop()
+        self._texts.append(text)
+        self._first_lines.append(first)
+
+    def _iter_slices(self, start: int, stop: int) -> Iterator[str]:
+        """
+        Iterate the lines of a range, slicing them from the buffers one by one
+        """
+        self._compact()
+        offsets = self._offsets
+        texts = self._texts
+        first_lines = self._first_lines
+        buffer = bisect.bisect_right(first_lines, start) - 1
+        while start < stop:
+            text = texts[buffer]
+            base = offsets[first_lines[buffer]]
+            buffer += 1
+            end = first_lines[buffer] if buffer < len(texts) else len(self)
+            end = min(end, stop)
+            for line_start, line_end in itertools.islice(itertools.pairwise(offsets), start, end):
+                yield text[line_start - base : line_end - base - 1]
+            start = end
+
+    def __len__(self) -> int:
+        """
+        Number of lines
+        """
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        """
+        Get a line or a list of lines
+        """
+        self._compact()
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = "line index out of range"
+            raise IndexError(msg)
+        buffer = bisect.bisect_right(self._first_lines, index) - 1
+        base = self._offsets[self._first_lines[buffer]]
+        start = self._offsets[index] - base
+        return self._texts[buffer][start : self._offsets[index + 1] - base - 1]
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate the lines, slicing them from the buffers one by one
+        """
+        return self._iter_slices(0, len(self))
+
+    def __reversed__(self) -> Iterator[str]:
+        """
+        Iterate the lines backwards
+        """
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Compare the lines with other lines or a list of strings
+        """
+        if isinstance(other, LogLines):
+            return self.get_text() == other.get_text() and len(self) == len(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """
+        Short representation, lines can be too many to show
+        """
+        return f"LogLines({len(self)} lines)"
+
+    def iter_range(self, start: int, stop: int | None = None) -> Iterator[str]:
+        """
+        Iterate a range of the lines without copying them to a list
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        return self._iter_slices(max(start, 0), stop)
+
+    def copy(self) -> LogLines:
+        """
+        Copy of the lines sharing the text buffers, for reading in another thread
+
+        Only the offsets are copied, the buffers are not changed, only replaced.
+        """
+        self._compact()
+        lines = LogLines()
+        lines._texts = list(self._texts)
+        lines._first_lines = array("Q", self._first_lines)
+        lines._offsets = array("Q", self._offsets)
+        return lines
+
+    def view(self, first: int, stop: int) -> LogLinesView:
+        """
+        Get a range of the lines without copying them
+        """
+        return LogLinesView(self, first, stop)
+
+    def get_text(self) -> str:
+        """
+        Return the lines joined by newlines
+        """
+        self._compact()
+        if len(self._texts) == 1:
+            return self._texts[0][:-1]
+        return "".join(self._texts)[:-1]
+
+    def get_range_text(self, first: int, stop: int) -> str:
+        """
+        Return a range of the lines joined by newlines
+        """
+        self._compact()
+        first = max(first, 0)
+        stop = min(stop, len(self))
+        if first >= stop:
+            return ""
+        buffer = bisect.bisect_right(self._first_lines, first) - 1
+        if buffer == bisect.bisect_right(self._first_lines, stop - 1) - 1:
+            # the usual case, the whole range is in one buffer
+            base = self._offsets[self._first_lines[buffer]]
+            start = self._offsets[first] - base
+            return self._texts[buffer][start : self._offsets[stop] - base - 1]
+        return "\n".join(self._iter_slices(first, stop))
+
+
+class LogLinesView:
+    """
+    Read only range of log lines, like a time window of a block
+
+    The lines stay in the underlying LogLines, index 0 is the line first there.
+    """
+
+    __slots__ = ("first", "lines", "stop")
+
+    def __init__(self, lines: LogLines, first: int, stop: int) -> None:
+        self.lines = lines
+        self.first = max(first, 0)
+        self.stop = max(min(stop, len(lines)), self.first)
+
+    def __len__(self) -> int:
+        """
+        Number of lines
+        """
+        return self.stop - self.first
+
+    def __getitem__(self, index: int) -> str:
+        """
+        Get a line, index is relative to the view
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = "line index out of range"
+            raise IndexError(msg)
+        return self.lines[self.first + index]
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate the lines of the view
+        """
+        return self.lines.iter_range(self.first, self.stop)
+
+    def __repr__(self) -> str:
+        """
+        Short representation with the range
+        """
+        return f"LogLinesView({self.first}:{self.stop})"
+
+    def get_text(self) -> str:
+        """
+        Return the lines of the view joined by newlines
+        """
+        return self.lines.get_range_text(self.first, self.stop)
@@ -0,0 +1,233 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import itertools
+import re
+import time
+from array import array
+from collections.abc import Callable, Iterable
+
+from logtools.log_lines import LogLines
+from logtools.log_pattern import LogPattern
+
+
+# regex features that break when the pattern is embedded into a bigger one:
+# numbered backreferences and conditionals point to other groups,
+# global inline flags are only allowed at the start of the expression
+NOT_COMBINABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)")
+# regex features that see the neighbor lines when searching a whole buffer
+NOT_SCANNABLE = re.compile(r"\(\?<?[=!]|\\[AZ]")
+# lines searched between the checks of the time budget
+BUDGET_CHUNK_LINES = 1024
+# seconds a pattern may spend on one block before it is stopped as runaway,
+# a fixed part and an allowance per line, so big blocks are not stopped for their size
+PATTERN_BUDGET = 10.0
+PATTERN_LINE_BUDGET = 0.00002
+# cost key of the combined prefilter pass
+PREFILTER_ID = "*"
+
+# wall time in seconds, lines scanned, hits and whether it was stopped over the budget
+PatternCost = tuple[float, int, int, bool]
+
+
+def can_combine(pattern: LogPattern) -> bool:
+    """
+    Check whether the pattern can be part of a combined alternation
+    """
+    return not NOT_COMBINABLE.search(pattern.raw_pattern)
+
+
+def scan(
+    search: Callable[[str], object],
+    lines: Iterable[tuple[int, str]],
+    budget: float,
+    line_budget: float = 0.0,
+) -> tuple[array[int], int, bool]:
+    """
+    Collect the numbers of the lines matching, stop when the time budget is over
+
+    The budget is the fixed seconds plus the line budget for every line scanned.
+    Return the matching line numbers, the number of lines scanned and whether it was stopped.
+    The budget is checked between chunks, a single line cannot be interrupted.
+    """
+    found = array("I")
+    start = time.perf_counter()
+    scanned = 0
+    iterator = iter(lines)
+    while chunk := list(itertools.islice(iterator, BUDGET_CHUNK_LINES)):
+        found.extend(num for num, line in chunk if search(line))
+        scanned += len(chunk)
+        if time.perf_counter() - start > budget + scanned * line_budget:
+            return found, scanned, next(iterator, None) is not None
+    return found, scanned, False
+
+
+def format_cost(name: str, cost: PatternCost) -> str:
+    """
+    Format the cost of a pattern to a short text
+    """
+    seconds, lines, hits, stopped = cost
+    text = f"{name}: {seconds * 1000:.1f} ms, {lines} lines, {hits} hits"
+    return text + ", STOPPED as too slow" if stopped else text
+
+
+class PatternMatcher:
+    """
+    Search several patterns with a single pass over the lines
+
+    All the combinable patterns are joined into one alternation that is used
+    as a prefilter: it matches a line exactly when any of the patterns match it.
+    Only the lines passing the prefilter are checked with the patterns one by one,
+    so overlapping matches are recorded for every pattern. The rest of the
+    patterns fall back to the simple line by line search.
+
+    Every pattern has a time budget, growing with the lines, a runaway one is
+    stopped with the hits found so far. When the prefilter is over the budget
+    the patterns are searched one by one, so the culprit is found.
+    The costs of the last search are kept.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[LogPattern],
+        budget: float = PATTERN_BUDGET,
+        line_budget: float = PATTERN_LINE_BUDGET,
+    ) -> None:
+        # do not search for empty things like free search
+        self.patterns = [pattern for pattern in patterns if pattern.raw_pattern]
+        self.budget = budget
+        self.line_budget = line_budget
+        self.costs: dict[str, PatternCost] = {}
+        self.combined = [pattern for pattern in self.patterns if can_combine(pattern)]
+        self.separate = [pattern for pattern in self.patterns if not can_combine(pattern)]
+        self.prefilter: re.Pattern[str] | None = None
+        if len(self.combined) > 1:
+            alternation = "|".join(f"(?:{pattern.raw_pattern})" for pattern in self.combined)
+            try:
+                self.prefilter = re.compile(alternation)
+            except re.error:
+                pass
+        if self.prefilter is None:
+            self.separate = self.patterns
+            self.combined = []
+
+    def search(self, lines: LogLines | list[str]) -> dict[str, array[int]]:
+        """
+        Search the lines for all the patterns and return the matching line numbers
+
+        Lines are iterated again for every separately searched pattern.
+        Only the numbers of the prefilter candidates are kept, the patterns
+        read those lines again, so a broad pattern does not copy the lines.
+        """
+        result: dict[str, array[int]] = {}
+        self.costs = {}
+        separate = self.separate
+        if self.prefilter is not None:
+            start = time.perf_counter()
+            candidates, scanned, stopped = scan(
+                self.prefilter.search, enumerate(lines), self.budget, self.line_budget
+            )
+            self.costs[PREFILTER_ID] = (
+                time.perf_counter() - start,
+                scanned,
+                len(candidates),
+                stopped,
+            )
+            if stopped:
+                separate = self.patterns
+            else:
+                for pattern in self.combined:
+                    self.search_one(pattern, ((num, lines[num]) for num in candidates), result)
+        for pattern in separate:
+            self.search_one(pattern, enumerate(lines), result)
+        return result
+
+    def search_one(
+        self,
+        pattern: LogPattern,
+        lines: Iterable[tuple[int, str]],
+        result: dict[str, array[int]],
+    ) -> None:
+        """
+        Search the numbered lines for one pattern, record the hits and the cost
+        """
+        start = time.perf_counter()
+        found, scanned, stopped = scan(
+            pattern.pattern.search, lines, self.budget, self.line_budget
+        )
+        result[pattern.p_id] = found
+        self.costs[pattern.p_id] = (time.perf_counter() - start, scanned, len(found), stopped)
+
+
+class BlockSplitter:
+    """
+    Find the lines starting a new block
+
+    The block start patterns are collected once and all of them are checked,
+    the first matching one gives the block name. Whole buffers of lines are
+    scanned with one multiline regex, only the candidate lines are checked
+    with the patterns one by one.
+    """
+
+    def __init__(self, starts: Iterable[LogPattern]) -> None:
+        self.starts = [pattern for pattern in starts if pattern.raw_pattern]
+        self.scanner: re.Pattern[str] | None = None
+        if self.starts and all(
+            can_combine(pattern) and not NOT_SCANNABLE.search(pattern.raw_pattern)
+            for pattern in self.starts
+        ):
+            alternation = "|".join(f"(?:{pattern.raw_pattern})" for pattern in self.starts)
+            try:
+                self.scanner = re.compile(alternation, re.MULTILINE)
+            except re.error:
+                pass
+
+    def match(self, line: str) -> str | None:
+        """
+        Return the block name when the line starts a block, otherwise None
+        """
+        for pattern in self.starts:
+            if match := pattern.search(line):
+                return match[int(pattern.property)]
+        return None
+
+    def find_starts(self, text: str, lines: list[str]) -> list[tuple[int, str]]:
+        """
+        Find the block starts in a text, lines are the result of its splitlines
+
+        Return the line numbers and the block names.
+        """
+        if not self.starts:
+            return []
+        if "\r\n" in text:
+            text = text.replace("\r\n", "\n")
+        breaks = text.count("\n") + (not text.endswith("\n") and bool(text))
+        if self.scanner is None or breaks != len(lines):
+            # other line breaks, like '\r', are not known by the multiline anchors
+            return [
+                (num, name)
+                for num, line in enumerate(lines)
+                if (name := self.match(line)) is not None
+            ]
+        result = []
+        search = self.scanner.search
+        num = 0
+        pos = 0
+        while match := search(text, pos):
+            num += text.count("\n", pos, match.start())
+            if num >= len(lines):
+                break
+            # a match of the buffer can span more lines, check the line itself
+            if (name := self.match(lines[num])) is not None:
+                result.append((num, name))
+            pos = text.find("\n", match.start()) + 1
+            if not pos:
+                break
+            num += 1
+        return result
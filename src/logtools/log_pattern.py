@@ -16,6 +16,20 @@ class LogPattern:
     A log pattern attached to a log, holding also the line references
     """
 
+    __slots__ = (
+        "block_start",
+        "modified",
+        "name",
+        "needed",
+        "p_id",
+        "pattern",
+        "property",
+        "raw_pattern",
+        "style",
+        "style_num",
+        "visible",
+    )
+
     def __init__(self, name: str, p_id: str, pattern_data: dict[str, Any]) -> None:
         # Required attributes
         self.name = name
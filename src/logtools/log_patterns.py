@@ -7,39 +7,60 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import json
 import pathlib
 from collections.abc import Iterator
-
-import strictyaml as sy
+from typing import Any
 
 from logtools.log_pattern import LogPattern, create_empty_pattern
+from logtools.pattern_cache import PatternCache
 from logtools.utils import LogToolsError
 
 
-# yaml patterns are read according to this schema
-# nearly all field processed runtime, but when block_start changes
-# then the application need to be restarted
-SCHEMA = sy.MapPattern(
-    sy.Str(),  # name of the pattern
-    sy.Map(
-        {
-            "pattern": sy.Str(),  # regexp string to search
-            "block_start": sy.Bool(),  # indication of a new bog block
-            "needed": sy.Bool(),  # when missing consider as crash
-            "property": sy.Str(),  # extract value from the regexp
-            "style": sy.Seq(sy.Regex(r"bold|italic|underline|[0-9A-F]{6}")),  # style and color
-            "visible": sy.Bool(),  # display the line or not
-        }
-    ),
-)
+@functools.cache
+def get_schema() -> Any:
+    """
+    Get the schema of the yaml patterns, strictyaml is slow to import so only done here
 
+    Nearly all field processed runtime, but when block_start changes
+    then the application need to be restarted.
+    """
+    import strictyaml as sy  # noqa: PLC0415 - import only when needed
+
+    return sy.MapPattern(
+        sy.Str(),  # name of the pattern
+        sy.Map(
+            {
+                "pattern": sy.Str(),  # regexp string to search
+                "block_start": sy.Bool(),  # indication of a new bog block
+                "needed": sy.Bool(),  # when missing consider as crash
+                "property": sy.Str(),  # extract value from the regexp
+                "style": sy.Seq(
+                    sy.Regex(r"bold|italic|underline|[0-9A-F]{6}")
+                ),  # style and color
+                "visible": sy.Bool(),  # display the line or not
+            }
+        ),
+    )
+
+
+def load_yaml(text: str) -> dict[str, Any]:
+    """
+    Validate the yaml input by the schema and return its data
+    """
+    import strictyaml as sy  # noqa: PLC0415 - import only when needed
 
-def parse_yaml(text: str) -> list[LogPattern]:
+    data: dict[str, Any] = sy.load(text, get_schema()).data
+    return data
+
+
+def make_patterns(input_data: dict[str, Any]) -> list[LogPattern]:
     """
-    Parse yaml input into a list of log pattern objects
+    Create the log pattern objects from the validated yaml data
     """
     result: list[LogPattern] = []
-    input_data = sy.load(text, SCHEMA).data
     for i, (k, v) in enumerate(input_data.items()):
         try:
             pattern = LogPattern(k, str(i), v)
@@ -50,14 +71,30 @@ def parse_yaml(text: str) -> list[LogPattern]:
     return result
 
 
+def parse_yaml(text: str) -> list[LogPattern]:
+    """
+    Parse yaml input into a list of log pattern objects
+    """
+    return make_patterns(load_yaml(text))
+
+
 class LogPatterns:
     """
     Class to hold a list of log pattern objects for a log
+
+    With a cache the validated yaml data is reused while the file is unchanged.
     """
 
-    def __init__(self, file_path: pathlib.Path) -> None:
+    def __init__(self, file_path: pathlib.Path, cache: PatternCache | None = None) -> None:
         self.file_path = file_path
-        self.data = parse_yaml(file_path.read_text())
+        self.cache = cache
+        text = file_path.read_text()
+        input_data = cache.load(file_path, text) if cache else None
+        if input_data is None:
+            input_data = load_yaml(text)
+            if cache:
+                cache.save(file_path, text, input_data)
+        self.data = make_patterns(input_data)
         self.free_search = create_empty_pattern()
         self.free_search.p_id = "free"
         self.free_search.name = "Free search"
@@ -68,8 +105,22 @@ class LogPatterns:
         Write out the patterns to a new yaml file, backup the previous one
         """
         self.file_path.replace(self.file_path.with_suffix(".bkp"))
+        import strictyaml as sy  # noqa: PLC0415 - import only when needed
+
         result = {pattern.name: pattern.get_data() for pattern in self.data}
-        self.file_path.write_text(sy.as_document(result, SCHEMA).as_yaml())
+        document = sy.as_document(result, get_schema())
+        text = document.as_yaml()
+        self.file_path.write_text(text)
+        if self.cache:
+            # replace the entry of the old content right away
+            self.cache.save(self.file_path, text, document.data)
+
+    def get_hash(self) -> str:
+        """
+        Get a hash of the pattern details that influence the log processing
+        """
+        data = [(pattern.p_id, pattern.get_data()) for pattern in self.data]
+        return hashlib.sha256(json.dumps(data).encode()).hexdigest()
 
     def get_all_patterns(self) -> Iterator[LogPattern]:
         """
@@ -128,9 +179,9 @@ class LogPatterns:
 
     def get_modified(self) -> Iterator[LogPattern]:
         """
-        Get all the patterns
+        Get the modified patterns, including the free search
         """
-        for pattern in self.data:
+        for pattern in self.get_all_patterns():
             if pattern.modified:
                 yield pattern
 
@@ -145,5 +196,5 @@ class LogPatterns:
         """
         Clear all modified flags
         """
-        for pattern in self.data:
+        for pattern in self.get_all_patterns():
             pattern.modified = False
@@ -0,0 +1,384 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import heapq
+import io
+import lzma
+import mmap
+import os
+import pathlib
+import queue
+import threading
+import zlib
+from array import array
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from logtools.log_times import NO_TIME, TimeParser
+from logtools.utils import LogToolsError
+
+
+ENCODING = "latin2"
+
+# size of the raw slices decoded at once, lines are never cut in half
+CHUNK_SIZE = 1 << 20
+
+# compression formats by the magic bytes at the file start and their file suffixes
+COMPRESSIONS = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+# errors of truncated or corrupt compressed files
+DECOMPRESS_ERRORS = (OSError, EOFError, lzma.LZMAError, zlib.error)
+
+# decoded chunks of a compressed file read in advance
+PREFETCH_CHUNKS = 4
+
+
+def iter_buffer_chunks(
+    buffer: bytes | mmap.mmap, chunk_size: int = CHUNK_SIZE, size: int | None = None
+) -> Iterator[str]:
+    """
+    Decode a raw buffer one chunk at a time, only its first size bytes when given
+
+    Chunk ends are moved to the nearest line boundary, so splitting the chunks
+    to lines gives the same as decoding the whole buffer and calling splitlines on it.
+    """
+    if size is None:
+        size = len(buffer)
+    pos = 0
+    while pos < size:
+        end = min(pos + chunk_size, size)
+        if end < size:
+            boundary = buffer.rfind(b"\n", pos, end)
+            if boundary < 0:
+                # line longer than a chunk, go on till its end
+                boundary = buffer.find(b"\n", end)
+                if boundary < 0:
+                    boundary = size - 1
+            end = boundary + 1
+        yield buffer[pos:end].decode(ENCODING)
+        pos = end
+
+
+def iter_buffer_lines(buffer: bytes | mmap.mmap, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Split a raw buffer to lines, decoding only one chunk at a time
+    """
+    for text in iter_buffer_chunks(buffer, chunk_size):
+        yield from text.splitlines()
+
+
+def detect_compression(log_file: pathlib.Path) -> str | None:
+    """
+    Detect the compression of the file by its first bytes, None for plain files
+    """
+    with log_file.open("rb") as f:
+        start = f.read(6)
+    for magic, compression in COMPRESSIONS.items():
+        if start.startswith(magic):
+            return compression
+    return None
+
+
+def get_plain_name(log_file: pathlib.Path) -> pathlib.Path:
+    """
+    Name of the log without the compression suffix, like 'app.log' for 'app.log.gz'
+    """
+    if log_file.suffix.lower() in COMPRESSED_SUFFIXES:
+        return log_file.with_suffix("")
+    return log_file
+
+
+def open_compressed(
+    log_file: pathlib.Path, compression: str, raw: io.BufferedReader
+) -> io.BufferedIOBase:
+    """
+    Open the raw content of a compressed file for streaming decompression
+    """
+    if compression == "gzip":
+        return gzip.open(raw, "rb")
+    if compression == "bz2":
+        return bz2.open(raw, "rb")
+    if compression == "xz":
+        return lzma.open(raw, "rb")
+    try:
+        # optional dependency, only needed for zstd logs
+        import zstandard  # noqa: PLC0415 - import only when needed
+    except ImportError:
+        msg = f"{log_file} is zstd compressed, please install the zstandard package"
+        raise LogToolsError(msg) from None
+    return zstandard.open(raw, "rb")  # type: ignore[no-any-return]
+
+
+def iter_stream_chunks(stream: io.BufferedIOBase, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Decode a stream one chunk at a time
+
+    Chunks are cut at line boundaries like in iter_buffer_chunks.
+    """
+    rest = b""
+    while data := stream.read(chunk_size):
+        data = rest + data
+        boundary = data.rfind(b"\n") + 1
+        rest = data[boundary:]
+        if boundary:
+            yield data[:boundary].decode(ENCODING)
+    if rest:
+        yield rest.decode(ENCODING)
+
+
+def iter_compressed_chunks(log_file: pathlib.Path, compression: str) -> Iterator[tuple[str, int]]:
+    """
+    Decompress a file chunk by chunk, a broken file raises LogToolsError
+
+    Every chunk comes with the compressed bytes read for it, those give the progress.
+    """
+    try:
+        with log_file.open("rb") as raw, open_compressed(log_file, compression, raw) as stream:
+            pos = 0
+            for text in iter_stream_chunks(stream):
+                end = raw.tell()
+                yield text, end - pos
+                pos = end
+    except DECOMPRESS_ERRORS as exc:
+        msg = f"{log_file} cannot be decompressed: {exc}"
+        raise LogToolsError(msg) from exc
+
+
+def iter_chunks(log_file: pathlib.Path, follower: LogFollower | None = None) -> Iterator[str]:
+    """
+    Read a log file as decoded chunks of whole lines through a memory map
+
+    The file content is never loaded as a whole, the memory need is the
+    decoded chunk plus the lines kept by the caller.
+    Compressed files are decompressed chunk by chunk.
+    With a follower the part read is recorded, following continues from there,
+    and the raw bytes read are counted, of compressed files the compressed ones.
+    """
+    compression = detect_compression(log_file)
+    if compression is not None:
+        for text, compressed_size in iter_compressed_chunks(log_file, compression):
+            if follower is not None:
+                follower.bytes_read += compressed_size
+            yield text
+        return
+    with log_file.open("rb") as f:
+        if log_file.stat().st_size == 0:
+            # empty files cannot be mapped
+            if follower is not None:
+                follower.mark_read(log_file, b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            size = None if follower is None else follower.mark_read(log_file, buffer)
+            for text in iter_buffer_chunks(buffer, size=size):
+                if follower is not None:
+                    # one byte encoding, the decoded size is the raw size
+                    follower.bytes_read += len(text)
+                yield text
+
+
+def iter_lines(log_file: pathlib.Path, follower: LogFollower | None = None) -> Iterator[str]:
+    """
+    Read the lines of a log file, see iter_chunks
+    """
+    for text in iter_chunks(log_file, follower):
+        yield from text.splitlines()
+
+
+def put_chunk(
+    chunks: queue.Queue[tuple[str, int] | Exception | None],
+    item: tuple[str, int] | Exception | None,
+    stop: threading.Event,
+) -> bool:
+    """
+    Put an item to the queue waiting for free space, give up when stopped
+    """
+    while not stop.is_set():
+        try:
+            chunks.put(item, timeout=0.1)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def prefetch_chunks(
+    log_file: pathlib.Path,
+    chunks: queue.Queue[tuple[str, int] | Exception | None],
+    stop: threading.Event,
+) -> None:
+    """
+    Decompress a file in a background thread, the end is marked with None
+    """
+    try:
+        compression = detect_compression(log_file)
+        assert compression is not None
+        for item in iter_compressed_chunks(log_file, compression):
+            if not put_chunk(chunks, item, stop):
+                return
+    except Exception as exc:  # noqa: BLE001 - passed to the reader
+        put_chunk(chunks, exc, stop)
+        return
+    put_chunk(chunks, None, stop)
+
+
+def iter_files_chunks(
+    log_files: list[pathlib.Path], follower: LogFollower | None = None
+) -> Iterator[str]:
+    """
+    Read the decoded chunks of the files after each other
+
+    When there are more compressed files they are decompressed at the same time
+    in background threads, each one keeping only a few chunks in advance.
+    The follower records the part read of the plain files and counts the bytes read.
+    """
+    compressed = [log_file for log_file in log_files if detect_compression(log_file)]
+    if len(compressed) < 2:
+        for log_file in log_files:
+            yield from iter_chunks(log_file, follower)
+        return
+    stop = threading.Event()
+    prefetched: dict[pathlib.Path, queue.Queue[tuple[str, int] | Exception | None]] = {
+        log_file: queue.Queue(maxsize=PREFETCH_CHUNKS) for log_file in compressed
+    }
+    workers = min(len(compressed), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            # submitted in reading order, so the first files are never waiting
+            for log_file in compressed:
+                executor.submit(prefetch_chunks, log_file, prefetched[log_file], stop)
+            for log_file in log_files:
+                chunks = prefetched.get(log_file)
+                if chunks is None:
+                    yield from iter_chunks(log_file, follower)
+                    continue
+                while (item := chunks.get()) is not None:
+                    if isinstance(item, Exception):
+                        raise item
+                    text, compressed_size = item
+                    if follower is not None:
+                        follower.bytes_read += compressed_size
+                    yield text
+        finally:
+            stop.set()
+
+
+def iter_files_lines(log_files: list[pathlib.Path]) -> Iterator[str]:
+    """
+    Read the lines of the files after each other, see iter_files_chunks
+    """
+    for text in iter_files_chunks(log_files):
+        yield from text.splitlines()
+
+
+def iter_timed_lines(
+    log_file: pathlib.Path, source: int, follower: LogFollower | None = None
+) -> Iterator[tuple[int, int, str]]:
+    """
+    Read the lines of a file with their timestamp and the source index
+
+    Lines without timestamp, like stack traces, get the time of the line before,
+    so they stay together with it in the merge.
+    """
+    parser = TimeParser()
+    last_time = NO_TIME
+    for line in iter_lines(log_file, follower):
+        micros = parser.parse_line(line)
+        if micros != NO_TIME:
+            last_time = micros
+        yield last_time, source, line
+
+
+def iter_merged_lines(
+    log_files: list[pathlib.Path], follower: LogFollower | None = None
+) -> Iterator[tuple[int, str]]:
+    """
+    Merge the lines of the files by their timestamps, yield the source index and the line
+
+    Only one line per file is kept in the heap, so the memory need does not depend
+    on the file sizes. Lines with the same time keep the order of the files.
+    """
+    timed_lines = [
+        iter_timed_lines(log_file, num, follower) for num, log_file in enumerate(log_files)
+    ]
+    for _, source, line in heapq.merge(*timed_lines, key=lambda item: item[0]):
+        yield source, line
+
+
+class LogFollower:
+    """
+    Follow log files that are still written, reading only the appended lines
+
+    Only complete lines are read, a partly written last line waits for the next time.
+    Compressed files are not followed, those are not written any more.
+    Following starts at the end of the files, or where the first reading stopped
+    when the reader tells it. With hold_partial that reading leaves the partly
+    written last line to the follower too, so no line is read twice.
+    """
+
+    def __init__(self, log_files: list[pathlib.Path], hold_partial: bool = False) -> None:
+        self.sources = {log_file: num for num, log_file in enumerate(log_files)}
+        self.hold_partial = hold_partial
+        # raw bytes taken by the first reading, of compressed files the compressed ones
+        self.bytes_read = 0
+        # index of the log file of the lines returned last time
+        self.last_sources = array("H")
+        self.offsets = {
+            log_file: log_file.stat().st_size
+            for log_file in log_files
+            if detect_compression(log_file) is None
+        }
+
+    def mark_read(self, log_file: pathlib.Path, buffer: bytes | mmap.mmap) -> int:
+        """
+        Record the part of the file content the first reading takes, return its size
+
+        The buffer is the whole file content at the time of the reading.
+        """
+        size = len(buffer)
+        if self.hold_partial:
+            size = buffer.rfind(b"\n") + 1
+        if log_file in self.offsets:
+            self.offsets[log_file] = size
+        return size
+
+    def read_new_lines(self) -> list[str]:
+        """
+        Read the lines appended to the files since the last call
+        """
+        lines: list[str] = []
+        self.last_sources = array("H")
+        for log_file, offset in self.offsets.items():
+            try:
+                size = log_file.stat().st_size
+            except OSError:
+                # file is being rotated, try again later
+                continue
+            if size < offset:
+                # truncated, start over
+                offset = 0
+                self.offsets[log_file] = 0
+            if size == offset:
+                continue
+            with log_file.open("rb") as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+            end = data.rfind(b"\n") + 1
+            if end:
+                new_lines = data[:end].decode(ENCODING).splitlines()
+                lines.extend(new_lines)
+                self.last_sources.extend([self.sources[log_file]] * len(new_lines))
+                self.offsets[log_file] = offset + end
+        return lines
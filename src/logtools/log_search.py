@@ -0,0 +1,311 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import re
+import threading
+import time
+from array import array
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING
+
+from logtools.log_block import LogBlock
+from logtools.log_lines import LogLines
+from logtools.log_times import NO_TIME, from_micros
+from logtools.utils import LogToolsError
+
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import Pool
+
+
+# lines searched between the checks of cancellation and time budget
+SEARCH_CHUNK_LINES = 10_000
+# seconds a search may run before it is stopped as too slow
+SEARCH_BUDGET = 30.0
+# seconds between the checks of cancellation and time budget while a chunk is searched
+POLL_INTERVAL = 0.05
+# group ending with a quantifier repeated again, like '(a+)+', can backtrack forever
+NESTED_QUANTIFIER = re.compile(r"[+*?}]\)[+*{]")
+# characters of a line shown in the search results
+SNIPPET_LENGTH = 200
+
+# called with the generation of the search, the block, the first line searched and the hits
+HitsCallback = Callable[[int, LogBlock, int, "array[int]"], None]
+# called with the generation of the search and the problem, None when it finished
+DoneCallback = Callable[[int, "str | None"], None]
+# generation and regex of the search, the block, its copied lines from the first line,
+# the deadline and whether the search ends with it
+SearchTask = tuple[int, "re.Pattern[str]", LogBlock, LogLines, int, float, bool]
+
+
+def compile_search(raw_pattern: str) -> re.Pattern[str]:
+    """
+    Compile a search typed by the user, raise LogToolsError when it cannot be used
+    """
+    try:
+        pattern = re.compile(raw_pattern)
+    except re.error as exc:
+        msg = f"Invalid regex: {exc}"
+        raise LogToolsError(msg) from None
+    if NESTED_QUANTIFIER.search(raw_pattern):
+        msg = "Nested repetition like (a+)+ can be extremely slow, please simplify"
+        raise LogToolsError(msg)
+    return pattern
+
+
+def search_text(raw_pattern: str, flags: int, text: str, first: int) -> array[int]:
+    """
+    Search the lines of a text joined by newlines, return the matching line numbers
+
+    It runs in the search process, line numbers are counted from the given first one.
+    """
+    search = re.compile(raw_pattern, flags).search
+    return array("I", [num for num, line in enumerate(text.split("\n"), first) if search(line)])
+
+
+class BackgroundSearch:
+    """
+    Search a regex in the blocks in a worker thread
+
+    Every search gets a new generation number, the older searches notice it
+    and stop, so only the latest one reports results. Hits are reported block
+    by block in the given order, so the current block can be the first.
+    Lines added later, by follow or by the loading, are searched with the
+    actual search too, then the hits are reported with the first line searched.
+    The callbacks are called in the worker thread.
+
+    The lines are matched in a separate process: a regex backtracking for ages
+    holds the GIL, it would freeze the GUI in a thread. The worker thread only
+    waits, and kills the process when the search is cancelled or too slow.
+    """
+
+    def __init__(self, on_hits: HitsCallback, on_done: DoneCallback) -> None:
+        self.on_hits = on_hits
+        self.on_done = on_done
+        self.generation = 0
+        self.lock = threading.Lock()
+        # regex of the actual search, None when there is none
+        self.pattern: re.Pattern[str] | None = None
+        # generation stopped as too slow, its remaining tasks are skipped
+        self.stopped = 0
+        self.tasks: queue.Queue[SearchTask | None] = queue.Queue()
+        self.thread: threading.Thread | None = None
+        # process searching the lines, started when needed, used by the worker thread only
+        self.pool: Pool | None = None
+
+    def start(self, pattern: re.Pattern[str], blocks: Sequence[LogBlock]) -> int:
+        """
+        Start a new search in the background, the running one is cancelled
+
+        The lines are copied here, the owner thread may append to them meanwhile.
+        """
+        generation = self.cancel()
+        self.pattern = pattern
+        deadline = time.monotonic() + SEARCH_BUDGET
+        if not blocks:
+            self.on_done(generation, None)
+        for num, block in enumerate(blocks, 1):
+            task = (
+                generation,
+                pattern,
+                block,
+                block.lines.copy(),
+                0,
+                deadline,
+                num == len(blocks),
+            )
+            self.put(task)
+        return generation
+
+    def add(self, block: LogBlock, first: int = 0) -> None:
+        """
+        Search the lines of a block from the given line with the actual search, if any
+
+        It is for the lines appended by follow and for the blocks loaded later.
+        """
+        if self.pattern is None or first >= len(block.lines):
+            return
+        lines = block.lines.copy() if first == 0 else LogLines(block.lines.iter_range(first))
+        deadline = time.monotonic() + SEARCH_BUDGET
+        self.put((self.generation, self.pattern, block, lines, first, deadline, False))
+
+    def put(self, task: SearchTask) -> None:
+        """
+        Give a task to the worker thread, start it when needed
+        """
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.work, daemon=True)
+            self.thread.start()
+        self.tasks.put(task)
+
+    def cancel(self) -> int:
+        """
+        Cancel the running search, return the new generation
+        """
+        with self.lock:
+            self.generation += 1
+            self.pattern = None
+            return self.generation
+
+    def close(self) -> None:
+        """
+        Cancel the running search, stop the worker thread and the search process
+        """
+        self.cancel()
+        if self.thread is not None:
+            self.tasks.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def is_current(self, generation: int) -> bool:
+        """
+        Check whether the search is still the latest one
+        """
+        return generation == self.generation
+
+    def is_running(self, generation: int) -> bool:
+        """
+        Check whether the search is the latest one and it was not stopped
+        """
+        return self.is_current(generation) and generation != self.stopped
+
+    def get_pool(self) -> Pool:
+        """
+        Get the search process, start it when needed
+        """
+        if self.pool is None:
+            import multiprocessing  # noqa: PLC0415 - import only when needed
+
+            # not forked, forking a process having threads can deadlock
+            self.pool = multiprocessing.get_context("spawn").Pool(1)
+        return self.pool
+
+    def stop_pool(self) -> None:
+        """
+        Kill the search process, a runaway regex cannot be stopped otherwise
+        """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def work(self) -> None:
+        """
+        Worker thread, run the tasks until closed
+        """
+        while (task := self.tasks.get()) is not None:
+            self.run(task)
+            self.tasks.task_done()
+        self.stop_pool()
+        self.tasks.task_done()
+
+    def run(self, task: SearchTask) -> None:
+        """
+        Search the copied lines of a block, checking the cancellation and the time budget
+
+        The lines are the ones of the block from the first line of the task.
+        """
+        generation, pattern, block, lines, first, deadline, last = task
+        hits = array("I")
+        size = len(lines)
+        for start in range(0, size, SEARCH_CHUNK_LINES):
+            if not self.is_running(generation):
+                return
+            text = lines.get_range_text(start, min(start + SEARCH_CHUNK_LINES, size))
+            found = self.search_chunk(generation, pattern, text, first + start, deadline)
+            if found is None:
+                if self.is_running(generation):
+                    self.stop(generation)
+                return
+            hits.extend(found)
+        if not self.is_running(generation):
+            return
+        self.on_hits(generation, block, first, hits)
+        if last:
+            self.on_done(generation, None)
+
+    def stop(self, generation: int) -> None:
+        """
+        Stop the search as too slow, also for the lines added later
+        """
+        with self.lock:
+            self.stopped = generation
+            if self.is_current(generation):
+                self.pattern = None
+        self.on_done(generation, "Search was too slow, stopped")
+
+    def search_chunk(
+        self, generation: int, pattern: re.Pattern[str], text: str, first: int, deadline: float
+    ) -> array[int] | None:
+        """
+        Search a chunk of lines in the search process, None when cancelled or too slow
+        """
+        if time.monotonic() > deadline:
+            return None
+        result = self.get_pool().apply_async(
+            search_text, (pattern.pattern, pattern.flags, text, first)
+        )
+        while not result.ready():
+            if not self.is_current(generation) or time.monotonic() > deadline:
+                self.stop_pool()
+                return None
+            result.wait(POLL_INTERVAL)
+        return result.get()
+
+
+class SearchResults:
+    """
+    Hits of a pattern in all the blocks, stored in columns
+
+    The hits are already searched per block, here only their block index,
+    line number and timestamp are collected into arrays, 16 bytes per hit.
+    The texts of a row are only made when the row is displayed.
+    """
+
+    __slots__ = ("blocks", "hit_blocks", "indexes", "lines", "p_id", "times")
+
+    def __init__(self, blocks: Sequence[LogBlock], p_id: str) -> None:
+        self.blocks = list(blocks)
+        self.p_id = p_id
+        self.indexes = array("I")
+        self.lines = array("I")
+        self.times = array("q")
+        # number of blocks with hits
+        self.hit_blocks = 0
+        for index, block in enumerate(self.blocks):
+            hits = block.pattern_lines.get(p_id)
+            if not hits:
+                continue
+            self.hit_blocks += 1
+            times = block.get_times()
+            self.indexes.extend(itertools.repeat(index, len(hits)))
+            self.lines.extend(hits)
+            self.times.extend(map(times.__getitem__, hits))
+
+    def __len__(self) -> int:
+        """
+        Number of hits
+        """
+        return len(self.lines)
+
+    def get_hit(self, row: int) -> tuple[LogBlock, int]:
+        """
+        Get the block and the line number of a hit
+        """
+        return self.blocks[self.indexes[row]], self.lines[row]
+
+    def get_texts(self, row: int) -> tuple[str, str, str, str]:
+        """
+        Get the texts of a row: block name, line number from 1, timestamp and the line
+        """
+        block, line = self.get_hit(row)
+        micros = self.times[row]
+        time_text = "" if micros == NO_TIME else from_micros(micros).isoformat(sep=" ")
+        return block.name, str(line + 1), time_text, block.lines[line][:SNIPPET_LENGTH]
@@ -0,0 +1,258 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import itertools
+import statistics
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from logtools.log_block import LogBlock, format_timedelta
+from logtools.log_patterns import LogPatterns
+from logtools.log_times import NO_TIME, from_micros
+
+
+try:
+    import numpy as np
+except ImportError:  # optional, the pure python way is used without it
+    np = None  # type: ignore[assignment, unused-ignore]
+
+# the numpy way is used when it is installed, switched off in the tests too
+USE_NUMPY = np is not None
+
+
+# number of bins of the duration histogram
+DURATION_BINS = 10
+# timestamps are in microseconds
+MINUTE = 60_000_000
+# rows of the hits per minute histogram in the text report, minutes are grouped above it
+TEXT_ROWS = 120
+# width of the longest bar of the text histograms
+BAR_WIDTH = 40
+
+# search cost of a pattern in a block: block name, pattern name, seconds, lines, hits, stopped
+CostRow = tuple[str, str, float, int, int, bool]
+
+
+def hit_minutes(times: array[int], lines: array[int]) -> Any:
+    """
+    Minutes of the hits that have timestamp, a NumPy array or a list
+    """
+    if USE_NUMPY:
+        found = np.frombuffer(times, dtype=np.int64)[np.frombuffer(lines, dtype=np.uint32)]
+        return found[found != NO_TIME] // MINUTE
+    return [times[num] // MINUTE for num in lines if times[num] != NO_TIME]
+
+
+def count_values(parts: list[Any]) -> dict[int, int]:
+    """
+    Count the values of all the parts, sorted by the values
+    """
+    if USE_NUMPY and parts:
+        values, counts = np.unique(np.concatenate(parts), return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist(), strict=True))
+    return dict(sorted(Counter(itertools.chain.from_iterable(parts)).items()))
+
+
+def make_histogram(
+    values: list[float], bins: int = DURATION_BINS
+) -> list[tuple[float, float, int]]:
+    """
+    Count the values in equal width bins, return the bin limits and the counts
+    """
+    if not values:
+        return []
+    low = min(values)
+    high = max(values)
+    if low == high:
+        return [(low, high, len(values))]
+    if USE_NUMPY:
+        counts, edges = np.histogram(values, bins=bins)
+        return list(zip(edges[:-1].tolist(), edges[1:].tolist(), counts.tolist(), strict=True))
+    width = (high - low) / bins
+    bin_counts = [0] * bins
+    for value in values:
+        # the last bin includes the maximum
+        bin_counts[min(int((value - low) / width), bins - 1)] += 1
+    return [(low + num * width, low + (num + 1) * width, bin_counts[num]) for num in range(bins)]
+
+
+def group_minutes(minutes: dict[int, int], rows: int = TEXT_ROWS) -> tuple[int, dict[int, int]]:
+    """
+    Group the minute counts to at most the given rows, return the group size and the counts
+    """
+    step = 1
+    groups = minutes
+    while len(groups) > rows:
+        step *= 2
+        groups = {}
+        for minute, count in minutes.items():
+            group = minute - minute % step
+            groups[group] = groups.get(group, 0) + count
+    return step, groups
+
+
+def make_bar(count: int, maximum: int) -> str:
+    """
+    Text bar of a histogram, non zero counts have at least one mark
+    """
+    if not count:
+        return ""
+    return "#" * max(1, count * BAR_WIDTH // maximum)
+
+
+def format_seconds(seconds: float) -> str:
+    """
+    Format seconds like the block durations
+    """
+    return format_timedelta(timedelta(seconds=seconds))
+
+
+class LogStats:
+    """
+    Statistics of all the blocks of the logs
+
+    Everything is computed in one pass over the blocks from the hit line numbers
+    and the timestamp columns, with NumPy when it is installed.
+    """
+
+    def __init__(self, blocks: Sequence[LogBlock], patterns: LogPatterns) -> None:
+        self.blocks = len(blocks)
+        self.crashes = 0
+        # blocks where a needed pattern was stopped as too slow, neither ok nor crash
+        self.unknown = 0
+        # seconds of the blocks with known start and end
+        self.durations: list[float] = []
+        self.names = {pattern.p_id: pattern.name for pattern in patterns.get_yaml_patterns()}
+        # hits of the patterns per block
+        self.hits: dict[str, array[int]] = {p_id: array("I") for p_id in self.names}
+        minute_parts: dict[str, list[Any]] = {p_id: [] for p_id in self.names}
+        self.costs: list[CostRow] = []
+        for block in blocks:
+            if block.has_needed is None:
+                self.unknown += 1
+            elif not block.has_needed:
+                self.crashes += 1
+            if block.start is not None and block.end is not None:
+                try:
+                    self.durations.append((block.end - block.start).total_seconds())
+                except TypeError:
+                    # mixed naive and aware times
+                    pass
+            self.costs.extend(
+                (block.name, block.get_cost_name(p_id), *cost)
+                for p_id, cost in block.costs.items()
+            )
+            times = block.get_times()
+            for p_id, hits in self.hits.items():
+                lines = block.pattern_lines.get(p_id, array("I"))
+                hits.append(len(lines))
+                if lines:
+                    minute_parts[p_id].append(hit_minutes(times, lines))
+        # hits of the patterns per minute, minutes are counted from the epoch
+        self.minute_hits = {p_id: count_values(parts) for p_id, parts in minute_parts.items()}
+        self.duration_histogram = make_histogram(self.durations)
+
+    @property
+    def crash_rate(self) -> float:
+        """
+        Ratio of the blocks without the needed patterns
+        """
+        return self.crashes / self.blocks if self.blocks else 0.0
+
+    def get_duration_stats(self) -> dict[str, Any]:
+        """
+        Distribution of the block durations in seconds
+        """
+        if not self.durations:
+            return {"count": 0}
+        return {
+            "count": len(self.durations),
+            "min": min(self.durations),
+            "max": max(self.durations),
+            "mean": statistics.fmean(self.durations),
+            "median": statistics.median(self.durations),
+            "histogram": [
+                {"from": low, "to": high, "count": count}
+                for low, high, count in self.duration_histogram
+            ],
+        }
+
+    def get_summary(self) -> dict[str, Any]:
+        """
+        Return the statistics in a machine readable form
+        """
+        return {
+            "blocks": self.blocks,
+            "crashes": self.crashes,
+            "crash_rate": self.crash_rate,
+            "unknown": self.unknown,
+            "durations": self.get_duration_stats(),
+            "hits": {
+                name: {
+                    "total": sum(self.hits[p_id]),
+                    "per_block": self.hits[p_id].tolist(),
+                    "per_minute": {
+                        from_micros(minute * MINUTE).isoformat(timespec="minutes"): count
+                        for minute, count in self.minute_hits[p_id].items()
+                    },
+                }
+                for p_id, name in self.names.items()
+            },
+        }
+
+    def get_text(self) -> str:
+        """
+        Return the statistics as a text report with histograms
+        """
+        text = [f"Blocks: {self.blocks}, crashes: {self.crashes} ({self.crash_rate:.1%})", ""]
+        if self.unknown:
+            text[0] += f", unknown: {self.unknown}"
+        stopped = [f"{row[1]} in {row[0]}" for row in self.costs if row[5]]
+        if stopped:
+            text.extend(["Patterns stopped as too slow: " + ", ".join(stopped), ""])
+        durations = self.get_duration_stats()
+        if durations["count"]:
+            text.append(
+                "Duration: "
+                + ", ".join(
+                    f"{key} {format_seconds(durations[key])}"
+                    for key in ("min", "median", "mean", "max")
+                )
+            )
+            maximum = max(count for _, _, count in self.duration_histogram)
+            for low, high, count in self.duration_histogram:
+                bar = make_bar(count, maximum)
+                text.append(
+                    f"  {format_seconds(low)} - {format_seconds(high)} |{bar:<{BAR_WIDTH}} {count}"
+                )
+            text.append("")
+        width = max((len(name) for name in self.names.values()), default=0)
+        text.append("Hits: total, per block min / mean / max, blocks with hits")
+        for p_id, name in self.names.items():
+            hits = self.hits[p_id]
+            if hits:
+                mean = sum(hits) / len(hits)
+                text.append(
+                    f"  {name:<{width}} {sum(hits):>8} "
+                    f"{min(hits)} / {mean:.1f} / {max(hits)}, {sum(map(bool, hits))}"
+                )
+        for p_id, name in self.names.items():
+            step, groups = group_minutes(self.minute_hits[p_id])
+            if not groups:
+                continue
+            text.extend(["", f"{name}, hits per {step} minute(s):"])
+            # only the minutes with hits are listed
+            maximum = max(groups.values())
+            for group, count in groups.items():
+                label = from_micros(group * MINUTE).isoformat(sep=" ", timespec="minutes")
+                text.append(f"  {label} |{make_bar(count, maximum):<{BAR_WIDTH}} {count}")
+        return "\n".join(text)
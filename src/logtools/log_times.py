@@ -0,0 +1,136 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from datetime import datetime, time, timedelta
+
+from logtools.utils import LogToolsError
+
+
+# timestamps are stored as microseconds from the epoch, this marks the missing ones
+NO_TIME = -(2**63)
+EPOCH = datetime(1970, 1, 1)  # noqa: DTZ001 - log times are local, naive times
+ONE_MICRO = timedelta(microseconds=1)
+# length of the 'YYYY-MM-DDTHH:MM:SS' part
+SECONDS_LEN = 19
+# limit of the second prefix cache, cleared when reached
+CACHE_LIMIT = 100_000
+
+
+def to_micros(d_t: datetime) -> int:
+    """
+    Convert a datetime to microseconds, time zones are ignored, the wall time is kept
+    """
+    return (d_t.replace(tzinfo=None) - EPOCH) // ONE_MICRO
+
+
+def from_micros(micros: int) -> datetime:
+    """
+    Convert microseconds back to naive datetime
+    """
+    return EPOCH + timedelta(microseconds=micros)
+
+
+class TimeParser:
+    """
+    Parse the timestamps of log lines, the second word of every line
+
+    Timestamps like '2021-02-11T17:29:35.112' are parsed by slicing with the
+    help of a cache of the already seen second prefixes. Everything else falls
+    back to datetime.fromisoformat, so the accepted formats are the same.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, int] = {}
+
+    def parse_token(self, token: str) -> int:
+        """
+        Parse a timestamp to microseconds, return NO_TIME when not valid
+        """
+        seconds = self.seconds.get(token[:SECONDS_LEN])
+        if seconds is not None and seconds != NO_TIME:
+            size = len(token)
+            if size == SECONDS_LEN:
+                return seconds
+            fraction = token[SECONDS_LEN + 1 :]
+            if (
+                token[SECONDS_LEN] == "."
+                and size in (SECONDS_LEN + 4, SECONDS_LEN + 7)
+                and fraction.isascii()
+                and fraction.isdigit()
+            ):
+                return seconds + int(fraction) * (1000 if size == SECONDS_LEN + 4 else 1)
+        try:
+            d_t = datetime.fromisoformat(token)
+        except ValueError:
+            return NO_TIME
+        if seconds is None and len(token) >= SECONDS_LEN:
+            self.add_prefix(token[:SECONDS_LEN])
+        return to_micros(d_t)
+
+    def add_prefix(self, prefix: str) -> None:
+        """
+        Remember the value of a second prefix, NO_TIME when not usable for fast parsing
+        """
+        if len(self.seconds) >= CACHE_LIMIT:
+            self.seconds.clear()
+        self.seconds[prefix] = NO_TIME
+        layout = prefix[4] + prefix[7] + prefix[10] + prefix[13] + prefix[16]
+        if layout != "--T::":
+            return
+        try:
+            d_t = datetime.fromisoformat(prefix)
+        except ValueError:
+            return
+        if d_t.tzinfo is None:
+            self.seconds[prefix] = to_micros(d_t)
+
+    def parse_line(self, line: str) -> int:
+        """
+        Parse the timestamp of a log line to microseconds or NO_TIME
+        """
+        parts = line.split(maxsplit=2)
+        if len(parts) < 2:
+            return NO_TIME
+        return self.parse_token(parts[1])
+
+    def parse_lines(self, lines: Iterable[str]) -> array[int]:
+        """
+        Parse the timestamps of lines into a compact column
+        """
+        parse_line = self.parse_line
+        return array("q", [parse_line(line) for line in lines])
+
+
+def parse_time_input(text: str, reference: datetime | None = None) -> datetime:
+    """
+    Parse a time given by the user, like '2021-02-11T14:03:12' or just '14:03:12'
+
+    A time without date is taken on the day of the reference, or the next day
+    when it would be before the reference, i.e. the log passed midnight.
+    """
+    text = text.strip()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    try:
+        t_o_d = time.fromisoformat(text)
+    except ValueError:
+        msg = f"Invalid time: {text}"
+        raise LogToolsError(msg) from None
+    if reference is None:
+        msg = f"Date is needed, log has no timestamps: {text}"
+        raise LogToolsError(msg)
+    reference = reference.replace(tzinfo=None)
+    result = datetime.combine(reference.date(), t_o_d.replace(tzinfo=None))
+    if result < reference.replace(microsecond=0):
+        result += timedelta(days=1)
+    return result
@@ -13,13 +13,14 @@ import pathlib
 import sys
 from typing import Any
 
-import wx
-
 from logtools import user_files
-from logtools.gui_main_frame import MainFrame
-from logtools.log_data import LogData
-from logtools.utils import LogToolsError, error_message
+from logtools.log_cache import IndexCache
+from logtools.log_data import LogData, LogLoader
+from logtools.utils import LogToolsError, check_logfiles, error_message
+
 
+# Note: wx is imported only when the arguments and the log files are checked,
+# while the logs are already loading, see 'python -m logtools.startup'
 
 FOLDER_HELP = """
     Patterns are Strict Yaml format files in the user folder with '.yml' extension.
@@ -45,6 +46,19 @@ def parse_arguments() -> Any:
     )
     parser.add_argument("log_files", type=pathlib.Path, nargs="+", help="log files to display")
     parser.add_argument("-p", "--patterns", help="patterns file base name")
+    parser.add_argument("-j", "--jobs", type=int, help="number of processes for log processing")
+    parser.add_argument(
+        "-f", "--follow", action="store_true", help="keep reading the lines appended to the logs"
+    )
+    parser.add_argument(
+        "-m", "--merge", action="store_true", help="interleave the lines of the logs by time"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="do not use the caches")
+    parser.add_argument(
+        "--max-displays",
+        type=int,
+        help="number of log tabs kept rendered, the least recently viewed are released",
+    )
     args = None
     was_error = False
     bkp_stdout, bkp_stderr = sys.stdout, sys.stderr
@@ -61,29 +75,39 @@ def parse_arguments() -> Any:
     return args
 
 
-def check_logfiles(log_files: list[pathlib.Path]) -> None:
-    """
-    Check the log files
-    """
-    for log_file in log_files:
-        if not log_file.is_file():
-            msg = f"{log_file} log file not found!"
-            raise LogToolsError(msg)
-
-
 def app_main() -> None:
     """
     Main function, starting point as usual
     """
     args = parse_arguments()
     check_logfiles(args.log_files)
-    log_patterns = user_files.get_patterns(args.patterns, args.log_files)
-    app_data = LogData(log_patterns, args.log_files)
+    pattern_cache = None if args.no_cache else user_files.get_pattern_cache()
+    log_patterns = user_files.get_patterns(args.patterns, args.log_files, cache=pattern_cache)
+    cache = None if args.no_cache else IndexCache(user_files.get_cache_folder())
+    # logs are loaded in the background while the GUI is imported and built
+    app_data = LogData(
+        log_patterns,
+        args.log_files,
+        args.jobs,
+        cache,
+        load=False,
+        merge=args.merge,
+        follow=args.follow,
+    )
+    loader = LogLoader(app_data)
+    loader.start()
     # Making GUI
+    import wx  # noqa: PLC0415 - import only when needed
+
+    from logtools.gui_log_displays import MAX_DISPLAYS  # noqa: PLC0415 - import only when needed
+    from logtools.gui_main_frame import MainFrame  # noqa: PLC0415 - import only when needed
+
+    max_displays = MAX_DISPLAYS if args.max_displays is None else args.max_displays
     app = wx.App(0)
-    frame = MainFrame(app_data)
+    frame = MainFrame(app_data, max_displays, args.follow)
     app.SetTopWindow(frame)
     frame.Show()
+    frame.start_loading(loader)
     app.MainLoop()
 
 
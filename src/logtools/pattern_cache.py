@@ -0,0 +1,76 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import pathlib
+from typing import Any
+
+
+# increase when the stored data changes
+PATTERN_CACHE_VERSION = 1
+
+
+def get_text_hash(text: str) -> str:
+    """
+    Hash of a yaml file content
+    """
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class PatternCache:
+    """
+    Store the validated data of the yaml files, so unchanged files are not parsed again
+
+    Every yaml file has one entry, named after its path, holding the hash of
+    the content the data was made from. When the content changed the entry is
+    not used and it is overwritten by the next parse.
+    """
+
+    def __init__(self, folder: pathlib.Path) -> None:
+        self.folder = folder
+
+    def get_path(self, file_path: pathlib.Path) -> pathlib.Path:
+        """
+        Get the file of the entry of a yaml file
+        """
+        name = hashlib.sha256(str(file_path.resolve()).encode()).hexdigest()[:32]
+        return self.folder / f"{name}.json"
+
+    def load(self, file_path: pathlib.Path, text: str) -> Any:
+        """
+        Load the data of the yaml file content, return None when not found or changed
+        """
+        try:
+            entry = json.loads(self.get_path(file_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != PATTERN_CACHE_VERSION
+            or entry.get("hash") != get_text_hash(text)
+        ):
+            return None
+        return entry.get("data")
+
+    def save(self, file_path: pathlib.Path, text: str, data: Any) -> None:
+        """
+        Save the validated data of the yaml file content
+
+        Cache is only an optimization, errors are ignored.
+        """
+        entry = {"version": PATTERN_CACHE_VERSION, "hash": get_text_hash(text), "data": data}
+        path = self.get_path(file_path)
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError:
+            return
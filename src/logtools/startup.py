@@ -0,0 +1,120 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Any
+
+
+# Note: report of the import costs, to keep the start of the application fast
+# usage: python -m logtools.startup [module]
+
+# modules that are slow to import, the entry points must load them only when needed
+HEAVY_MODULES = ["wx", "numpy", "strictyaml", "platformdirs", "concurrent.futures.process"]
+# number of the slowest imports listed
+TOP_IMPORTS = 15
+
+# name of the module, its own and its cumulative import time in microseconds
+ImportTime = tuple[str, int, int]
+
+
+def parse_importtime(text: str) -> list[ImportTime]:
+    """
+    Parse the output of 'python -X importtime', other lines are skipped
+    """
+    result = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # the header line
+            continue
+        result.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return result
+
+
+def measure_imports(module: str) -> list[ImportTime]:
+    """
+    Import the module in a new interpreter and return the import times
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if process.returncode:
+        msg = f"Cannot import {module}:\n{process.stderr}"
+        raise RuntimeError(msg)
+    return parse_importtime(process.stderr)
+
+
+def get_heavy_modules(imports: list[ImportTime]) -> list[str]:
+    """
+    Get the heavy modules that were imported
+    """
+    names = {name for name, _, _ in imports}
+    return [module for module in HEAVY_MODULES if module in names]
+
+
+def get_report(module: str, imports: list[ImportTime], top: int = TOP_IMPORTS) -> str:
+    """
+    Create the text report of the import times
+    """
+    total = sum(own for _, own, _ in imports)
+    text = [f"Importing {module}: {total / 1000:.1f} ms, {len(imports)} modules", ""]
+    text.append(f"Slowest {top} imports, cumulative and own ms:")
+    slowest = sorted(imports, key=lambda item: item[2], reverse=True)[:top]
+    width = max((len(name) for name, _, _ in slowest), default=0)
+    text.extend(
+        f"  {name:<{width}} {cumulative / 1000:8.1f} {own / 1000:8.1f}"
+        for name, own, cumulative in slowest
+    )
+    heavy = get_heavy_modules(imports)
+    text.append("")
+    if heavy:
+        text.append("Heavy modules imported: " + ", ".join(heavy))
+    else:
+        text.append("No heavy modules imported")
+    return "\n".join(text)
+
+
+def parse_arguments() -> Any:
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Report the import times of a module, like python -X importtime.",
+    )
+    parser.add_argument(
+        "module", nargs="?", default="logtools.main", help="module to import, default: main"
+    )
+    parser.add_argument(
+        "-t", "--top", type=int, default=TOP_IMPORTS, help="number of the slowest imports listed"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    Print the report, the exit code is 1 when heavy modules were imported
+    """
+    args = parse_arguments()
+    imports = measure_imports(args.module)
+    print(get_report(args.module, imports, args.top))  # noqa: T201 - print ok here
+    sys.exit(1 if get_heavy_modules(imports) else 0)
+
+
+if __name__ == "__main__":
+    main()
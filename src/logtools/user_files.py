@@ -7,20 +7,38 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
+import functools
 import pathlib
 import shutil
-
-import platformdirs
-import strictyaml as sy
+from typing import Any
 
 from logtools.log_patterns import LogPatterns
+from logtools.log_reader import get_plain_name
+from logtools.pattern_cache import PatternCache
 from logtools.utils import LogToolsError
 
 
-SCHEMA = sy.MapPattern(
-    sy.Str(),  # name of the pattern file
-    sy.Seq(sy.Str()),  # list of file globs
-)
+@functools.cache
+def get_rules_schema() -> Any:
+    """
+    Get the schema of the rules, strictyaml is slow to import so only done here
+    """
+    import strictyaml as sy  # noqa: PLC0415 - import only when needed
+
+    return sy.MapPattern(
+        sy.Str(),  # name of the pattern file
+        sy.Seq(sy.Str()),  # list of file globs
+    )
+
+
+def parse_rules(text: str) -> dict[str, Any]:
+    """
+    Validate the rules by the schema and return its data
+    """
+    import strictyaml as sy  # noqa: PLC0415 - import only when needed
+
+    rules: dict[str, Any] = sy.load(text, get_rules_schema()).data
+    return rules
 
 
 def get_or_create_user_folder() -> pathlib.Path:
@@ -31,6 +49,8 @@ def get_or_create_user_folder() -> pathlib.Path:
     To avoid this behavior, leave at least a placeholder file there,
     for example the 'logtools.txt' file.
     """
+    import platformdirs  # noqa: PLC0415 - import only when needed
+
     folder = platformdirs.user_data_dir(appname="logtools", appauthor=False, roaming=True)
     folder_path = pathlib.Path(folder)
     try:
@@ -47,7 +67,38 @@ def get_or_create_user_folder() -> pathlib.Path:
     return folder_path
 
 
-def get_exact_patterns(user_folder: pathlib.Path, patterns: str) -> LogPatterns:
+def get_cache_folder(user_folder: pathlib.Path | None = None) -> pathlib.Path:
+    """
+    Return the folder of the cached processing results inside the user folder
+    """
+    if user_folder is None:
+        user_folder = get_or_create_user_folder()
+    return user_folder / "cache"
+
+
+def get_pattern_cache(user_folder: pathlib.Path | None = None) -> PatternCache:
+    """
+    Return the cache of the validated yaml files inside the user folder
+    """
+    return PatternCache(get_cache_folder(user_folder) / "patterns")
+
+
+def load_rules(rules_file: pathlib.Path, cache: PatternCache | None = None) -> dict[str, Any]:
+    """
+    Load the rules, validated again only when the file changed
+    """
+    text = rules_file.read_text()
+    rules: dict[str, Any] | None = cache.load(rules_file, text) if cache else None
+    if rules is None:
+        rules = parse_rules(text)
+        if cache:
+            cache.save(rules_file, text, rules)
+    return rules
+
+
+def get_exact_patterns(
+    user_folder: pathlib.Path, patterns: str, cache: PatternCache | None = None
+) -> LogPatterns:
     """
     When user provided a patterns file name then return that one.
     """
@@ -57,38 +108,42 @@ def get_exact_patterns(user_folder: pathlib.Path, patterns: str) -> LogPatterns:
     if not patterns_file.is_file():
         msg = f"Pattern file {patterns} not found in {user_folder}"
         raise LogToolsError(msg)
-    return LogPatterns(patterns_file)
+    return LogPatterns(patterns_file, cache)
 
 
 def get_patterns_from_rules(
-    user_folder: pathlib.Path, log_files: list[pathlib.Path]
+    user_folder: pathlib.Path, log_files: list[pathlib.Path], cache: PatternCache | None = None
 ) -> LogPatterns:
     """
     When user has multiple patterns files then select the right one based on rules.
     """
     rules_file = user_folder / "rules.yml"
-    rules = sy.load(rules_file.read_text(), SCHEMA).data
+    rules = load_rules(rules_file, cache)
     for patterns, globs in rules.items():
         for glob in globs:
             for log_file in log_files:
-                if log_file.match(glob):
+                # compressed logs match with their name without the compression suffix too
+                if log_file.match(glob) or get_plain_name(log_file).match(glob):
                     if not patterns.lower().endswith(".yml"):
                         patterns += ".yml"
-                    return LogPatterns(user_folder / patterns)
+                    return LogPatterns(user_folder / patterns, cache)
     msg = f"No patterns file found for {log_files}"
     raise LogToolsError(msg)
 
 
 def get_patterns(
-    patterns: str | None, log_files: list[pathlib.Path], user_folder: pathlib.Path | None = None
+    patterns: str | None,
+    log_files: list[pathlib.Path],
+    user_folder: pathlib.Path | None = None,
+    cache: PatternCache | None = None,
 ) -> LogPatterns:
     """
-    Get the pattern files matching the arguments
+    Get the pattern files matching the arguments, the cache is not used when None
     """
     if user_folder is None:
         user_folder = get_or_create_user_folder()
     if patterns:
-        return get_exact_patterns(user_folder, patterns)
+        return get_exact_patterns(user_folder, patterns, cache)
     yaml_files = list(user_folder.glob("*.yml"))
     if not yaml_files:
         msg = f"No pattern files found in {user_folder}"
@@ -98,8 +153,8 @@ def get_patterns(
         if yaml_file.name == "rules.yml":
             msg = "Only rules.yml found, please create a patterns file"
             raise LogToolsError(msg)
-        return LogPatterns(yaml_file)
+        return LogPatterns(yaml_file, cache)
     if "rules.yml" not in [y.name for y in yaml_files]:
         msg = "Multiple pattern files found, but no rules.yml"
         raise LogToolsError(msg)
-    return get_patterns_from_rules(user_folder, log_files)
+    return get_patterns_from_rules(user_folder, log_files, cache)
@@ -7,11 +7,10 @@ https://github.com/bigbirdcode/logtools
 
 from __future__ import annotations
 
+import pathlib
 import sys
 from typing import NoReturn
 
-import wx
-
 
 class LogToolsError(Exception):
     """
@@ -19,6 +18,16 @@ class LogToolsError(Exception):
     """
 
 
+def check_logfiles(log_files: list[pathlib.Path]) -> None:
+    """
+    Check the log files
+    """
+    for log_file in log_files:
+        if not log_file.is_file():
+            msg = f"{log_file} log file not found!"
+            raise LogToolsError(msg)
+
+
 def error_message(msg: str) -> NoReturn:
     """
     Print out error messages either to the console or to a dialog box then exit
@@ -27,6 +36,9 @@ def error_message(msg: str) -> NoReturn:
     then we can still show these to the user however the app was  started.
     """
     if sys.executable.endswith("pythonw.exe"):
+        # wx is only needed here, command line tools must work without it
+        import wx  # noqa: PLC0415 - import only when needed
+
         app = wx.App()
         dlg = wx.MessageDialog(None, msg, "LogTools Error", wx.OK | wx.ICON_ERROR)
         dlg.Center()
@@ -0,0 +1,96 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import gzip
+import io
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+from logtools import batch
+
+
+def test_summarize_file(src_samples: pathlib.Path) -> None:
+    result = batch.summarize_file(src_samples / "sample.log", "patterns", src_samples)
+    assert "error" not in result
+    blocks = result["blocks"]
+    assert [block["result"] for block in blocks] == ["OK", "Crash", "OK"]
+    assert blocks[0]["name"] == "1.2"
+    assert blocks[0]["start"] == "2021-02-11T17:29:35.112000"
+    assert blocks[0]["duration"] == "00:00:12"
+    assert blocks[0]["lines"] == 16
+    assert blocks[1]["hits"]["ERROR log"] == 1
+
+
+def test_summarize_stats(src_samples: pathlib.Path) -> None:
+    result = batch.summarize_file(src_samples / "sample.log", "patterns", src_samples, stats=True)
+    assert result["stats"]["blocks"] == 3
+    assert result["stats"]["crashes"] == 1
+    assert result["stats"]["hits"]["ERROR log"]["per_block"] == [0, 1, 0]
+    assert "stats" not in batch.summarize_file(
+        src_samples / "sample.log", "patterns", src_samples
+    )
+
+
+def test_summarize_costs(src_samples: pathlib.Path) -> None:
+    result = batch.summarize_file(src_samples / "sample.log", "patterns", src_samples, costs=True)
+    costs = result["blocks"][1]["costs"]
+    assert costs["ERROR log"]["hits"] == 1
+    assert set(costs["ERROR log"]) == {"seconds", "lines", "hits", "stopped"}
+    assert (
+        "costs"
+        not in batch.summarize_file(src_samples / "sample.log", "patterns", src_samples)[
+            "blocks"
+        ][0]
+    )
+
+
+def test_summarize_file_error(src_samples: pathlib.Path) -> None:
+    result = batch.summarize_file(src_samples / "sample.log", "wrong", src_samples)
+    assert "not found" in result["error"]
+    assert result["blocks"] == []
+
+
+def test_summarize_files_parallel(src_samples: pathlib.Path) -> None:
+    log_files = [src_samples / "sample.log"] * 3
+    serial = batch.summarize_files(log_files, "patterns", src_samples, jobs=1)
+    parallel = batch.summarize_files(log_files, "patterns", src_samples, jobs=2)
+    assert serial == parallel
+
+
+def test_broken_file(src_samples: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    good = src_samples / "sample.log"
+    bad = tmp_path / "bad.log.gz"
+    bad.write_bytes(gzip.compress(good.read_bytes())[:-100])
+    results = batch.summarize_files([good, bad], "patterns", src_samples, jobs=2)
+    assert len(results[0]["blocks"]) == 3
+    assert "error" not in results[0]
+    assert "cannot be decompressed" in results[1]["error"]
+    assert results[1]["blocks"] == []
+
+
+def test_outputs(src_samples: pathlib.Path) -> None:
+    results = batch.summarize_files([src_samples / "sample.log"], "patterns", src_samples, 1)
+    output = io.StringIO()
+    batch.write_json(results, output)
+    assert json.loads(output.getvalue()) == results
+    output = io.StringIO()
+    batch.write_csv(results, output)
+    rows = output.getvalue().splitlines()
+    assert len(rows) == 4
+    assert rows[0].startswith("file,num,name,start,end,duration,lines,result,App start")
+    assert ",Crash," in rows[2]
+
+
+def test_no_wx_import() -> None:
+    code = "import sys, logtools.batch; sys.exit('wx' in sys.modules)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    assert subprocess.run([sys.executable, "-c", code], env=env, check=False).returncode == 0
@@ -0,0 +1,358 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import pathlib
+import re
+from array import array
+from datetime import datetime
+
+import pytest
+
+from logtools import log_blocks
+from logtools.log_block import LogBlock
+from logtools.log_blocks import LogBlocks
+from logtools.log_matcher import PatternMatcher
+from logtools.log_pattern import LogPattern
+from logtools.log_patterns import LogPatterns
+from logtools.log_times import TimeParser
+
+
+@pytest.fixture
+def sample_patterns(src_samples: pathlib.Path) -> LogPatterns:
+    return LogPatterns(src_samples / "patterns.yml")
+
+
+@pytest.fixture
+def sample_lines(src_samples: pathlib.Path) -> list[str]:
+    return (src_samples / "sample.log").read_text(encoding="latin2").splitlines()
+
+
+def make_blocks(patterns: LogPatterns, lines: list[str], workers: int) -> LogBlocks:
+    blocks = LogBlocks(patterns)
+    for line in lines:
+        blocks.add_line(line)
+    blocks.finalize(workers)
+    return blocks
+
+
+def test_blocks(sample_patterns: LogPatterns, sample_lines: list[str]) -> None:
+    blocks = make_blocks(sample_patterns, sample_lines, 1)
+    assert [block.name for block in blocks] == ["01 1.2 OK", "02 1.2 Crash", "03 1.3 OK"]
+    assert sum(len(block.lines) for block in blocks) == len(sample_lines)
+    assert list(blocks[1].pattern_lines["4"]) == [11]
+
+
+def test_costs(sample_patterns: LogPatterns, sample_lines: list[str]) -> None:
+    blocks = make_blocks(sample_patterns, sample_lines, 1)
+    block = blocks[1]
+    costs = block.get_costs()
+    assert costs["ERROR log"]["hits"] == 1
+    assert not costs["ERROR log"]["stopped"]
+    assert "Combined prefilter" in costs
+    props = block.get_props()
+    assert props.startswith("\n".join(block.props))
+    assert "\nSearch costs:\n" in props
+    assert "ERROR log: " in props
+    # follow adds the cost of the new lines
+    scanned = costs["Combined prefilter"]["lines"]
+    blocks.follow(["ERROR 2021-02-11T19:30:00.000 main.cpp:1 late error"])
+    costs = blocks[-1].get_costs()
+    assert costs["Combined prefilter"]["lines"] == len(blocks[-1].lines)
+    assert costs["ERROR log"]["hits"] == 1
+    assert blocks[1].get_costs()["Combined prefilter"]["lines"] == scanned
+
+
+def test_stopped_needed_unknown(sample_patterns: LogPatterns, sample_lines: list[str]) -> None:
+    blocks = make_blocks(sample_patterns, sample_lines, 1)
+    block = blocks[1]
+    # the needed 'App end' was stopped as too slow, it may be in the block
+    block.costs["1"] = (12.0, 1024, 0, True)
+    block.update_props()
+    assert block.has_needed is None
+    assert block.name == "02 1.2 Unknown"
+    assert block.get_summary()["result"] == "Unknown"
+    assert "Needed patterns stopped as too slow: App end" in block.get_props()
+    # found before it was stopped
+    block = blocks[0]
+    block.costs["1"] = (12.0, 1024, 1, True)
+    block.update_props()
+    assert block.get_summary()["result"] == "OK"
+
+
+@pytest.mark.parametrize("chunk_lines", [1, 7, 100_000])
+def test_block_start_chunks(
+    sample_patterns: LogPatterns, sample_lines: list[str], chunk_lines: int
+) -> None:
+    data = sample_patterns.data[2].get_data()
+    data["block_start"] = True
+    data["property"] = "0"
+    sample_patterns.add_pattern(LogPattern("Process start", "", data))
+    # the second block start pattern is checked too
+    blocks = make_blocks(sample_patterns, sample_lines, 1)
+    assert len(blocks) > 3
+    assert "Process starts" in [block.base_name for block in blocks]
+    chunks = [
+        "\n".join(sample_lines[first : first + chunk_lines]) + "\n"
+        for first in range(0, len(sample_lines), chunk_lines)
+    ]
+    chunk_blocks = list(LogBlocks(sample_patterns).iter_add_chunks(chunks))
+    assert [block.name for block in chunk_blocks] == [block.name for block in blocks]
+    assert [block.lines for block in chunk_blocks] == [block.lines for block in blocks]
+
+
+def test_parallel_finalize(
+    sample_patterns: LogPatterns, sample_lines: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(log_blocks, "PARALLEL_MIN_LINES", 0)
+    serial = make_blocks(sample_patterns, sample_lines, 1)
+    parallel = make_blocks(sample_patterns, sample_lines, 2)
+    for block_1, block_2 in zip(serial, parallel, strict=True):
+        assert block_1.name == block_2.name
+        assert block_1.props == block_2.props
+        assert block_1.pattern_lines == block_2.pattern_lines
+
+
+def test_search_modified_only(sample_patterns: LogPatterns, sample_lines: list[str]) -> None:
+    blocks = make_blocks(sample_patterns, sample_lines, 1)
+    block = blocks[0]
+    free_search = sample_patterns.free_search
+    free_search.raw_pattern = "details 2"
+    free_search.pattern = re.compile(free_search.raw_pattern)
+    block.pattern_lines["0"] = array("I")  # would be found again by a full search
+    block.search_patterns([free_search])
+    assert list(block.pattern_lines["free"]) == [6, 11]
+    assert not block.pattern_lines["0"]
+    free_search.raw_pattern = ""
+    block.search_patterns([free_search])
+    assert not block.pattern_lines["free"]
+
+
+@pytest.mark.parametrize("split", [1, 16, 20, 29, 40, 53])
+def test_follow(sample_patterns: LogPatterns, sample_lines: list[str], split: int) -> None:
+    expected = make_blocks(sample_patterns, sample_lines, 1)
+    blocks = make_blocks(sample_patterns, sample_lines[:split], 1)
+    known = len(blocks)
+    new_blocks = blocks.follow(sample_lines[split:])
+    assert new_blocks == blocks.data[known:]
+    for block_1, block_2 in zip(expected, blocks, strict=True):
+        assert block_1.name == block_2.name
+        assert block_1.props == block_2.props
+        assert block_1.pattern_lines == block_2.pattern_lines
+
+
+def test_edited_while_analyzed(sample_patterns: LogPatterns, sample_lines: list[str]) -> None:
+    block = LogBlock(sample_patterns, 1, "edited")
+    block.lines.extend(sample_lines)
+    # analyzed with the old regex, like in a worker process
+    result = block.analyze()
+    pattern = sample_patterns.get_pattern("4")
+    assert pattern is not None
+    pattern.raw_pattern = "Process starts"
+    pattern.pattern = re.compile(pattern.raw_pattern)
+    block.finalize(result)
+    assert block.searched["4"] == "Process starts"
+    assert list(block.pattern_lines["4"]) == list(block.pattern_lines["2"])
+
+
+def test_free_search_in_background(sample_patterns: LogPatterns, sample_lines: list[str]) -> None:
+    free_search = sample_patterns.free_search
+    free_search.raw_pattern = "ERROR"
+    free_search.pattern = re.compile(free_search.raw_pattern)
+    blocks = make_blocks(sample_patterns, sample_lines[:20], 1)
+    blocks.follow(sample_lines[20:])
+    # loaded and followed lines are left to the background search
+    for block in blocks:
+        assert not block.pattern_lines["free"]
+        assert "free" not in block.searched
+
+
+def test_times_column(sample_patterns: LogPatterns, sample_lines: list[str]) -> None:
+    blocks = make_blocks(sample_patterns, sample_lines, 1)
+    for block in blocks:
+        assert len(block.times) == len(block.lines)
+        assert block.get_first_datetime() == block.start
+        assert block.get_last_datetime() == block.end
+        block.times = array("q")
+        assert block.get_times() == TimeParser().parse_lines(block.lines)
+
+
+def make_timed_block(patterns: LogPatterns) -> LogBlock:
+    block = LogBlock(patterns, 1, "timed")
+    block.lines.extend(
+        [
+            "INFO 2021-02-11T17:29:35.000 start",
+            "no time",
+            "INFO 2021-02-11T17:29:37.000 late",
+            "INFO 2021-02-11T17:29:36.000 out of order",
+            "INFO 2021-02-11T17:29:38.000 end",
+        ]
+    )
+    block.finalize()
+    return block
+
+
+def test_find_time(sample_patterns: LogPatterns) -> None:
+    block = make_timed_block(sample_patterns)
+    assert block.find_time(datetime.fromisoformat("2021-02-11T17:00:00")) == 0
+    assert block.find_time(datetime.fromisoformat("2021-02-11T17:29:35.5")) == 2
+    assert block.find_time(datetime.fromisoformat("2021-02-11T17:29:37.5")) == 4
+    assert block.find_time(datetime.fromisoformat("2021-02-11T17:29:38")) == 4
+    assert block.find_time(datetime.fromisoformat("2021-02-11T17:29:38"), after=True) is None
+
+
+def test_time_window(sample_patterns: LogPatterns) -> None:
+    block = make_timed_block(sample_patterns)
+    window = block.get_time_window(
+        datetime.fromisoformat("2021-02-11T17:29:35.5"),
+        datetime.fromisoformat("2021-02-11T17:29:37"),
+    )
+    assert (window.first, window.stop) == (2, 4)
+    assert list(window) == block.lines[2:4]
+    assert window.get_text() == "\n".join(block.lines[2:4])
+    assert window[-1] == block.lines[3]
+    assert len(block.get_time_window(None, None)) == len(block.lines)
+    assert len(block.get_time_window(datetime.fromisoformat("2022-01-01"), None)) == 0
+    # new lines make the index rebuilt
+    block.lines.append("INFO 2021-02-11T17:29:39.000 follow")
+    block.process_new_lines(5)
+    assert block.find_time(datetime.fromisoformat("2021-02-11T17:29:38.5")) == 5
+
+
+def test_find_hit(sample_patterns: LogPatterns) -> None:
+    block = LogBlock(sample_patterns, 1, "hits")
+    block.pattern_lines["x"] = array("I", [3, 7, 7, 12])
+    assert block.find_hit("x", 0, ">") == 0
+    assert block.find_hit("x", 3, ">") == 1
+    assert block.find_hit("x", 7, ">") == 3
+    assert block.find_hit("x", 12, ">") is None
+    assert block.find_hit("x", 12, "<") == 2
+    assert block.find_hit("x", 3, "<") is None
+    assert block.find_hit("x", 100, "<") == 3
+    assert block.find_hit("x", 5, "^") == 0
+    assert block.find_hit("x", 5, "$") == 3
+    assert block.find_hit("missing", 5, ">") is None
+    block.pattern_lines["x"] = array("I")
+    assert block.find_hit("x", 5, "$") is None
+
+
+def test_line_styles(sample_patterns: LogPatterns, sample_lines: list[str]) -> None:
+    blocks = make_blocks(sample_patterns, sample_lines, 1)
+    block = blocks[1]
+    assert block.get_line_styles() == array("B", bytes(len(block.lines)))
+    for num, pattern in enumerate(sample_patterns.get_all_patterns(), 1):
+        pattern.style_num = num
+    styles = block.get_line_styles()
+    last_pattern = {}
+    for pattern in sample_patterns.get_all_patterns():
+        for line in block.pattern_lines[pattern.p_id]:
+            last_pattern[line] = pattern.style_num
+    assert {line: style for line, style in enumerate(styles) if style} == last_pattern
+
+
+def test_visible_lines(
+    sample_patterns: LogPatterns, sample_lines: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    blocks = make_blocks(sample_patterns, sample_lines, 1)
+    block = blocks[0]
+    assert block.visible_lines is None
+    assert block.get_text() == block.lines.get_text()
+    hidden = sample_patterns.get_pattern("2")
+    assert hidden is not None
+    hidden.visible = False
+    hidden.modified = True
+    searches: list[object] = []
+    with monkeypatch.context() as patch:
+        # only the visibility changed, the regex is not searched again
+        patch.setattr(PatternMatcher, "search", lambda *args: searches.append(args))
+        block.search_patterns(sample_patterns.get_modified())
+    assert not searches
+    assert list(block.pattern_lines["2"]) == [4, 9]
+    block.search_patterns()
+    expected = [num for num in range(len(block.lines)) if num not in (4, 9)]
+    assert list(block.get_visible_lines()) == expected
+    assert block.get_text().split("\n") == [block.lines[num] for num in expected]
+    assert not block.is_line_visible(4)
+    assert block.to_display_line(4) == 4
+    assert block.to_display_line(10) == 8
+    assert block.from_display_line(8) == 10
+    assert len(block.get_line_styles()) == len(expected)
+    # a visible pattern shows the line again
+    free_search = sample_patterns.free_search
+    free_search.raw_pattern = "Process starts"
+    free_search.pattern = re.compile(free_search.raw_pattern)
+    block.search_patterns([free_search])
+    assert block.visible_lines is None
+
+
+@pytest.mark.parametrize("split", [5, 20, 29, 40])
+def test_follow_visible_lines(
+    sample_patterns: LogPatterns, sample_lines: list[str], split: int
+) -> None:
+    hidden = sample_patterns.get_pattern("2")
+    assert hidden is not None
+    hidden.visible = False
+    expected = make_blocks(sample_patterns, sample_lines, 1)
+    blocks = make_blocks(sample_patterns, sample_lines[:split], 1)
+    blocks.follow(sample_lines[split:])
+    for block_1, block_2 in zip(expected, blocks, strict=True):
+        assert list(block_1.get_visible_lines()) == list(block_2.get_visible_lines())
+
+
+@pytest.mark.parametrize("first", [0, 3, 5, 10, 16])
+def test_update_visible_from(
+    sample_patterns: LogPatterns, sample_lines: list[str], first: int
+) -> None:
+    hidden = sample_patterns.get_pattern("2")
+    assert hidden is not None
+    hidden.visible = False
+    block = make_blocks(sample_patterns, sample_lines, 1)[0]
+    shown = block.visible_lines
+    assert shown is not None
+    # a visible pattern shows the hidden lines from the first line again
+    block.set_hits("free", "Process", array("I", [4, 9]), first)
+    expected = [num for num in range(len(block.lines)) if num not in (4, 9) or num >= first]
+    assert list(block.get_visible_lines()) == expected
+    # the collection shown before is not changed
+    assert list(shown) == [num for num in range(len(block.lines)) if num not in (4, 9)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_iter_add_lines(
+    sample_patterns: LogPatterns,
+    sample_lines: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+    workers: int,
+) -> None:
+    monkeypatch.setattr(log_blocks, "PARALLEL_BLOCK_LINES", 0)
+    expected = make_blocks(sample_patterns, sample_lines, 1)
+    blocks = LogBlocks(sample_patterns)
+    streamed = list(blocks.iter_add_lines(sample_lines, workers))
+    assert streamed == blocks.data
+    for block_1, block_2 in zip(expected, streamed, strict=True):
+        assert block_1.name == block_2.name
+        assert block_1.props == block_2.props
+        assert block_1.pattern_lines == block_2.pattern_lines
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_only_finalized_published(
+    sample_patterns: LogPatterns,
+    sample_lines: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+    workers: int,
+) -> None:
+    monkeypatch.setattr(log_blocks, "PARALLEL_BLOCK_LINES", 0)
+    blocks = LogBlocks(sample_patterns)
+    for block in blocks.iter_add_lines(sample_lines, workers):
+        # other threads can use the published blocks while loading
+        assert blocks.data[-1] is block
+        assert all(len(b.times) == len(b.lines) for b in blocks.data)
+        assert all(b.searched for b in blocks.data)
+    assert [b.num for b in blocks.data] == [1, 2, 3]
+    assert not blocks.pending
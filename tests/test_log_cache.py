@@ -0,0 +1,136 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import os
+import pathlib
+
+import pytest
+
+from logtools.log_blocks import LogBlocks
+from logtools.log_cache import IndexCache, decode_blocks, encode_blocks, get_cache_key
+from logtools.log_data import LogData
+from logtools.log_patterns import LogPatterns
+
+
+@pytest.fixture
+def sample_patterns(src_samples: pathlib.Path) -> LogPatterns:
+    return LogPatterns(src_samples / "patterns.yml")
+
+
+@pytest.fixture
+def sample_log(src_samples: pathlib.Path) -> list[pathlib.Path]:
+    return [src_samples / "sample.log"]
+
+
+def test_encode_decode(sample_patterns: LogPatterns, sample_log: list[pathlib.Path]) -> None:
+    data = LogData(sample_patterns, sample_log, workers=1)
+    cached = decode_blocks(encode_blocks(data.log_blocks))
+    assert cached is not None
+    assert len(cached) == len(data.log_blocks)
+    for (name, count, result), block in zip(cached, data.log_blocks, strict=True):
+        assert name == block.base_name
+        assert count == len(block.lines)
+        assert result[:3] == (block.start, block.end, block.pattern_lines)
+        assert len(result[3]) == 0
+
+
+def test_decode_wrong_data() -> None:
+    assert decode_blocks(b"") is None
+    assert decode_blocks(b"NOPE" + bytes(20)) is None
+
+
+def test_warm_load(
+    sample_patterns: LogPatterns, sample_log: list[pathlib.Path], tmp_path: pathlib.Path
+) -> None:
+    cache = IndexCache(tmp_path)
+    cold = LogData(sample_patterns, sample_log, workers=1, cache=cache)
+    key = get_cache_key(sample_log, sample_patterns)
+    assert cache.get_path(key).is_file()
+    warm = LogData(sample_patterns, sample_log, workers=1, cache=cache)
+    for block_1, block_2 in zip(cold.log_blocks, warm.log_blocks, strict=True):
+        assert block_1.name == block_2.name
+        assert block_1.lines == block_2.lines
+        assert block_1.props == block_2.props
+        assert block_1.pattern_lines == block_2.pattern_lines
+
+
+def test_stopped_not_saved(
+    sample_patterns: LogPatterns, sample_log: list[pathlib.Path], tmp_path: pathlib.Path
+) -> None:
+    cache = IndexCache(tmp_path)
+    data = LogData(sample_patterns, sample_log, workers=1)
+    # the hits of a stopped pattern are not complete
+    data.log_blocks[1].costs["4"] = (12.0, 1024, 0, True)
+    cache.save("key", data.log_blocks)
+    assert not cache.get_path("key").exists()
+    data.log_blocks[1].costs["4"] = (0.1, 1024, 0, False)
+    cache.save("key", data.log_blocks)
+    assert cache.get_path("key").is_file()
+
+
+def test_key_depends_on_patterns(
+    sample_patterns: LogPatterns, sample_log: list[pathlib.Path]
+) -> None:
+    key = get_cache_key(sample_log, sample_patterns)
+    assert get_cache_key(sample_log, sample_patterns, merge=True) != key
+    assert get_cache_key(sample_log, sample_patterns, follow=True) != key
+    sample_patterns.data[0].raw_pattern = "changed"
+    assert get_cache_key(sample_log, sample_patterns) != key
+
+
+def test_follow_without_newline(
+    sample_patterns: LogPatterns, src_samples: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    log_file = tmp_path / "sample.log"
+    log_file.write_bytes((src_samples / "sample.log").read_bytes().rstrip(b"\n"))
+    cache = IndexCache(tmp_path / "cache")
+    LogData(sample_patterns, [log_file], workers=1, cache=cache)
+    # the last line is held back for follow, the whole file cache does not fit
+    fresh = LogData(sample_patterns, [log_file], workers=1, follow=True)
+    data = LogData(sample_patterns, [log_file], workers=1, cache=cache, follow=True)
+    for block_1, block_2 in zip(fresh.log_blocks, data.log_blocks, strict=True):
+        assert block_1.lines == block_2.lines
+        assert block_1.pattern_lines == block_2.pattern_lines
+        assert block_1.end == block_2.end
+
+
+@pytest.mark.parametrize("change", [-3, 2])
+def test_restore_mismatch(
+    sample_patterns: LogPatterns, sample_log: list[pathlib.Path], change: int
+) -> None:
+    cached = decode_blocks(
+        encode_blocks(LogData(sample_patterns, sample_log, workers=1).log_blocks)
+    )
+    assert cached is not None
+    lines = sample_log[0].read_text(encoding="latin2").splitlines()
+    lines = lines[:change] if change < 0 else lines + ["ERROR appended"] * change
+    expected = LogBlocks(sample_patterns)
+    for line in lines:
+        expected.add_line(line)
+    expected.finalize()
+    blocks = LogBlocks(sample_patterns)
+    list(blocks.iter_restore(lines, cached))
+    # the lines not fitting the cache are analyzed
+    assert not blocks.restored
+    for block_1, block_2 in zip(expected, blocks, strict=True):
+        assert block_1.lines == block_2.lines
+        assert block_1.pattern_lines == block_2.pattern_lines
+        assert block_1.name == block_2.name
+
+
+def test_lru_eviction(tmp_path: pathlib.Path) -> None:
+    cache = IndexCache(tmp_path, max_size=25)
+    for i, name in enumerate(["old", "middle", "new"]):
+        path = tmp_path / f"{name}.idx"
+        path.write_bytes(bytes(10))
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    # using the oldest makes it the most recent
+    assert cache.load("old") is None  # not a valid entry, but still touched
+    cache.evict()
+    assert sorted(path.stem for path in tmp_path.iterdir()) == ["new", "old"]
@@ -0,0 +1,124 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import pathlib
+
+import pytest
+
+from logtools import log_data
+from logtools.log_cache import IndexCache
+from logtools.log_data import LogData, LogLoader
+from logtools.log_patterns import LogPatterns
+from logtools.utils import LogToolsError
+
+
+@pytest.fixture
+def sample_patterns(src_samples: pathlib.Path) -> LogPatterns:
+    return LogPatterns(src_samples / "patterns.yml")
+
+
+@pytest.fixture
+def sample_log(src_samples: pathlib.Path) -> list[pathlib.Path]:
+    return [src_samples / "sample.log"]
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_iter_load(
+    sample_patterns: LogPatterns,
+    sample_log: list[pathlib.Path],
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    use_cache: bool,
+) -> None:
+    monkeypatch.setattr(log_data, "PROGRESS_LINES", 10)
+    cache = IndexCache(tmp_path) if use_cache else None
+    expected = LogData(sample_patterns, sample_log, workers=1, cache=cache)
+    data = LogData(sample_patterns, sample_log, workers=1, cache=cache, load=False)
+    assert not data.log_blocks
+    progress: list[tuple[int, int]] = []
+    blocks = list(data.iter_load(lambda bytes_read, total: progress.append((bytes_read, total))))
+    assert [block.name for block in blocks] == [block.name for block in expected.log_blocks]
+    assert blocks == data.log_blocks.data
+    total = sample_log[0].stat().st_size
+    assert len(progress) > 1
+    assert progress == sorted(progress)
+    assert progress[-1] == (total, total)
+    data.check_loaded()
+
+
+def test_loader(sample_patterns: LogPatterns, sample_log: list[pathlib.Path]) -> None:
+    data = LogData(sample_patterns, sample_log, workers=1, load=False)
+    loader = LogLoader(data)
+    loader.start()
+    events = list(loader.iter_events())
+    kinds = [kind for kind, _ in events]
+    assert kinds.count("block") == 3
+    assert "progress" in kinds
+    assert kinds[-1] == "done"
+    blocks = [value for kind, value in events if kind == "block"]
+    assert blocks == list(data.log_blocks)
+
+
+def test_loader_error(sample_patterns: LogPatterns, tmp_path: pathlib.Path) -> None:
+    log_file = tmp_path / "gone.log"
+    log_file.write_text("INFO line\n")
+    loader = LogLoader(LogData(sample_patterns, [log_file], workers=1, load=False))
+    log_file.unlink()
+    loader.start()
+    assert [kind for kind, _ in loader.iter_events()] == ["error"]
+
+
+@pytest.mark.parametrize("merge", [False, True])
+def test_follow_after_load(
+    sample_patterns: LogPatterns, src_samples: pathlib.Path, tmp_path: pathlib.Path, merge: bool
+) -> None:
+    log_file = tmp_path / "sample.log"
+    log_file.write_bytes((src_samples / "sample.log").read_bytes())
+    data = LogData(sample_patterns, [log_file], workers=1, load=False, merge=merge, follow=True)
+    # written after the follower was created, before the logs are read
+    with log_file.open("ab") as f:
+        f.write(b"appended during load\npartial")
+    list(data.iter_load())
+    assert data.log_blocks[-1].lines[-1] == "appended during load"
+    with log_file.open("ab") as f:
+        f.write(b" rest of partial\n")
+    data.follow()
+    assert list(data.log_blocks[-1].lines)[-2:] == [
+        "appended during load",
+        "partial rest of partial",
+    ]
+
+
+def test_no_lines(sample_patterns: LogPatterns, tmp_path: pathlib.Path) -> None:
+    log_file = tmp_path / "empty.log"
+    log_file.write_bytes(b"")
+    data = LogData(sample_patterns, [log_file], workers=1, load=False)
+    assert not list(data.iter_load())
+    with pytest.raises(LogToolsError):
+        data.check_loaded()
+    with pytest.raises(LogToolsError):
+        LogData(sample_patterns, [log_file], workers=1)
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_merge(sample_patterns: LogPatterns, tmp_path: pathlib.Path, use_cache: bool) -> None:
+    lines = [f"INFO 2021-02-11T17:29:{num:02}.000 main.cpp:1 line {num}" for num in range(40)]
+    lines[0] += " [InitializeApplication] Initialized Application 1.2 version"
+    lines[20] += " [InitializeApplication] Initialized Application 1.3 version"
+    # lines go to the files in turns, merging gives back the original order
+    log_files = [tmp_path / "first.log", tmp_path / "second.log"]
+    for num, log_file in enumerate(log_files):
+        log_file.write_text("\n".join(lines[num::2]) + "\n", encoding="latin2")
+    cache = IndexCache(tmp_path / "cache") if use_cache else None
+    LogData(sample_patterns, log_files, workers=1, cache=cache, merge=True)
+    data = LogData(sample_patterns, log_files, workers=1, cache=cache, merge=True)
+    assert [block.name for block in data.log_blocks] == ["01 1.2 Crash", "02 1.3 Crash"]
+    assert [line for block in data.log_blocks for line in block.lines] == lines
+    names = [data.log_files[source].name for block in data.log_blocks for source in block.sources]
+    assert names == [log_files[num % 2].name for num in range(len(lines))]
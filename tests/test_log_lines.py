@@ -0,0 +1,92 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import pickle
+
+import pytest
+
+from logtools import log_lines
+from logtools.log_lines import LogLines
+
+
+LINES = ["first", "", "third line", "\xe1rv\xedztűrő", "last"]
+
+
+def test_access() -> None:
+    lines = LogLines(LINES)
+    assert len(lines) == len(LINES)
+    assert lines[0] == "first"
+    assert lines[1] == ""
+    assert lines[-1] == "last"
+    assert lines[1:3] == LINES[1:3]
+    assert list(lines) == LINES
+    assert list(reversed(lines)) == LINES[::-1]
+    assert lines.get_text() == "\n".join(LINES)
+    with pytest.raises(IndexError):
+        _ = lines[len(LINES)]
+
+
+def test_empty() -> None:
+    lines = LogLines()
+    assert not lines
+    assert list(lines) == []
+    assert lines.get_text() == ""
+
+
+def test_append_after_read(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(log_lines, "CHUNK_LINES", 2)
+    lines = LogLines(LINES[:3])
+    assert lines[2] == "third line"
+    lines.extend(LINES[3:])
+    assert lines == LINES
+    assert lines == LogLines(LINES)
+    assert lines != LogLines(LINES[:-1])
+
+
+def test_follow_appends(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(log_lines, "CHUNK_LINES", 3)
+    expected = [f"line {num}" for num in range(1000)]
+    lines = LogLines(expected[:500])
+    assert lines[499] == "line 499"
+    for num in range(500, 1000):
+        lines.append(expected[num])
+        assert lines[-1] == expected[num]
+    assert list(lines) == expected
+    assert lines[1:1000:111] == expected[1:1000:111]
+    assert list(lines.iter_range(490, 620)) == expected[490:620]
+    for first, stop in [(0, 1000), (499, 501), (700, 990), (998, 2000)]:
+        assert lines.get_range_text(first, stop) == "\n".join(expected[first:stop])
+    assert lines.get_text() == "\n".join(expected)
+
+
+def test_compact_cost() -> None:
+    lines = LogLines(f"line {num}" for num in range(200_000))
+    big = lines.get_text()
+    for num in range(100):
+        lines.append(f"new {num}")
+        assert lines[-1] == f"new {num}"
+    # a few small buffers after the big one, which is kept as it is
+    assert lines.get_range_text(0, 200_000) == big
+    assert len(lines._texts) < 10  # noqa: SLF001 - checking the storage
+
+
+def test_pickle() -> None:
+    lines = LogLines(LINES)
+    assert pickle.loads(pickle.dumps(lines)) == lines
+
+
+def test_copy(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(log_lines, "CHUNK_LINES", 2)
+    lines = LogLines(LINES[:3])
+    copy = lines.copy()
+    # appending and joining the buffers of the original does not change the copy
+    lines.extend(LINES[3:] * 5)
+    assert lines.get_text().startswith(copy.get_text())
+    assert copy == LINES[:3]
+    assert copy.get_range_text(1, 3) == "\n".join(LINES[1:3])
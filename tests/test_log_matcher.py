@@ -0,0 +1,182 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+from array import array
+
+import pytest
+
+from logtools import log_matcher
+from logtools.log_lines import LogLines
+from logtools.log_matcher import (
+    PREFILTER_ID,
+    BlockSplitter,
+    PatternMatcher,
+    can_combine,
+    format_cost,
+)
+from logtools.log_pattern import LogPattern, create_empty_pattern
+
+
+LINES = [
+    "INFO start of the app",
+    "DEBUG some details",
+    "ERROR process failed",
+    "INFO ERROR in the info",
+    "DEBUG aa bb aa",
+    "",
+]
+
+
+def make_pattern(p_id: str, raw: str, prop: str = "") -> LogPattern:
+    pattern = create_empty_pattern()
+    data = pattern.get_data()
+    data["pattern"] = raw
+    data["block_start"] = bool(prop)
+    data["property"] = prop
+    return LogPattern(f"Pattern {p_id}", p_id, data)
+
+
+def simple_search(pattern: LogPattern) -> list[int]:
+    return [num for num, line in enumerate(LINES) if pattern.search(line)]
+
+
+def test_can_combine() -> None:
+    assert can_combine(make_pattern("0", "ERROR"))
+    assert can_combine(make_pattern("0", "(a+) (b+)"))
+    assert not can_combine(make_pattern("0", r"(aa) bb \1"))
+    assert not can_combine(make_pattern("0", r"(?P<x>aa) bb (?P=x)"))
+    assert not can_combine(make_pattern("0", "(?i)error"))
+
+
+def test_overlapping_patterns() -> None:
+    patterns = [
+        make_pattern("0", "^INFO"),
+        make_pattern("1", "ERROR"),
+        make_pattern("2", "INFO ERROR"),
+        make_pattern("3", "(?i)debug"),
+        make_pattern("4", r"(aa) bb \1"),
+        make_pattern("5", "not present"),
+    ]
+    matcher = PatternMatcher(patterns)
+    assert matcher.prefilter is not None
+    result = matcher.search(LINES)
+    for pattern in patterns:
+        assert list(result[pattern.p_id]) == simple_search(pattern)
+
+
+def test_candidates_read_back() -> None:
+    patterns = [make_pattern("0", "ERROR"), make_pattern("1", "^INFO"), make_pattern("2", "aa")]
+    matcher = PatternMatcher(patterns)
+    assert matcher.prefilter is not None
+    assert matcher.search(LogLines(LINES)) == matcher.search(LINES)
+    candidates, scanned, stopped = log_matcher.scan(
+        matcher.prefilter.search, enumerate(LINES), 1.0
+    )
+    assert candidates == array("I", [0, 2, 3, 4])
+    assert (scanned, stopped) == (len(LINES), False)
+
+
+def test_empty_pattern_skipped() -> None:
+    patterns = [make_pattern("0", "ERROR"), make_pattern("free", "")]
+    result = PatternMatcher(patterns).search(LINES)
+    assert result == {"0": array("I", [2, 3])}
+
+
+def test_costs() -> None:
+    patterns = [
+        make_pattern("0", "ERROR"),
+        make_pattern("1", "DEBUG"),
+        make_pattern("2", r"(a)\1"),
+    ]
+    matcher = PatternMatcher(patterns)
+    matcher.search(LINES)
+    assert set(matcher.costs) == {PREFILTER_ID, "0", "1", "2"}
+    assert matcher.costs[PREFILTER_ID][1:] == (len(LINES), 4, False)
+    # combined patterns check the prefiltered lines only
+    assert matcher.costs["0"][1:] == (4, 2, False)
+    assert matcher.costs["2"][1:] == (len(LINES), 1, False)
+    assert all(seconds >= 0 for seconds, _, _, _ in matcher.costs.values())
+
+
+def test_budget_stops_patterns() -> None:
+    lines = LINES * 1000
+    patterns = [make_pattern("0", "ERROR"), make_pattern("1", "DEBUG")]
+    matcher = PatternMatcher(patterns, budget=0.0, line_budget=0.0)
+    result = matcher.search(lines)
+    chunk = log_matcher.BUDGET_CHUNK_LINES
+    # the prefilter was stopped, then every pattern after its first chunk
+    candidates = sum(1 for line in lines[:chunk] if "ERROR" in line or "DEBUG" in line)
+    assert matcher.costs[PREFILTER_ID][1:] == (chunk, candidates, True)
+    assert matcher.costs["0"][1] == chunk
+    assert matcher.costs["0"][3]
+    assert list(result["0"]) == [num for num in range(chunk) if "ERROR" in lines[num]]
+    # a budget that is not exceeded is not marked
+    matcher = PatternMatcher(patterns, budget=0.0, line_budget=0.0)
+    matcher.search(lines[:chunk])
+    assert not any(stopped for _, _, _, stopped in matcher.costs.values())
+
+
+def test_budget_grows_with_lines() -> None:
+    lines = LINES * 1000
+    patterns = [make_pattern("0", "ERROR"), make_pattern("1", "DEBUG")]
+    # no fixed budget, but enough time for every line
+    matcher = PatternMatcher(patterns, budget=0.0, line_budget=1.0)
+    result = matcher.search(lines)
+    assert not any(stopped for _, _, _, stopped in matcher.costs.values())
+    assert len(result["0"]) == sum(1 for line in lines if "ERROR" in line)
+
+
+def test_format_cost() -> None:
+    assert format_cost("A", (0.0125, 10, 2, False)) == "A: 12.5 ms, 10 lines, 2 hits"
+    assert format_cost("A", (1.0, 10, 2, True)).endswith(", STOPPED as too slow")
+
+
+SPLIT_LINES = [
+    "START one",
+    "body",
+    "BEGIN two x",
+    "body START",
+    "",
+    "START three",
+    "STAR",
+    "T four",
+]
+
+
+def simple_starts(splitter: BlockSplitter) -> list[tuple[int, str]]:
+    return [
+        (num, name)
+        for num, line in enumerate(SPLIT_LINES)
+        if (name := splitter.match(line)) is not None
+    ]
+
+
+@pytest.mark.parametrize(
+    "raws",
+    [
+        [r"^START (\w+)$", r"^BEGIN (\w+)"],
+        [r"START (\w+)", r"BEGIN (\w+)"],
+        [r"^START\s+(\w+)", r"BEGIN (\w+)"],
+        [r"^(?!body)START (\w+)", r"BEGIN (\w+)"],
+    ],
+)
+def test_block_splitter(raws: list[str]) -> None:
+    splitter = BlockSplitter([make_pattern(str(num), raw, "1") for num, raw in enumerate(raws)])
+    # every block start pattern is checked, not only the first one
+    assert ("2", "two") in [(str(num), name) for num, name in simple_starts(splitter)]
+    expected = simple_starts(splitter)
+    for ending, last in [("\n", "\n"), ("\n", ""), ("\r\n", "\r\n")]:
+        text = ending.join(SPLIT_LINES) + last
+        assert splitter.find_starts(text, text.splitlines()) == expected
+
+
+def test_block_splitter_empty() -> None:
+    splitter = BlockSplitter([make_pattern("0", "", "1")])
+    assert splitter.match("ERROR") is None
+    assert splitter.find_starts("ERROR\n", ["ERROR"]) == []
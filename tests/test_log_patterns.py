@@ -139,3 +139,13 @@ def test_update_pattern(test_patterns: LogPatterns) -> None:
     assert patterns[0].name == "App start"
     assert patterns[1].name == "New pattern"
     assert patterns[2].name == "Free search"
+
+
+def test_get_modified(test_patterns: LogPatterns) -> None:
+    assert list(test_patterns.get_modified()) == []
+    test_patterns.data[1].modified = True
+    test_patterns.free_search.modified = True
+    names = [pattern.name for pattern in test_patterns.get_modified()]
+    assert names == ["App end", "Free search"]
+    test_patterns.clear_modified()
+    assert list(test_patterns.get_modified()) == []
@@ -0,0 +1,194 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import pathlib
+import sys
+from collections.abc import Callable
+
+import pytest
+
+from logtools.log_reader import (
+    LogFollower,
+    detect_compression,
+    get_plain_name,
+    iter_buffer_lines,
+    iter_files_chunks,
+    iter_files_lines,
+    iter_lines,
+    iter_merged_lines,
+    iter_stream_chunks,
+)
+from logtools.utils import LogToolsError
+
+
+COMPRESSORS: dict[str, tuple[str, Callable[[bytes], bytes]]] = {
+    "gzip": (".gz", gzip.compress),
+    "bz2": (".bz2", bz2.compress),
+    "xz": (".xz", lzma.compress),
+}
+
+
+def write_compressed(path: pathlib.Path, raw: bytes, compression: str) -> pathlib.Path:
+    suffix, compress = COMPRESSORS[compression]
+    log_file = path.with_name(path.name + suffix)
+    log_file.write_bytes(compress(raw))
+    return log_file
+
+
+def test_sample_lines(src_samples: pathlib.Path) -> None:
+    sample = src_samples / "sample.log"
+    expected = sample.read_text(encoding="latin2").splitlines()
+    assert list(iter_lines(sample)) == expected
+
+
+def test_empty_file(tmp_path: pathlib.Path) -> None:
+    log_file = tmp_path / "empty.log"
+    log_file.write_bytes(b"")
+    assert list(iter_lines(log_file)) == []
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 1000])
+def test_chunk_boundaries(chunk_size: int) -> None:
+    raw = b"first\r\nsecond\n\nthird line is long\n\xe1rv\xedzt\xfbr\xf5\nlast"
+    expected = raw.decode("latin2").splitlines()
+    assert list(iter_buffer_lines(raw, chunk_size)) == expected
+
+
+def test_follower(tmp_path: pathlib.Path) -> None:
+    log_file = tmp_path / "follow.log"
+    log_file.write_bytes(b"old line\n")
+    follower = LogFollower([log_file])
+    assert follower.read_new_lines() == []
+    with log_file.open("ab") as f:
+        f.write(b"new line 1\nnew line 2\npartial")
+    assert follower.read_new_lines() == ["new line 1", "new line 2"]
+    with log_file.open("ab") as f:
+        f.write(b" line\n")
+    assert follower.read_new_lines() == ["partial line"]
+    log_file.write_bytes(b"truncated\n")
+    assert follower.read_new_lines() == ["truncated"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 1000])
+def test_stream_chunk_boundaries(chunk_size: int) -> None:
+    raw = b"first\r\nsecond\n\nthird line is long\n\xe1rv\xedzt\xfbr\xf5\nlast"
+    expected = raw.decode("latin2").splitlines()
+    chunks = list(iter_stream_chunks(io.BytesIO(raw), chunk_size))
+    assert [line for text in chunks for line in text.splitlines()] == expected
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+def test_compressed(src_samples: pathlib.Path, tmp_path: pathlib.Path, compression: str) -> None:
+    raw = (src_samples / "sample.log").read_bytes()
+    # name does not matter, the format is detected by the content
+    log_file = write_compressed(tmp_path / "sample.log", raw, compression)
+    renamed = log_file.rename(tmp_path / "sample.dat")
+    assert detect_compression(renamed) == compression
+    assert list(iter_lines(renamed)) == raw.decode("latin2").splitlines()
+    assert LogFollower([renamed]).offsets == {}
+
+
+def test_plain_detection(src_samples: pathlib.Path) -> None:
+    assert detect_compression(src_samples / "sample.log") is None
+    assert get_plain_name(pathlib.Path("a/app.log.xz")) == pathlib.Path("a/app.log")
+    assert get_plain_name(pathlib.Path("a/app.log")) == pathlib.Path("a/app.log")
+
+
+def test_files_lines(tmp_path: pathlib.Path) -> None:
+    contents = [f"file {num} line {line}\n" for num in range(5) for line in range(3)]
+    log_files = []
+    for num, compression in enumerate(["gzip", "", "xz", "bz2", "gzip"]):
+        raw = "".join(contents[num * 3 : num * 3 + 3]).encode()
+        log_file = tmp_path / f"{num}.log"
+        if compression:
+            log_files.append(write_compressed(log_file, raw, compression))
+        else:
+            log_file.write_bytes(raw)
+            log_files.append(log_file)
+    assert list(iter_files_lines(log_files)) == [line.rstrip() for line in contents]
+
+
+def test_bytes_read(tmp_path: pathlib.Path) -> None:
+    # random lines compress to about the half, still spanning more chunks
+    raw = b"".join(os.urandom(50).hex().encode() + b"\n" for _ in range(30_000))
+    plain = tmp_path / "plain.log"
+    plain.write_bytes(raw)
+    log_files = [
+        write_compressed(tmp_path / "a.log", raw, "gzip"),
+        plain,
+        write_compressed(tmp_path / "b.log", raw, "xz"),
+    ]
+    total = sum(log_file.stat().st_size for log_file in log_files)
+    follower = LogFollower(log_files)
+    progress = [follower.bytes_read for _ in iter_files_chunks(log_files, follower)]
+    assert 0 < progress[0] < log_files[0].stat().st_size
+    assert progress == sorted(progress)
+    assert progress[-1] == total
+
+
+def test_files_lines_error(tmp_path: pathlib.Path) -> None:
+    good = write_compressed(tmp_path / "good.log", b"line\n", "gzip")
+    bad = tmp_path / "bad.log.gz"
+    bad.write_bytes(gzip.compress(b"line\n")[:-8] + b"broken!!")
+    with pytest.raises(LogToolsError, match="CRC"):
+        list(iter_files_lines([good, bad]))
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+def test_truncated(src_samples: pathlib.Path, tmp_path: pathlib.Path, compression: str) -> None:
+    raw = (src_samples / "sample.log").read_bytes()
+    log_file = write_compressed(tmp_path / "sample.log", raw, compression)
+    log_file.write_bytes(log_file.read_bytes()[:-20])
+    with pytest.raises(LogToolsError, match="cannot be decompressed"):
+        list(iter_lines(log_file))
+
+
+def test_zstd_missing(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    log_file = tmp_path / "app.log.zst"
+    log_file.write_bytes(b"\x28\xb5\x2f\xfd" + bytes(10))
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    assert detect_compression(log_file) == "zstd"
+    with pytest.raises(LogToolsError):
+        list(iter_lines(log_file))
+
+
+def test_merged_lines(tmp_path: pathlib.Path) -> None:
+    log_1 = tmp_path / "a.log"
+    log_1.write_bytes(
+        b"INFO 2021-02-11T10:00:01.000 a1\n  trace of a1\nINFO 2021-02-11T10:00:03.000 a2\n"
+    )
+    log_2 = write_compressed(
+        tmp_path / "b.log",
+        b"no time first\nINFO 2021-02-11T10:00:02.000 b1\nINFO 2021-02-11T10:00:03.000 b2\n",
+        "gzip",
+    )
+    assert list(iter_merged_lines([log_1, log_2])) == [
+        (1, "no time first"),
+        (0, "INFO 2021-02-11T10:00:01.000 a1"),
+        (0, "  trace of a1"),
+        (1, "INFO 2021-02-11T10:00:02.000 b1"),
+        (0, "INFO 2021-02-11T10:00:03.000 a2"),
+        (1, "INFO 2021-02-11T10:00:03.000 b2"),
+    ]
+
+
+def test_follower_sources(tmp_path: pathlib.Path) -> None:
+    log_files = [tmp_path / "a.log", tmp_path / "b.log"]
+    for log_file in log_files:
+        log_file.write_bytes(b"")
+    follower = LogFollower(log_files)
+    log_files[1].write_bytes(b"b1\nb2\n")
+    log_files[0].write_bytes(b"a1\n")
+    assert follower.read_new_lines() == ["a1", "b1", "b2"]
+    assert list(follower.last_sources) == [0, 1, 1]
@@ -0,0 +1,172 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import pathlib
+import re
+import threading
+from array import array
+
+import pytest
+
+from logtools import log_search
+from logtools.log_block import LogBlock
+from logtools.log_data import LogData
+from logtools.log_patterns import LogPatterns
+from logtools.log_search import BackgroundSearch, SearchResults, compile_search
+from logtools.utils import LogToolsError
+
+
+class Collector:
+    """
+    Collect the results of a search
+    """
+
+    def __init__(self) -> None:
+        self.hits: list[tuple[int, int, int, list[int]]] = []
+        self.done: list[tuple[int, str | None]] = []
+        self.finished = threading.Event()
+
+    def on_hits(self, generation: int, block: LogBlock, first: int, hits: "array[int]") -> None:
+        """
+        Record the hits of a block
+        """
+        self.hits.append((generation, block.num, first, hits.tolist()))
+
+    def on_done(self, generation: int, problem: str | None) -> None:
+        """
+        Record the end of the search
+        """
+        self.done.append((generation, problem))
+        self.finished.set()
+
+
+@pytest.fixture
+def sample_blocks(src_samples: pathlib.Path) -> list[LogBlock]:
+    patterns = LogPatterns(src_samples / "patterns.yml")
+    return list(LogData(patterns, [src_samples / "sample.log"], workers=1).log_blocks)
+
+
+def test_compile_search() -> None:
+    assert compile_search(r"ERROR (\d+\.)+").pattern == r"ERROR (\d+\.)+"
+    with pytest.raises(LogToolsError, match="Invalid regex"):
+        compile_search("ERROR (")
+    with pytest.raises(LogToolsError, match="Nested repetition"):
+        compile_search(r"(\w+\s?)*$")
+
+
+def test_search_order(sample_blocks: list[LogBlock], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(log_search, "SEARCH_CHUNK_LINES", 3)
+    collector = Collector()
+    search = BackgroundSearch(collector.on_hits, collector.on_done)
+    blocks = [sample_blocks[1], sample_blocks[0], sample_blocks[2]]
+    pattern = re.compile("Process")
+    generation = search.start(pattern, blocks)
+    assert collector.finished.wait(30)
+    search.close()
+    assert [num for _, num, _, _ in collector.hits] == [2, 1, 3]
+    for (_, _, _, hits), block in zip(collector.hits, blocks, strict=True):
+        assert hits == [num for num, line in enumerate(block.lines) if pattern.search(line)]
+    assert collector.done == [(generation, None)]
+
+
+def test_search_cancelled(sample_blocks: list[LogBlock]) -> None:
+    block = sample_blocks[0]
+    block.add("a" * 100)
+    collector = Collector()
+    search = BackgroundSearch(collector.on_hits, collector.on_done)
+    generation = search.start(re.compile("(a|aa)*b"), [block])
+    search.cancel()
+    search.add(block)
+    search.close()
+    assert not search.is_current(generation)
+    assert collector.hits == []
+    assert collector.done == []
+    assert search.pool is None
+
+
+def test_search_budget(sample_blocks: list[LogBlock], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(log_search, "SEARCH_BUDGET", -1.0)
+    collector = Collector()
+    search = BackgroundSearch(collector.on_hits, collector.on_done)
+    generation = search.start(re.compile("Process"), sample_blocks)
+    assert collector.finished.wait(30)
+    search.close()
+    assert collector.hits == []
+    # reported once, the other blocks are skipped
+    assert collector.done == [(generation, "Search was too slow, stopped")]
+
+
+def test_search_thread(sample_blocks: list[LogBlock]) -> None:
+    collector = Collector()
+    search = BackgroundSearch(collector.on_hits, collector.on_done)
+    generation = search.start(re.compile("ERROR"), sample_blocks)
+    assert collector.finished.wait(30)
+    search.close()
+    assert collector.done == [(generation, None)]
+    assert [hits for _, _, _, hits in collector.hits] == [[], [11], []]
+
+
+def test_search_added_lines(sample_blocks: list[LogBlock]) -> None:
+    collector = Collector()
+    search = BackgroundSearch(collector.on_hits, collector.on_done)
+    block = sample_blocks[1]
+    generation = search.start(re.compile("ERROR"), [block])
+    first = len(block.lines)
+    block.add("ERROR followed")
+    block.add("INFO followed")
+    # only the new lines are searched, after the running search
+    search.add(block, first)
+    search.tasks.join()
+    search.close()
+    assert collector.hits == [(generation, 2, 0, [11]), (generation, 2, first, [first])]
+    # nothing to search without a search
+    search.cancel()
+    search.add(block)
+    assert search.thread is None
+
+
+def test_search_runaway(sample_blocks: list[LogBlock], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(log_search, "SEARCH_BUDGET", 1.0)
+    block = sample_blocks[0]
+    block.add("a" * 100)
+    collector = Collector()
+    search = BackgroundSearch(collector.on_hits, collector.on_done)
+    generation = search.start(re.compile("(a|aa)*b"), [block])
+    # not missed by the nested repetition check, it would backtrack for ages
+    assert collector.finished.wait(30)
+    assert collector.done == [(generation, "Search was too slow, stopped")]
+    assert collector.hits == []
+    # the search process was killed, lines added later are not searched
+    assert search.pool is None
+    search.add(block, len(block.lines) - 1)
+    search.close()
+    assert collector.hits == []
+
+
+def test_results(sample_blocks: list[LogBlock]) -> None:
+    results = SearchResults(sample_blocks, "2")
+    expected = [(block.num, line) for block in sample_blocks for line in block.pattern_lines["2"]]
+    assert len(results) == len(expected) == 8
+    assert [
+        (results.get_hit(row)[0].num, results.get_hit(row)[1]) for row in range(8)
+    ] == expected
+    assert results.hit_blocks == 3
+    name, line, time_text, text = results.get_texts(0)
+    block, num = results.get_hit(0)
+    assert name == block.name
+    assert line == str(num + 1)
+    assert time_text == block.lines[num].split()[1].replace("T", " ") + "000"
+    assert text == block.lines[num]
+
+
+def test_results_sparse(sample_blocks: list[LogBlock]) -> None:
+    results = SearchResults(sample_blocks, "4")
+    assert len(results) == 1
+    assert results.hit_blocks == 1
+    assert len(SearchResults(sample_blocks, "unknown")) == 0
@@ -0,0 +1,103 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import pathlib
+
+import pytest
+
+from logtools import log_stats
+from logtools.log_data import LogData
+from logtools.log_patterns import LogPatterns
+from logtools.log_stats import LogStats, group_minutes, make_histogram
+
+
+@pytest.fixture
+def sample_data(src_samples: pathlib.Path) -> LogData:
+    patterns = LogPatterns(src_samples / "patterns.yml")
+    return LogData(patterns, [src_samples / "sample.log"], workers=1)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def numpy_mode(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    if request.param == "numpy" and not log_stats.USE_NUMPY:
+        pytest.skip("numpy is not installed")
+    if request.param == "python":
+        monkeypatch.setattr(log_stats, "USE_NUMPY", False)
+
+
+@pytest.mark.usefixtures("numpy_mode")
+def test_stats(sample_data: LogData) -> None:
+    summary = LogStats(sample_data.log_blocks, sample_data.patterns).get_summary()
+    assert summary["blocks"] == 3
+    assert summary["crashes"] == 1
+    durations = summary["durations"]
+    assert durations["count"] == 3
+    assert durations["max"] == 20.0
+    assert sum(item["count"] for item in durations["histogram"]) == 3
+    errors = summary["hits"]["ERROR log"]
+    assert errors["total"] == 1
+    assert errors["per_block"] == [0, 1, 0]
+    assert errors["per_minute"] == {"2021-02-11T19:04": 1}
+    starts = summary["hits"]["App start"]
+    assert sum(starts["per_minute"].values()) == 3
+
+
+@pytest.mark.usefixtures("numpy_mode")
+def test_histogram() -> None:
+    assert make_histogram([]) == []
+    assert make_histogram([5.0, 5.0]) == [(5.0, 5.0, 2)]
+    histogram = make_histogram([0.0, 1.0, 2.0, 10.0], bins=5)
+    assert [count for _, _, count in histogram] == [2, 1, 0, 0, 1]
+    assert histogram[0][0] == 0.0
+    assert histogram[-1][1] == 10.0
+
+
+def test_group_minutes() -> None:
+    minutes = {num * 3: 1 for num in range(10)}
+    assert group_minutes(minutes, 10) == (1, minutes)
+    step, groups = group_minutes(minutes, 4)
+    assert step == 8
+    assert groups == {0: 3, 8: 3, 16: 2, 24: 2}
+
+
+def test_text(sample_data: LogData) -> None:
+    text = sample_data.get_stats().get_text()
+    assert text.startswith("Blocks: 3, crashes: 1 (33.3%)")
+    assert "ERROR log, hits per 1 minute(s):" in text
+    assert "2021-02-11 19:04 |" in text
+
+
+def test_unknown(sample_data: LogData) -> None:
+    block = sample_data.log_blocks[1]
+    block.costs["1"] = (12.0, 1024, 0, True)
+    block.update_props()
+    stats = LogStats(sample_data.log_blocks, sample_data.patterns)
+    assert stats.get_summary()["crashes"] == 0
+    assert stats.get_summary()["unknown"] == 1
+    assert stats.get_text().startswith("Blocks: 3, crashes: 0 (0.0%), unknown: 1")
+
+
+def test_costs(sample_data: LogData) -> None:
+    stats = sample_data.get_stats()
+    rows = [row for row in stats.costs if row[1] == "ERROR log"]
+    assert [(name, hits) for name, _, _, _, hits, _ in rows] == [
+        ("01 1.2 OK", 0),
+        ("02 1.2 Crash", 1),
+        ("03 1.3 OK", 0),
+    ]
+    assert "stopped as too slow" not in stats.get_text()
+
+
+def test_cached(sample_data: LogData) -> None:
+    stats = sample_data.get_stats()
+    assert sample_data.get_stats() is stats
+    sample_data.log_blocks.follow(["ERROR 2021-02-11T19:30:00.000 main.cpp:1 late error"])
+    new_stats = sample_data.get_stats()
+    assert new_stats is not stats
+    assert new_stats.get_summary()["hits"]["ERROR log"]["per_block"] == [0, 1, 1]
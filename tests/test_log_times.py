@@ -0,0 +1,86 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+from datetime import datetime
+
+import pytest
+
+from logtools.log_times import NO_TIME, TimeParser, from_micros, parse_time_input, to_micros
+from logtools.utils import LogToolsError
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "2021-02-11T17:29:35",
+        "2021-02-11T17:29:35.112",
+        "2021-02-11T17:29:35.112345",
+        "2021-02-11T17:29:35,112",
+        "2021-02-11 17:29:35.1",
+        "2021-02-11T17:29",
+        "2021-02-11",
+        "2021-02-11T17:29:35.112+02:00",
+    ],
+)
+def test_same_as_fromisoformat(token: str) -> None:
+    parser = TimeParser()
+    expected = to_micros(datetime.fromisoformat(token))
+    # second parse uses the cached prefix when possible
+    assert parser.parse_token(token) == expected
+    assert parser.parse_token(token) == expected
+
+
+@pytest.mark.parametrize(
+    "token", ["", "INFO", "2021-02-30T17:29:35", "2021-02-11T17:29:35.x12", "17:29:35"]
+)
+def test_invalid(token: str) -> None:
+    parser = TimeParser()
+    assert parser.parse_token(token) == NO_TIME
+    assert parser.parse_token(token) == NO_TIME
+
+
+def test_cached_prefix_with_bad_fraction() -> None:
+    parser = TimeParser()
+    parser.parse_token("2021-02-11T17:29:35.112")
+    assert parser.parse_token("2021-02-11T17:29:35.1x2") == NO_TIME
+    assert parser.parse_token("2021-02-11T17:29:35.5") == to_micros(
+        datetime.fromisoformat("2021-02-11T17:29:35.5")
+    )
+
+
+def test_parse_lines() -> None:
+    lines = [
+        "INFO 2021-02-11T17:29:35.112 start",
+        "no time here",
+        "",
+        "ERROR 2021-02-11T17:29:36",
+    ]
+    times = TimeParser().parse_lines(lines)
+    assert list(times) == [
+        to_micros(datetime.fromisoformat("2021-02-11T17:29:35.112")),
+        NO_TIME,
+        NO_TIME,
+        to_micros(datetime.fromisoformat("2021-02-11T17:29:36")),
+    ]
+    assert from_micros(times[3]) == datetime.fromisoformat("2021-02-11T17:29:36")
+
+
+def test_parse_time_input() -> None:
+    reference = datetime.fromisoformat("2021-02-11T17:29:35.112")
+    assert parse_time_input("2021-02-12T01:00:00") == datetime.fromisoformat("2021-02-12T01:00")
+    assert parse_time_input("17:30", reference) == datetime.fromisoformat("2021-02-11T17:30")
+    assert parse_time_input(" 17:29:35 ", reference) == datetime.fromisoformat(
+        "2021-02-11T17:29:35"
+    )
+    # after midnight
+    assert parse_time_input("01:00:00", reference) == datetime.fromisoformat("2021-02-12T01:00")
+    with pytest.raises(LogToolsError):
+        parse_time_input("soon", reference)
+    with pytest.raises(LogToolsError):
+        parse_time_input("17:30", None)
@@ -0,0 +1,85 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+import pathlib
+import shutil
+from typing import Any
+
+import pytest
+
+from logtools import log_patterns, user_files
+from logtools.log_patterns import LogPatterns
+from logtools.pattern_cache import PatternCache
+
+
+@pytest.fixture
+def user_folder(test_resources: pathlib.Path, tmp_path: pathlib.Path) -> pathlib.Path:
+    folder = tmp_path / "user"
+    shutil.copytree(test_resources, folder)
+    return folder
+
+
+@pytest.fixture
+def cache(tmp_path: pathlib.Path) -> PatternCache:
+    return PatternCache(tmp_path / "cache")
+
+
+def fail_load(*_: Any) -> None:
+    pytest.fail("yaml should not be parsed")
+
+
+def test_unchanged_not_parsed(
+    user_folder: pathlib.Path, cache: PatternCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    patterns_file = user_folder / "test_patterns.yml"
+    first = LogPatterns(patterns_file, cache)
+    monkeypatch.setattr(log_patterns, "load_yaml", fail_load)
+    second = LogPatterns(patterns_file, cache)
+    assert second.get_hash() == first.get_hash()
+    assert list(second.get_names()) == ["App start", "App end"]
+
+
+def test_changed_parsed_again(user_folder: pathlib.Path, cache: PatternCache) -> None:
+    patterns_file = user_folder / "test_patterns.yml"
+    LogPatterns(patterns_file, cache)
+    patterns_file.write_text(patterns_file.read_text().replace("App end", "App stop"))
+    assert list(LogPatterns(patterns_file, cache).get_names()) == ["App start", "App stop"]
+
+
+def test_write_yaml(
+    user_folder: pathlib.Path, cache: PatternCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    patterns_file = user_folder / "test_patterns.yml"
+    patterns = LogPatterns(patterns_file, cache)
+    patterns.data[1].name = "App stop"
+    patterns.write_yaml()
+    # the saved content is cached already
+    monkeypatch.setattr(log_patterns, "load_yaml", fail_load)
+    new_patterns = LogPatterns(patterns_file, cache)
+    assert list(new_patterns.get_names()) == ["App start", "App stop"]
+    assert new_patterns.get_hash() == patterns.get_hash()
+
+
+def test_corrupt_entry(user_folder: pathlib.Path, cache: PatternCache) -> None:
+    patterns_file = user_folder / "test_patterns.yml"
+    LogPatterns(patterns_file, cache)
+    cache.get_path(patterns_file).write_text("[not valid", encoding="utf-8")
+    assert cache.load(patterns_file, patterns_file.read_text()) is None
+    assert len(LogPatterns(patterns_file, cache).data) == 2
+
+
+def test_rules(
+    user_folder: pathlib.Path, cache: PatternCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    files = [pathlib.Path("a.yyy")]
+    user_files.get_patterns(None, files, user_folder, cache)
+    monkeypatch.setattr(user_files, "parse_rules", fail_load)
+    monkeypatch.setattr(log_patterns, "load_yaml", fail_load)
+    p = user_files.get_patterns(None, files, user_folder, cache)
+    assert p.file_path.name == "test_patterns_2.yml"
@@ -0,0 +1,42 @@
+"""
+LogTools Log viewer application
+
+By BigBird who like to Code
+https://github.com/bigbirdcode/logtools
+"""
+
+# ruff: noqa: D103 -  Missing docstring in public function
+
+from logtools import startup
+
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      3000 |       3500 | wx
+some other output
+import time:       500 |       4100 | logtools.main
+"""
+
+
+def test_parse_importtime() -> None:
+    imports = startup.parse_importtime(IMPORTTIME)
+    assert imports == [("_io", 120, 120), ("wx", 3000, 3500), ("logtools.main", 500, 4100)]
+    assert startup.get_heavy_modules(imports) == ["wx"]
+
+
+def test_report() -> None:
+    imports = startup.parse_importtime(IMPORTTIME)
+    report = startup.get_report("logtools.main", imports, 2)
+    assert report.startswith("Importing logtools.main: 3.6 ms, 3 modules")
+    assert "logtools.main" in report.splitlines()[3]
+    assert "_io" not in report
+    assert report.endswith("Heavy modules imported: wx")
+
+
+def test_main_import_is_light() -> None:
+    imports = startup.measure_imports("logtools.main")
+    names = {name for name, _, _ in imports}
+    assert "logtools.main" in names
+    assert "wx" not in names
+    assert startup.get_heavy_modules(imports) == []
@@ -35,3 +35,9 @@ def test_rule_no_match(test_resources: pathlib.Path) -> None:
     files = [pathlib.Path("a.nope")]
     with pytest.raises(LogToolsError):
         user_files.get_patterns(None, files, test_resources)
+
+
+def test_rule_match_compressed(test_resources: pathlib.Path) -> None:
+    files = [pathlib.Path("a.yyy.gz")]
+    p = user_files.get_patterns(None, files, test_resources)
+    assert p.file_path.name == "test_patterns_2.yml"